@@ -54,8 +54,13 @@ def configure_app(app, config_name=None):
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
         'pool_recycle': 300,
-        'pool_pre_ping': True
+        'pool_pre_ping': True,
+        # Compiled SQL is cached per statement shape; each combination of optional
+        # listing/analytics filters is its own shape, so allow more than the default 500
+        'query_cache_size': int(os.getenv('SQLALCHEMY_QUERY_CACHE_SIZE', 1200))
     }
+    # Raise on unplanned relationship lazy loads in dashboard queries (N+1 guard)
+    app.config['SQLALCHEMY_RAISE_ON_LAZY'] = os.getenv('SQLALCHEMY_RAISE_ON_LAZY', 'false').lower() == 'true'
     
     # JWT Configuration
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-change-in-production')
@@ -88,6 +93,12 @@ def configure_app(app, config_name=None):
     # File Upload Configuration
     app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'uploads')
     app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 100 * 1024 * 1024))  # 100MB
+    # Dedup hash for uploads: 'sha256' (default) or 'blake2b-128'
+    app.config['UPLOAD_HASH_ALGORITHM'] = os.getenv('UPLOAD_HASH_ALGORITHM', 'sha256')
+    # Threads hashing/processing the files of one multi-file upload
+    app.config['UPLOAD_MAX_WORKERS'] = int(os.getenv('UPLOAD_MAX_WORKERS', 4))
+    # Processes resizing uploaded images (0 processes them in the request thread)
+    app.config['UPLOAD_IMAGE_PROCESSES'] = int(os.getenv('UPLOAD_IMAGE_PROCESSES', os.cpu_count() or 1))
     
     # AWS S3 Configuration (optional)
     app.config['AWS_ACCESS_KEY_ID'] = os.getenv('AWS_ACCESS_KEY_ID')
@@ -95,6 +106,9 @@ def configure_app(app, config_name=None):
     app.config['AWS_REGION'] = os.getenv('AWS_REGION', 'us-east-1')
     app.config['S3_BUCKET_NAME'] = os.getenv('S3_BUCKET_NAME')
     
+    # Dashboard sections are computed on this many worker threads (1 = sequential)
+    app.config['DASHBOARD_MAX_WORKERS'] = int(os.getenv('DASHBOARD_MAX_WORKERS', 6))
+    
     # Application URLs
     app.config['APP_URL'] = os.getenv('APP_URL', 'http://localhost:3000')
     app.config['API_URL'] = os.getenv('API_URL', 'http://localhost:5000')
@@ -118,10 +132,22 @@ def configure_app(app, config_name=None):
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
         app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(seconds=30)
         app.config['WTF_CSRF_ENABLED'] = False
+        # In-memory SQLite is private to each connection
+        app.config['DASHBOARD_MAX_WORKERS'] = 1
+        app.config['UPLOAD_IMAGE_PROCESSES'] = 0
+        app.config['SQLALCHEMY_RAISE_ON_LAZY'] = True
     else:  # development
         app.config['DEBUG'] = True
         app.config['TESTING'] = False
         app.config['SQLALCHEMY_ECHO'] = False
+    
+    # Each dashboard build checks out up to DASHBOARD_MAX_WORKERS connections at
+    # once; size the pool so concurrent builds don't queue behind each other
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+            'pool_size': int(os.getenv('SQLALCHEMY_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 20))
+        })
 
 def register_blueprints(app):
     """Register Flask blueprints and API routes."""
@@ -211,6 +237,14 @@ def configure_logging(app):
         )
         app.logger.setLevel(logging.INFO)
         app.logger.info('Educational Platform API startup')
+        
+        # Confirms which imaging build resizes uploads (Pillow-SIMD versions end in .postN)
+        import PIL
+        from PIL import features
+        app.logger.info(
+            f"Pillow {PIL.__version__} (SIMD build: {'.post' in PIL.__version__}, "
+            f"libjpeg-turbo: {features.check_feature('libjpeg_turbo')})"
+        )
 
 def register_error_handlers(app):
     """Register error handlers."""
@@ -7,12 +7,15 @@ from marshmallow import ValidationError
 from app.schemas.exercise import (
     ExerciseSchema, ExerciseCreateSchema, ExerciseUpdateSchema, 
     ExerciseListSchema, ProgressSchema, ProgressSubmissionSchema,
-    ProgressStartSchema, AnalyticsStudentSchema, AnalyticsClassSchema,
+    ProgressListSchema, ProgressStartSchema, AnalyticsStudentSchema, AnalyticsClassSchema,
     AnalyticsOverviewSchema
 )
-from app.services.exercise import ExerciseService, ProgressService, AnalyticsService
+from app.services.exercise import ExerciseService, ProgressService, AnalyticsService, InvalidCursorError
 from app.utils.auth import role_required, jwt_required_with_user
-from app.utils.cache import cache_key, get_cached_result, set_cached_result
+from app.utils.cache import (
+    CacheManager, cache_key, get_cached_result, set_cached_result,
+    get_or_build_cached_result
+)
 from app.extensions import limiter
 import logging
 
@@ -47,17 +50,33 @@ class ExerciseListResource(Resource):
             exercise_schema = ExerciseSchema(many=True)
             exercises_data = exercise_schema.dump(exercises)
             
+            # Keyset cursor for the next page (a full page may have more after it)
+            per_page = filters.get('per_page', 10)
+            next_cursor = (
+                ExerciseService.encode_cursor(exercises[-1]) if len(exercises) == per_page else None
+            )
+            
+            if total is None:
+                # Cursor pages skip the total count
+                pagination = {
+                    'per_page': per_page,
+                    'next_cursor': next_cursor
+                }
+            else:
+                pagination = {
+                    'page': filters.get('page', 1),
+                    'per_page': per_page,
+                    'total': total,
+                    'pages': (total + per_page - 1) // per_page,
+                    'next_cursor': next_cursor
+                }
+            
             # Prepare response
             response_data = {
                 'success': True,
                 'data': {
                     'exercises': exercises_data,
-                    'pagination': {
-                        'page': filters.get('page', 1),
-                        'per_page': filters.get('per_page', 10),
-                        'total': total,
-                        'pages': (total + filters.get('per_page', 10) - 1) // filters.get('per_page', 10)
-                    }
+                    'pagination': pagination
                 },
                 'message': 'Exercises retrieved successfully'
             }
@@ -73,6 +92,11 @@ class ExerciseListResource(Resource):
                 'error': 'Validation error',
                 'details': e.messages
             }, 400
+        except InvalidCursorError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
         except Exception as e:
             logger.error(f"Error getting exercises: {str(e)}")
             return {
@@ -119,6 +143,58 @@ class ExerciseListResource(Resource):
             }, 500
 
 
+class ExerciseBulkCreateResource(Resource):
+    """Resource for creating many exercises at once."""
+    
+    @jwt_required()
+    @role_required(['professor', 'admin'])
+    @limiter.limit("10 per minute")
+    def post(self):
+        """Create a list of exercises in a single transaction."""
+        try:
+            current_user = get_jwt_identity()
+            
+            # Check the shape and size before validating any item
+            payload = request.get_json(silent=True)
+            if not isinstance(payload, list):
+                return {
+                    'success': False,
+                    'error': 'Expected a list of exercises'
+                }, 400
+            
+            if len(payload) > ExerciseService.BULK_CREATE_MAX:
+                return {
+                    'success': False,
+                    'error': f'At most {ExerciseService.BULK_CREATE_MAX} exercises per request'
+                }, 400
+            
+            # Validate input; plain dicts, the service builds the rows itself
+            schema = ExerciseCreateSchema(many=True, load_instance=False)
+            rows = schema.load(payload)
+            
+            # Create exercises
+            exercise_ids = ExerciseService.bulk_create_exercises(rows, current_user)
+            
+            return {
+                'success': True,
+                'data': {'ids': exercise_ids},
+                'message': f'{len(exercise_ids)} exercises created successfully'
+            }, 201
+            
+        except ValidationError as e:
+            return {
+                'success': False,
+                'error': 'Validation error',
+                'details': e.messages
+            }, 400
+        except Exception as e:
+            logger.error(f"Error bulk creating exercises: {str(e)}")
+            return {
+                'success': False,
+                'error': 'Internal server error'
+            }, 500
+
+
 class ExerciseResource(Resource):
     """Resource for individual exercise operations."""
     
@@ -438,19 +514,43 @@ class StudentProgressResource(Resource):
                     'error': 'Access denied'
                 }, 403
             
+            page = ProgressListSchema().load(request.args)
+            
             # Get progress
-            progress_records = ProgressService.get_student_progress(student_id)
+            progress_records = ProgressService.get_student_progress(
+                student_id, limit=page['limit'], before=page.get('before')
+            )
             
             # Serialize response
             progress_schema = ProgressSchema(many=True)
             progress_data = progress_schema.dump(progress_records)
             
+            # A full page may have more records after it
+            next_before = None
+            if len(progress_records) == page['limit']:
+                next_before = ProgressService.encode_cursor(progress_records[-1])
+            
             return {
                 'success': True,
                 'data': progress_data,
+                'pagination': {
+                    'limit': page['limit'],
+                    'next_before': next_before
+                },
                 'message': 'Student progress retrieved successfully'
             }
             
+        except ValidationError as e:
+            return {
+                'success': False,
+                'error': 'Validation error',
+                'details': e.messages
+            }, 400
+        except InvalidCursorError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
         except Exception as e:
             logger.error(f"Error getting student progress for {student_id}: {str(e)}")
             return {
@@ -468,19 +568,43 @@ class ExerciseProgressResource(Resource):
     def get(self, exercise_id):
         """Get progress for a specific exercise."""
         try:
+            page = ProgressListSchema().load(request.args)
+            
             # Get progress
-            progress_records = ProgressService.get_exercise_progress(exercise_id)
+            progress_records = ProgressService.get_exercise_progress(
+                exercise_id, limit=page['limit'], before=page.get('before')
+            )
             
             # Serialize response
             progress_schema = ProgressSchema(many=True)
             progress_data = progress_schema.dump(progress_records)
             
+            # A full page may have more records after it
+            next_before = None
+            if len(progress_records) == page['limit']:
+                next_before = ProgressService.encode_cursor(progress_records[-1])
+            
             return {
                 'success': True,
                 'data': progress_data,
+                'pagination': {
+                    'limit': page['limit'],
+                    'next_before': next_before
+                },
                 'message': 'Exercise progress retrieved successfully'
             }
             
+        except ValidationError as e:
+            return {
+                'success': False,
+                'error': 'Validation error',
+                'details': e.messages
+            }, 400
+        except InvalidCursorError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
         except Exception as e:
             logger.error(f"Error getting exercise progress for {exercise_id}: {str(e)}")
             return {
@@ -507,25 +631,16 @@ class StudentAnalyticsResource(Resource):
                     'error': 'Access denied'
                 }, 403
             
-            # Check cache first
-            cache_key_str = cache_key('student_analytics', student_id=student_id)
-            cached_result = get_cached_result(cache_key_str)
-            if cached_result:
-                return cached_result
-            
-            # Get analytics
-            analytics_data = AnalyticsService.get_student_analytics(student_id)
-            
-            response_data = {
-                'success': True,
-                'data': analytics_data,
-                'message': 'Student analytics retrieved successfully'
-            }
-            
-            # Cache for 15 minutes
-            set_cached_result(cache_key_str, response_data, timeout=900)
-            
-            return response_data
+            # Concurrent misses share a single rebuild; cleared when the student submits answers
+            return get_or_build_cached_result(
+                CacheManager.student_analytics_key(student_id),
+                lambda: {
+                    'success': True,
+                    'data': AnalyticsService.get_student_analytics(student_id),
+                    'message': 'Student analytics retrieved successfully'
+                },
+                timeout=900
+            )
             
         except Exception as e:
             logger.error(f"Error getting student analytics for {student_id}: {str(e)}")
@@ -548,25 +663,16 @@ class ClassAnalyticsResource(Resource):
             schema = AnalyticsClassSchema()
             filters = schema.load(request.args)
             
-            # Check cache first
-            cache_key_str = cache_key('class_analytics', **filters)
-            cached_result = get_cached_result(cache_key_str)
-            if cached_result:
-                return cached_result
-            
-            # Get analytics
-            analytics_data = AnalyticsService.get_class_analytics(filters)
-            
-            response_data = {
-                'success': True,
-                'data': analytics_data,
-                'message': 'Class analytics retrieved successfully'
-            }
-            
-            # Cache for 30 minutes
-            set_cached_result(cache_key_str, response_data, timeout=1800)
-            
-            return response_data
+            # Concurrent misses share a single rebuild; expires after 30 minutes
+            return get_or_build_cached_result(
+                cache_key('class_analytics', **filters),
+                lambda: {
+                    'success': True,
+                    'data': AnalyticsService.get_class_analytics(filters),
+                    'message': 'Class analytics retrieved successfully'
+                },
+                timeout=1800
+            )
             
         except ValidationError as e:
             return {
@@ -595,25 +701,16 @@ class OverviewAnalyticsResource(Resource):
             schema = AnalyticsOverviewSchema()
             filters = schema.load(request.args)
             
-            # Check cache first
-            cache_key_str = cache_key('overview_analytics', **filters)
-            cached_result = get_cached_result(cache_key_str)
-            if cached_result:
-                return cached_result
-            
-            # Get analytics
-            analytics_data = AnalyticsService.get_overview_analytics(filters)
-            
-            response_data = {
-                'success': True,
-                'data': analytics_data,
-                'message': 'Overview analytics retrieved successfully'
-            }
-            
-            # Cache for 1 hour
-            set_cached_result(cache_key_str, response_data, timeout=3600)
-            
-            return response_data
+            # Concurrent misses share a single rebuild; expires after 1 hour
+            return get_or_build_cached_result(
+                cache_key('overview_analytics', **filters),
+                lambda: {
+                    'success': True,
+                    'data': AnalyticsService.get_overview_analytics(filters),
+                    'message': 'Overview analytics retrieved successfully'
+                },
+                timeout=3600
+            )
             
         except ValidationError as e:
             return {
@@ -630,6 +727,7 @@ class OverviewAnalyticsResource(Resource):
 
 # Register API resources
 api.add_resource(ExerciseListResource, '/exercises')
+api.add_resource(ExerciseBulkCreateResource, '/exercises/bulk')
 api.add_resource(ExerciseResource, '/exercises/<int:exercise_id>')
 api.add_resource(ExercisesByProfessorResource, '/exercises/by-professor/<string:professor_id>')
 api.add_resource(ExercisesBySubjectResource, '/exercises/by-subject/<string:subject>')
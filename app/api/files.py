@@ -28,15 +28,14 @@ class FileUploadResource(Resource):
         try:
             user_id = get_jwt_identity()
             
-            # Check if file is present in request
-            if 'file' not in request.files:
+            # Check if file is present in request ('files' may repeat)
+            files = request.files.getlist('files')
+            if 'file' not in request.files and not files:
                 return jsonify({
                     'success': False,
                     'message': 'No file provided'
                 }), 400
             
-            file = request.files['file']
-            
             # Get optional parameters
             storage_type = request.form.get('storage_type', 'local')
             allowed_categories = request.form.getlist('allowed_categories')
@@ -51,9 +50,25 @@ class FileUploadResource(Resource):
             if 'category' in request.form:
                 metadata['category'] = request.form['category']
             
+            if files:
+                uploaded_files = self.file_service.upload_files(
+                    files=files,
+                    user_id=user_id,
+                    storage_type=storage_type,
+                    allowed_categories=allowed_categories if allowed_categories else None,
+                    metadata=metadata,
+                    process_images=process_images
+                )
+                
+                return jsonify({
+                    'success': True,
+                    'data': [uploaded_file.to_dict() for uploaded_file in uploaded_files],
+                    'message': f'{len(uploaded_files)} files uploaded successfully'
+                }), 201
+            
             # Upload file
             uploaded_file = self.file_service.upload_file(
-                file=file,
+                file=request.files['file'],
                 user_id=user_id,
                 storage_type=storage_type,
                 allowed_categories=allowed_categories if allowed_categories else None,
@@ -380,26 +395,11 @@ class FileBulkOperationsResource(Resource):
                     'message': 'Operation and file_ids are required'
                 }), 400
             
-            results = {'success': [], 'failed': []}
-            
             if operation == 'delete':
-                for file_id in file_ids:
-                    try:
-                        success = self.file_service.delete_file(file_id, user_id)
-                        if success:
-                            results['success'].append(file_id)
-                        else:
-                            results['failed'].append({'file_id': file_id, 'error': 'Delete failed'})
-                    except Exception as e:
-                        results['failed'].append({'file_id': file_id, 'error': str(e)})
+                results = self.file_service.delete_files(file_ids, user_id)
             
             elif operation == 'get_urls':
-                for file_id in file_ids:
-                    try:
-                        url = self.file_service.get_file_url(file_id, user_id)
-                        results['success'].append({'file_id': file_id, 'url': url})
-                    except Exception as e:
-                        results['failed'].append({'file_id': file_id, 'error': str(e)})
+                results = self.file_service.get_file_urls(file_ids, user_id)
             
             else:
                 return jsonify({
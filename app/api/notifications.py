@@ -354,7 +354,7 @@ class NotificationAdminResource(Resource):
             user_ids = [str(user.id) for user in target_users]
             
             # Create bulk notifications
-            notifications = NotificationService.create_bulk_notifications(
+            notification_ids = NotificationService.create_bulk_notifications(
                 user_ids=user_ids,
                 notification_type='system_announcement',
                 data={'message': message},
@@ -366,10 +366,10 @@ class NotificationAdminResource(Resource):
             return jsonify({
                 'success': True,
                 'data': {
-                    'notifications_created': len(notifications),
+                    'notifications_created': len(notification_ids),
                     'target_users': len(user_ids)
                 },
-                'message': f'System notification sent to {len(notifications)} users'
+                'message': f'System notification sent to {len(notification_ids)} users'
             }), 201
             
         except Exception as e:
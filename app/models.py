@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
 from app.extensions import db
 import bcrypt
 
@@ -71,9 +72,15 @@ class User(db.Model):
     @property
     def full_name(self):
         """Get full name from profile data."""
-        first_name = self.profile_data.get('first_name', '')
-        last_name = self.profile_data.get('last_name', '')
-        return f"{first_name} {last_name}".strip() or self.email.split('@')[0]
+        return User.display_name(self.profile_data, self.email)
+    
+    @staticmethod
+    def display_name(profile_data, email):
+        """Build the full name from raw column values (e.g. a column-only query row)."""
+        profile_data = profile_data or {}
+        first_name = profile_data.get('first_name', '')
+        last_name = profile_data.get('last_name', '')
+        return f"{first_name} {last_name}".strip() or email.split('@')[0]
     
     def update_profile(self, data):
         """Update profile data."""
@@ -263,10 +270,26 @@ class Exercise(db.Model):
     max_score = db.Column(db.Float, nullable=False, default=100.0)
     time_limit = db.Column(db.Integer, nullable=True)  # Time limit in minutes
     is_published = db.Column(db.Boolean, default=False, nullable=False)
-    tags = db.Column(JSONB, nullable=False, default=list)  # Subject tags for filtering
+    tags = db.Column(ARRAY(db.Text), nullable=False, default=list)  # Subject tags for filtering
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    __table_args__ = (
+        # Tag containment/overlap filters (tags @> ... / tags && ...)
+        db.Index('idx_exercises_tags_gin', 'tags', postgresql_using='gin'),
+        # Published listings, newest first, in the (created_at, id) keyset order;
+        # partial, so drafts never enter the index
+        db.Index('ix_exercises_published_created', 'created_at', 'id',
+                 postgresql_where=db.text('is_published')),
+        # A professor's own exercises, newest first
+        db.Index('ix_exercises_creator_created', 'created_by', 'created_at'),
+        # Substring ILIKE filters on subject/title (needs the pg_trgm extension)
+        db.Index('idx_exercises_subject_trgm', 'subject', postgresql_using='gin',
+                 postgresql_ops={'subject': 'gin_trgm_ops'}),
+        db.Index('idx_exercises_title_trgm', 'title', postgresql_using='gin',
+                 postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
+    
     # Relationships
     creator = db.relationship('User', foreign_keys=[created_by], backref='created_exercises')
     progress_records = db.relationship('Progress', backref='exercise', lazy=True, cascade='all, delete-orphan')
@@ -349,12 +372,31 @@ class Progress(db.Model):
     submitted_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Day of the last update, stored so per-day grouping can use an index
+    updated_date = db.Column(db.Date, db.Computed('CAST(updated_at AS DATE)', persisted=True))
     
     # Relationships
     student = db.relationship('User', foreign_keys=[student_id], backref='progress_records')
     
     # Unique constraint to prevent duplicate progress records
-    __table_args__ = (db.UniqueConstraint('student_id', 'exercise_id', name='unique_student_exercise'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'exercise_id', name='unique_student_exercise'),
+        # Completed progress is always scored, so score aggregates need no NULL filter
+        db.CheckConstraint("status <> 'completed' OR score IS NOT NULL", name='chk_completed_has_score'),
+        db.Index('ix_progress_student_date', 'student_id', 'updated_date', 'status'),
+        # Score averages per student read from the index alone
+        db.Index('ix_progress_student_status_score', 'student_id', 'status', postgresql_include=['score']),
+        # Per-exercise attempt counts and completed-score averages
+        db.Index('ix_progress_exercise_status', 'exercise_id', 'status', postgresql_include=['score']),
+        # Recent-activity feeds order by updated_at DESC (served by a backward scan);
+        # student_id is carried so active-student counts are index-only
+        db.Index('ix_progress_updated_student', 'updated_at', postgresql_include=['student_id']),
+        # A student's progress list and recent progress, newest first
+        db.Index('ix_progress_student_updated', 'student_id', 'updated_at'),
+        # Latest completed attempts for the performance trend (LIMIT 10)
+        db.Index('ix_progress_student_completed', 'student_id', 'completed_at',
+                 postgresql_where=db.text("status = 'completed'"), postgresql_include=['score']),
+    )
     
     def to_dict(self, include_answers=False):
         data = {
@@ -463,6 +505,43 @@ class StudentBadge(db.Model):
             'earned_at': self.earned_at.isoformat()
         }
 
+class StudentAchievement(db.Model):
+    """Achievements earned automatically from exercise progress."""
+    __tablename__ = 'student_achievements'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    achievement_key = db.Column(db.String(50), nullable=False)  # Key into AchievementService.ACHIEVEMENTS
+    earned_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Unique constraint (also serves per-student lookups)
+    __table_args__ = (db.UniqueConstraint('student_id', 'achievement_key', name='unique_student_achievement'),)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'student_id': str(self.student_id),
+            'achievement_key': self.achievement_key,
+            'earned_at': self.earned_at.isoformat()
+        }
+
+class DailyActivityRollup(db.Model):
+    """Per-day platform activity counts backing the admin activity trends."""
+    __tablename__ = 'daily_activity_rollup'
+    
+    date = db.Column(db.Date, primary_key=True)
+    completions = db.Column(db.Integer, default=0, nullable=False)
+    registrations = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'completions': self.completions,
+            'registrations': self.registrations,
+            'updated_at': self.updated_at.isoformat()
+        }
+
 class Intervention(db.Model):
     __tablename__ = 'interventions'
     
@@ -552,7 +631,13 @@ class Class(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Professor class lookups only ever ask for active classes
+    __table_args__ = (
+        db.Index('ix_class_prof_active', 'professor_id', 'is_active', postgresql_where=db.text('is_active')),
+    )
+    
     # Relationships
+    professor = db.relationship('User', foreign_keys=[professor_id])
     enrollments = db.relationship('ClassEnrollment', backref='class_obj', lazy=True, cascade='all, delete-orphan')
     assigned_exercises = db.relationship('ClassExerciseAssignment', backref='class_obj', lazy=True, cascade='all, delete-orphan')
     
@@ -603,8 +688,11 @@ class ClassEnrollment(db.Model):
                                  default='active', nullable=False)
     enrolled_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
-    # Unique constraint
-    __table_args__ = (db.UniqueConstraint('class_id', 'student_id', name='unique_class_student'),)
+    # Unique constraint, plus active-roster lookups answered from the index
+    __table_args__ = (
+        db.UniqueConstraint('class_id', 'student_id', name='unique_class_student'),
+        db.Index('ix_enrollment_class_status', 'class_id', 'enrollment_status', postgresql_include=['student_id']),
+    )
     
     def to_dict(self):
         return {
@@ -625,7 +713,7 @@ class ClassExerciseAssignment(db.Model):
     class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
     exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), nullable=False)
     assigned_by = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
-    due_date = db.Column(db.DateTime, nullable=True)
+    due_date = db.Column(db.DateTime, nullable=True, index=True)
     is_mandatory = db.Column(db.Boolean, default=True, nullable=False)
     points_worth = db.Column(db.Float, nullable=True)
     instructions = db.Column(db.Text, nullable=True)
@@ -669,8 +757,18 @@ class UploadedFile(db.Model):
     uploader_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
     is_public = db.Column(db.Boolean, default=False, nullable=False)
     metadata = db.Column(JSONB, nullable=True, default=dict)  # Additional file metadata
+    file_hash = db.Column(db.String(80), nullable=True)  # Content hash for per-user dedup
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
+    # Names used by FileUploadService
+    uploaded_by = db.synonym('uploader_id')
+    stored_filename = db.synonym('filename')
+    
+    __table_args__ = (
+        # Dedup lookup: WHERE uploader_id = ... AND file_hash = ...
+        db.Index('ix_uploaded_files_uploader_hash', 'uploader_id', 'file_hash'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -708,6 +806,9 @@ class Notification(db.Model):
     type = db.Column(db.Enum(
         'email_sent', 'exercise_assigned', 'progress_update', 
         'class_enrollment', 'achievement_earned', 'system_alert',
+        # Types sent by NotificationService
+        'exercise_completed', 'assignment_due', 'grade_posted',
+        'system_announcement', 'chat_message', 'file_upload',
         name='notification_types'
     ), nullable=False)
     title = db.Column(db.String(200), nullable=False)
@@ -717,6 +818,21 @@ class Notification(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     read_at = db.Column(db.DateTime, nullable=True)
     
+    __table_args__ = (
+        # Unread counts and unread-only listings; partial, so the index only
+        # holds the (few) unread rows and counting it is index-only
+        db.Index('ix_notifications_user_unread', 'user_id', 'created_at',
+                 postgresql_where=db.text('NOT is_read')),
+        # A user's notifications, newest first (served by a backward scan)
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+        # The same listing filtered by type
+        db.Index('ix_notifications_user_type_created', 'user_id', 'type', 'created_at'),
+        # "Already sent?" checks for due-assignment reminders, by student and
+        # assignment; partial, so other notification types stay out of it
+        db.Index('ix_notifications_assignment_due', 'user_id', db.text("(data ->> 'assignment_id')"),
+                 postgresql_where=db.text("type = 'assignment_due'")),
+    )
+    
     # Relationship
     user = db.relationship('User', backref='notifications')
     
@@ -737,3 +853,14 @@ class Notification(db.Model):
         """Mark notification as read."""
         self.is_read = True
         self.read_at = datetime.utcnow()
+
+
+# Trigram operator classes used by the exercise search indexes
+event.listen(
+    db.metadata, 'before_create',
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql')
+)
+
+# Dashboard materialized views are created/dropped alongside the tables
+from app.utils.materialized_views import register_materialized_views
+register_materialized_views(db.metadata)
@@ -83,6 +83,7 @@ class ExerciseListSchema(Schema):
     
     page = fields.Int(missing=1, validate=validate.Range(min=1))
     per_page = fields.Int(missing=10, validate=validate.Range(min=1, max=100))
+    cursor = fields.Str(validate=validate.Length(max=100))  # Keyset cursor, replaces page
     difficulty = fields.Str(validate=validate.OneOf(['easy', 'medium', 'hard']))
     subject = fields.Str()
     type = fields.Str(validate=validate.OneOf(['multiple_choice', 'short_answer', 'calculation', 'essay']))
@@ -129,6 +130,13 @@ class ProgressSubmissionSchema(Schema):
                 raise ValidationError(f"Answer {i+1} must contain either 'answer' or 'selected_option'.")
 
 
+class ProgressListSchema(Schema):
+    """Schema for paging through progress records, newest first."""
+    
+    limit = fields.Int(missing=100, validate=validate.Range(min=1, max=500))
+    before = fields.Str(validate=validate.Length(max=100))  # Keyset cursor from next_before
+
+
 class ProgressStartSchema(Schema):
     """Schema for starting an exercise."""
     
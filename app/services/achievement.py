@@ -0,0 +1,207 @@
+"""
+Achievement service for awarding and reading progress-based achievements.
+"""
+import logging
+from typing import Dict, List, Any
+from sqlalchemy import case, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from app.extensions import db
+from app.models import Progress, StudentAchievement
+from app.services.base import BaseService
+
+logger = logging.getLogger(__name__)
+
+
+class AchievementService(BaseService):
+    """Service for progress-based student achievements."""
+
+    model = StudentAchievement
+
+    # Students streamed per batch when backfilling achievements
+    BACKFILL_BATCH_SIZE = 1000
+
+    # Achievement definitions and the thresholds that earn them. Milestones
+    # are kept once earned; 'state_based' ones hold only while the condition
+    # does and are revoked when it lapses
+    ACHIEVEMENTS = {
+        'first_steps': {
+            'name': 'First Steps',
+            'description': 'Completed your first exercise',
+            'icon': '🎯',
+            'min_completed': 1
+        },
+        'high_achiever': {
+            'name': 'High Achiever',
+            'description': 'Maintain 90%+ average score',
+            'icon': '⭐',
+            'min_completed': 1,
+            'min_average_score': 90,
+            'state_based': True
+        },
+        'dedicated_learner': {
+            'name': 'Dedicated Learner',
+            'description': 'Completed 10+ exercises',
+            'icon': '📚',
+            'min_completed': 10
+        },
+        'math_champion': {
+            'name': 'Math Champion',
+            'description': 'Completed 50+ exercises',
+            'icon': '🏆',
+            'min_completed': 50
+        }
+    }
+
+    # Keys of the achievements that are revoked when no longer met
+    STATE_BASED = frozenset(
+        key for key, definition in ACHIEVEMENTS.items() if definition.get('state_based')
+    )
+
+    @classmethod
+    def get_student_achievements(cls, student_id: str) -> List[Dict[str, Any]]:
+        """Get earned achievements for a student, oldest first."""
+        try:
+            earned = StudentAchievement.query.filter_by(
+                student_id=student_id
+            ).order_by(StudentAchievement.earned_at).all()
+
+            achievements = []
+            for achievement in earned:
+                definition = cls.ACHIEVEMENTS.get(achievement.achievement_key)
+                if not definition:
+                    continue
+
+                achievements.append({
+                    'key': achievement.achievement_key,
+                    'name': definition['name'],
+                    'description': definition['description'],
+                    'icon': definition['icon'],
+                    'earned_at': achievement.earned_at.isoformat()
+                })
+
+            return achievements
+
+        except Exception as e:
+            logger.error(f"Error getting achievements for {student_id}: {str(e)}")
+            return []
+
+    @classmethod
+    def award_achievements(cls, student_id: str) -> int:
+        """
+        Award any achievements a student has newly qualified for, and revoke
+        state-based ones that no longer hold.
+        Call after a progress record is completed.
+
+        Returns:
+            Number of achievement rows attempted
+        """
+        try:
+            row = cls._completion_stats_query().filter(
+                Progress.student_id == student_id
+            ).first()
+
+            if not row:
+                return 0
+
+            cls._revoke_lapsed([row], commit=False)
+            return cls._insert_earned([row])
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error awarding achievements for {student_id}: {str(e)}")
+            return 0
+
+    @classmethod
+    def award_all_achievements(cls) -> int:
+        """
+        Backfill achievements for every student with progress, revoking
+        state-based ones that no longer hold.
+
+        Returns:
+            Number of achievement rows attempted
+        """
+        try:
+            # Stream the per-student stats instead of materializing every student;
+            # commit once at the end so the server-side cursor stays open
+            result = db.session.execute(
+                cls._completion_stats_query().statement.execution_options(
+                    yield_per=cls.BACKFILL_BATCH_SIZE
+                )
+            )
+
+            attempted = 0
+            for batch in result.partitions():
+                cls._revoke_lapsed(batch, commit=False)
+                attempted += cls._insert_earned(batch, commit=False)
+
+            db.session.commit()
+            return attempted
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error awarding achievements: {str(e)}")
+            return 0
+
+    @classmethod
+    def qualifies(cls, key: str, total_completed: int, average_score: float) -> bool:
+        """Check whether completion stats meet an achievement's thresholds."""
+        definition = cls.ACHIEVEMENTS[key]
+        return (
+            total_completed >= definition.get('min_completed', 0) and
+            average_score >= definition.get('min_average_score', 0)
+        )
+
+    @classmethod
+    def _completion_stats_query(cls):
+        """Per-student completed count and average completed score."""
+        is_completed = Progress.status == 'completed'
+        return db.session.query(
+            Progress.student_id,
+            func.sum(case((is_completed, 1), else_=0)).label('total_completed'),
+            func.avg(case((is_completed, Progress.score))).label('average_score')
+        ).group_by(Progress.student_id)
+
+    @classmethod
+    def _insert_earned(cls, stats_rows, commit: bool = True) -> int:
+        """Insert earned achievements, skipping ones already stored."""
+        values = [
+            {'student_id': row.student_id, 'achievement_key': key}
+            for row in stats_rows
+            for key in cls.ACHIEVEMENTS
+            if cls.qualifies(key, row.total_completed or 0, float(row.average_score or 0))
+        ]
+
+        if not values:
+            return 0
+
+        stmt = insert(StudentAchievement).on_conflict_do_nothing(
+            constraint='unique_student_achievement'
+        )
+        db.session.execute(stmt, values)
+        if commit:
+            db.session.commit()
+
+        return len(values)
+
+    @classmethod
+    def _revoke_lapsed(cls, stats_rows, commit: bool = True) -> int:
+        """Delete state-based achievements whose condition no longer holds."""
+        revoked = 0
+        for key in cls.STATE_BASED:
+            lapsed = [
+                row.student_id for row in stats_rows
+                if not cls.qualifies(key, row.total_completed or 0, float(row.average_score or 0))
+            ]
+            if lapsed:
+                revoked += db.session.execute(
+                    delete(StudentAchievement).where(
+                        StudentAchievement.achievement_key == key,
+                        StudentAchievement.student_id.in_(lapsed)
+                    ),
+                    execution_options={'synchronize_session': False}
+                ).rowcount
+
+        if commit:
+            db.session.commit()
+
+        return revoked
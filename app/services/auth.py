@@ -58,7 +58,7 @@ class AuthService:
             db.session.commit()
             
             # TODO: Send email confirmation
-            EmailService.send_welcome_email(user)
+            EmailService.queue_welcome_email(user)
             
             return user, None
             
@@ -260,8 +260,8 @@ class AuthService:
             
             db.session.commit()
             
-            # Send reset email
-            EmailService.send_password_reset_email(user, reset_token)
+            # Send reset email from a worker so the request doesn't wait on delivery
+            EmailService.queue_password_reset_email(user, reset_token)
             
             return True, None
             
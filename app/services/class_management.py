@@ -12,7 +12,7 @@ from app.models import (
     User, Exercise, Progress, Notification
 )
 from app.services.base import BaseService
-from app.utils.cache import cache_key, get_cached_result, set_cached_result
+from app.utils.cache import CacheManager, cache_key, get_cached_result, set_cached_result
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +144,25 @@ class ClassManagementService(BaseService):
             logger.error(f"Error getting classes for student {student_id}: {str(e)}")
             raise
     
+    @classmethod
+    def get_professor_ids_for_student(cls, student_id: str) -> List[str]:
+        """Get the professors teaching a student's active classes."""
+        try:
+            rows = db.session.query(Class.professor_id).join(
+                ClassEnrollment, ClassEnrollment.class_id == Class.id
+            ).filter(
+                and_(
+                    ClassEnrollment.student_id == student_id,
+                    ClassEnrollment.enrollment_status == 'active',
+                    Class.is_active == True
+                )
+            ).distinct().all()
+            
+            return [str(row.professor_id) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting professors for student {student_id}: {str(e)}")
+            return []
+    
     @classmethod
     def enroll_student(cls, class_id: int, student_id: str, 
                       enrolled_by: Optional[str] = None) -> ClassEnrollment:
@@ -172,6 +191,10 @@ class ClassManagementService(BaseService):
                     existing_enrollment.enrollment_status = 'active'
                     existing_enrollment.enrolled_at = datetime.utcnow()
                     db.session.commit()
+                    CacheManager.invalidate_student_dashboard(
+                        student_id, CacheManager.ENROLLMENT_DASHBOARD_SECTIONS
+                    )
+                    CacheManager.invalidate_professor_dashboards([class_obj.professor_id])
                     return existing_enrollment
             
             # Check class capacity
@@ -195,6 +218,11 @@ class ClassManagementService(BaseService):
             db.session.add(enrollment)
             db.session.commit()
             
+            CacheManager.invalidate_student_dashboard(
+                student_id, CacheManager.ENROLLMENT_DASHBOARD_SECTIONS
+            )
+            CacheManager.invalidate_professor_dashboards([class_obj.professor_id])
+            
             # Create notification
             cls._create_enrollment_notification(student_id, class_obj, 'enrolled')
             
@@ -225,8 +253,13 @@ class ClassManagementService(BaseService):
             enrollment.enrollment_status = 'dropped'
             db.session.commit()
             
+            CacheManager.invalidate_student_dashboard(
+                student_id, CacheManager.ENROLLMENT_DASHBOARD_SECTIONS
+            )
+            
             # Create notification
             class_obj = cls.get_by_id(class_id)
+            CacheManager.invalidate_professor_dashboards([class_obj.professor_id])
             cls._create_enrollment_notification(student_id, class_obj, 'unenrolled')
             
             logger.info(f"Student {student_id} unenrolled from class {class_id}")
@@ -407,8 +440,7 @@ class ClassManagementService(BaseService):
         avg_score = db.session.query(func.avg(Progress.score)).filter(
             and_(
                 Progress.student_id.in_(student_ids),
-                Progress.status == 'completed',
-                Progress.score.isnot(None)
+                Progress.status == 'completed'
             )
         ).scalar()
         
@@ -428,8 +460,7 @@ class ClassManagementService(BaseService):
         ).filter(
             and_(
                 Progress.student_id.in_(student_ids),
-                Progress.status == 'completed',
-                Progress.score.isnot(None)
+                Progress.status == 'completed'
             )
         ).group_by(Progress.student_id).order_by(desc('avg_score')).limit(limit).all()
         
@@ -2,17 +2,28 @@
 Dashboard service for aggregating data and analytics.
 """
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, desc, func, text
-from sqlalchemy.orm import joinedload
+from flask import current_app
+from sqlalchemy import Float, and_, or_, case, column, desc, func, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
 from app.extensions import db
 from app.models import (
     User, Exercise, Progress, Class, ClassEnrollment, 
-    ClassExerciseAssignment, ChatConversation, Notification, UploadedFile
+    ClassExerciseAssignment, ChatConversation, Notification, UploadedFile,
+    DailyActivityRollup
 )
 from app.services.base import BaseService
-from app.utils.cache import cache_key, get_cached_result, set_cached_result
+from app.services.achievement import AchievementService
+from app.utils.cache import (
+    CacheManager, cache_key, get_cached_result, get_cached_result_many, get_or_build_cached_result,
+    refresh_cached_result, set_cached_result_many
+)
+from app.utils.materialized_views import (
+    CLASS_STATS_MV, PLATFORM_STATS_MV, STUDENT_DASHBOARD_MV, is_postgresql, view_available
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,209 +31,363 @@ logger = logging.getLogger(__name__)
 class DashboardService(BaseService):
     """Service for generating dashboard data and analytics."""
     
+    # Cache lifetimes in seconds (student dashboards are cached per section)
+    STUDENT_DASHBOARD_TIMEOUT = 600
+    PROFESSOR_DASHBOARD_TIMEOUT = 900
+    ADMIN_DASHBOARD_TIMEOUT = 1800
+    
     @classmethod
     def get_student_dashboard(cls, student_id: str) -> Dict[str, Any]:
         """Get comprehensive dashboard data for a student."""
         try:
-            cache_key_name = cache_key('student_dashboard', student_id)
-            cached_data = get_cached_result(cache_key_name)
-            
-            if cached_data:
-                return cached_data
-            
-            # Basic student info
-            student = User.query.get(student_id)
-            if not student:
-                raise ValueError("Student not found")
+            return cls._build_student_dashboard(student_id)
             
+        except Exception as e:
+            logger.error(f"Error getting student dashboard for {student_id}: {str(e)}")
+            raise
+    
+    @classmethod
+    def _build_student_dashboard(cls, student_id: str) -> Dict[str, Any]:
+        """
+        Assemble the student dashboard from individually cached sections.
+        
+        Sections are fetched with a single multi-get; only missing ones are
+        recomputed and written back together, so progress and enrollment
+        writes can invalidate just the sections they affect.
+        """
+        # Basic student info
+        student = User.query.get(student_id)
+        if not student:
+            raise ValueError("Student not found")
+        
+        # One reference time for every section
+        now = datetime.utcnow()
+        
+        section_keys = CacheManager.student_dashboard_keys(student_id)
+        cached = get_cached_result_many(list(section_keys.values()))
+        sections = {
+            name: cached[key] for name, key in section_keys.items() if key in cached
+        }
+        
+        # Upcoming deadlines are a projection of the pending assignments
+        if 'upcoming_deadlines' not in sections:
+            sections.pop('pending_assignments', None)
+        
+        missing = {
             # Recent progress (last 7 days)
-            recent_progress = cls._get_recent_progress(student_id, days=7)
-            
+            'recent_progress': (cls._get_recent_progress, (student_id, 7, now)),
             # Class enrollments
-            enrolled_classes = cls._get_student_classes(student_id)
-            
+            'enrolled_classes': (cls._get_student_classes, (student_id,)),
             # Pending assignments
-            pending_assignments = cls._get_pending_assignments(student_id)
-            
+            'pending_assignments': (cls._get_pending_assignments, (student_id, now)),
             # Overall statistics
-            overall_stats = cls._get_student_overall_stats(student_id)
-            
+            'overall_stats': (cls._get_student_overall_stats, (student_id,)),
             # Recent chat activity
-            recent_chats = cls._get_recent_chat_activity(student_id)
-            
+            'recent_chats': (cls._get_recent_chat_activity, (student_id,)),
             # Achievements and streaks
-            achievements = cls._get_student_achievements(student_id)
-            
-            # Upcoming deadlines
-            upcoming_deadlines = cls._get_upcoming_deadlines(student_id)
-            
-            dashboard_data = {
-                'student_info': {
-                    'id': student.id,
-                    'name': student.full_name,
-                    'email': student.email,
-                    'joined_date': student.created_at.isoformat(),
-                    'last_active': recent_progress[0]['completed_at'] if recent_progress else None
-                },
-                'recent_progress': recent_progress,
-                'enrolled_classes': enrolled_classes,
-                'pending_assignments': pending_assignments,
-                'overall_stats': overall_stats,
-                'recent_chats': recent_chats,
-                'achievements': achievements,
-                'upcoming_deadlines': upcoming_deadlines,
-                'quick_stats': {
-                    'total_exercises_completed': overall_stats['total_completed'],
-                    'average_score': overall_stats['average_score'],
-                    'current_streak': achievements['current_streak'],
-                    'total_classes': len(enrolled_classes),
-                    'pending_assignments': len(pending_assignments)
-                }
+            'achievements': (cls._get_student_achievements, (student_id, None, now))
+        }
+        missing = {name: spec for name, spec in missing.items() if name not in sections}
+        
+        if missing:
+            if 'overall_stats' in missing or 'achievements' in missing:
+                # Stats written since the last view refresh are computed live
+                use_view = not get_cached_result(CacheManager.student_live_stats_key(student_id))
+                
+                # Stats row, read (or aggregated live) once and shared by the
+                # stats and streak sections; on failure each section retries on its own
+                try:
+                    stats_row = cls._get_student_stats_row(student_id, use_view)
+                except Exception as e:
+                    logger.error(f"Error getting stats row for {student_id}: {str(e)}")
+                    db.session.rollback()
+                    stats_row = None
+                if 'overall_stats' in missing:
+                    missing['overall_stats'] = (cls._get_student_overall_stats, (student_id, stats_row))
+                if 'achievements' in missing:
+                    missing['achievements'] = (cls._get_student_achievements, (student_id, stats_row, now))
+            
+            fresh = cls._run_sections(missing)
+            
+            if 'pending_assignments' in fresh:
+                fresh['upcoming_deadlines'] = cls._get_upcoming_deadlines(student_id, fresh['pending_assignments'], now)
+                fresh['pending_assignments'] = [cls._public_fields(a) for a in fresh['pending_assignments']]
+            
+            set_cached_result_many(
+                {section_keys[name]: value for name, value in fresh.items()},
+                timeout=cls.STUDENT_DASHBOARD_TIMEOUT
+            )
+            sections.update(fresh)
+        
+        recent_progress = sections['recent_progress']
+        enrolled_classes = sections['enrolled_classes']
+        pending_assignments = sections['pending_assignments']
+        overall_stats = sections['overall_stats']
+        recent_chats = sections['recent_chats']
+        achievements = sections['achievements']
+        upcoming_deadlines = sections['upcoming_deadlines']
+        
+        dashboard_data = {
+            'student_info': {
+                'id': student.id,
+                'name': student.full_name,
+                'email': student.email,
+                'joined_date': student.created_at.isoformat(),
+                'last_active': recent_progress[0]['completed_at'] if recent_progress else None
+            },
+            'recent_progress': recent_progress,
+            'enrolled_classes': enrolled_classes,
+            'pending_assignments': pending_assignments,
+            'overall_stats': overall_stats,
+            'recent_chats': recent_chats,
+            'achievements': achievements,
+            'upcoming_deadlines': upcoming_deadlines,
+            'quick_stats': {
+                'total_exercises_completed': overall_stats['total_completed'],
+                'average_score': overall_stats['average_score'],
+                'current_streak': achievements['current_streak'],
+                'total_classes': len(enrolled_classes),
+                'pending_assignments': len(pending_assignments)
             }
-            
-            # Cache for 10 minutes
-            set_cached_result(cache_key_name, dashboard_data, timeout=600)
-            return dashboard_data
-            
-        except Exception as e:
-            logger.error(f"Error getting student dashboard for {student_id}: {str(e)}")
-            raise
+        }
+        
+        return dashboard_data
     
     @classmethod
     def get_professor_dashboard(cls, professor_id: str) -> Dict[str, Any]:
         """Get comprehensive dashboard data for a professor."""
         try:
-            cache_key_name = cache_key('professor_dashboard', professor_id)
-            cached_data = get_cached_result(cache_key_name)
-            
-            if cached_data:
-                return cached_data
-            
-            # Basic professor info
-            professor = User.query.get(professor_id)
-            if not professor:
-                raise ValueError("Professor not found")
+            # Concurrent cache misses share a single rebuild
+            return get_or_build_cached_result(
+                CacheManager.professor_dashboard_key(professor_id),
+                lambda: cls._build_professor_dashboard(professor_id),
+                timeout=cls.PROFESSOR_DASHBOARD_TIMEOUT
+            )
             
+        except Exception as e:
+            logger.error(f"Error getting professor dashboard for {professor_id}: {str(e)}")
+            raise
+    
+    @classmethod
+    def _build_professor_dashboard(cls, professor_id: str) -> Dict[str, Any]:
+        """Aggregate the professor dashboard from its sections (uncached)."""
+        # Basic professor info
+        professor = User.query.get(professor_id)
+        if not professor:
+            raise ValueError("Professor not found")
+        
+        # One reference time for every section
+        now = datetime.utcnow()
+        
+        # Active students across the professor's classes, resolved once and
+        # shared as a concrete IN list by the sections that filter on them;
+        # on failure each of those sections resolves (and degrades) on its own
+        try:
+            student_ids = cls._get_professor_student_ids(professor_id)
+        except Exception as e:
+            logger.error(f"Error getting professor student IDs for {professor_id}: {str(e)}")
+            db.session.rollback()
+            student_ids = None
+        
+        # Class stats changed since the last view refresh are computed live
+        live_stats = bool(get_cached_result(CacheManager.professor_live_stats_key(professor_id)))
+        
+        sections = cls._run_sections({
             # Classes taught
-            classes_taught = cls._get_professor_classes(professor_id)
-            
+            'classes_taught': (cls._get_professor_classes, (professor_id, live_stats)),
             # Recent student activity across all classes
-            recent_activity = cls._get_professor_recent_activity(professor_id)
-            
+            'recent_activity': (cls._get_professor_recent_activity, (professor_id, now)),
             # Overall teaching statistics
-            teaching_stats = cls._get_professor_teaching_stats(professor_id)
-            
+            'teaching_stats': (cls._get_professor_teaching_stats, (professor_id, student_ids)),
             # Class performance analytics
-            class_analytics = cls._get_class_performance_analytics(professor_id)
-            
+            'class_analytics': (cls._get_class_performance_analytics, (professor_id, live_stats)),
             # Recent assignments
-            recent_assignments = cls._get_professor_recent_assignments(professor_id)
-            
+            'recent_assignments': (cls._get_professor_recent_assignments, (professor_id,)),
             # Student performance insights
-            student_insights = cls._get_student_performance_insights(professor_id)
-            
-            dashboard_data = {
-                'professor_info': {
-                    'id': professor.id,
-                    'name': professor.full_name,
-                    'email': professor.email,
-                    'total_classes': len(classes_taught),
-                    'total_students': teaching_stats['total_students']
-                },
-                'classes_taught': classes_taught,
-                'recent_activity': recent_activity,
-                'teaching_stats': teaching_stats,
-                'class_analytics': class_analytics,
-                'recent_assignments': recent_assignments,
-                'student_insights': student_insights,
-                'quick_stats': {
-                    'total_classes': teaching_stats['total_classes'],
-                    'total_students': teaching_stats['total_students'],
-                    'average_class_score': teaching_stats['average_class_score'],
-                    'total_assignments': teaching_stats['total_assignments'],
-                    'recent_submissions': len(recent_activity)
-                }
+            'student_insights': (cls._get_student_performance_insights, (professor_id, student_ids, now))
+        })
+        
+        classes_taught = sections['classes_taught']
+        recent_activity = sections['recent_activity']
+        teaching_stats = sections['teaching_stats']
+        class_analytics = sections['class_analytics']
+        recent_assignments = sections['recent_assignments']
+        student_insights = sections['student_insights']
+        
+        dashboard_data = {
+            'professor_info': {
+                'id': professor.id,
+                'name': professor.full_name,
+                'email': professor.email,
+                'total_classes': len(classes_taught),
+                'total_students': teaching_stats.get('total_students', 0)
+            },
+            'classes_taught': classes_taught,
+            'recent_activity': recent_activity,
+            'teaching_stats': teaching_stats,
+            'class_analytics': class_analytics,
+            'recent_assignments': recent_assignments,
+            'student_insights': student_insights,
+            'quick_stats': {
+                'total_classes': teaching_stats.get('total_classes', 0),
+                'total_students': teaching_stats.get('total_students', 0),
+                'average_class_score': teaching_stats.get('average_class_score', 0.0),
+                'total_assignments': teaching_stats.get('total_assignments', 0),
+                'recent_submissions': len(recent_activity)
             }
-            
-            # Cache for 15 minutes
-            set_cached_result(cache_key_name, dashboard_data, timeout=900)
-            return dashboard_data
-            
-        except Exception as e:
-            logger.error(f"Error getting professor dashboard for {professor_id}: {str(e)}")
-            raise
+        }
+        
+        return dashboard_data
     
     @classmethod
     def get_admin_dashboard(cls) -> Dict[str, Any]:
         """Get comprehensive dashboard data for administrators."""
         try:
-            cache_key_name = cache_key('admin_dashboard')
-            cached_data = get_cached_result(cache_key_name)
-            
-            if cached_data:
-                return cached_data
+            # Concurrent cache misses share a single rebuild
+            return get_or_build_cached_result(
+                cache_key('admin_dashboard'),
+                cls._build_admin_dashboard,
+                timeout=cls.ADMIN_DASHBOARD_TIMEOUT
+            )
             
+        except Exception as e:
+            logger.error(f"Error getting admin dashboard: {str(e)}")
+            raise
+    
+    @classmethod
+    def warm_admin_dashboard(cls) -> Dict[str, Any]:
+        """Rebuild the shared admin dashboard cache ahead of expiry."""
+        return refresh_cached_result(
+            cache_key('admin_dashboard'),
+            cls._build_admin_dashboard,
+            timeout=cls.ADMIN_DASHBOARD_TIMEOUT
+        )
+    
+    @classmethod
+    def _build_admin_dashboard(cls) -> Dict[str, Any]:
+        """Aggregate the admin dashboard from its sections (uncached)."""
+        # One reference time for every section
+        now = datetime.utcnow()
+        
+        sections = cls._run_sections({
             # Platform-wide statistics
-            platform_stats = cls._get_platform_statistics()
-            
+            'platform_stats': (cls._get_platform_statistics, ()),
             # User analytics
-            user_analytics = cls._get_user_analytics()
-            
+            'user_analytics': (cls._get_user_analytics, (now,)),
             # Activity trends
-            activity_trends = cls._get_activity_trends()
-            
+            'activity_trends': (cls._get_activity_trends, (now,)),
             # System health metrics
-            system_health = cls._get_system_health_metrics()
-            
+            'system_health': (cls._get_system_health_metrics, (now,)),
             # Popular content
-            popular_content = cls._get_popular_content()
-            
+            'popular_content': (cls._get_popular_content, ()),
             # Recent registrations
-            recent_registrations = cls._get_recent_registrations()
-            
-            dashboard_data = {
-                'platform_stats': platform_stats,
-                'user_analytics': user_analytics,
-                'activity_trends': activity_trends,
-                'system_health': system_health,
-                'popular_content': popular_content,
-                'recent_registrations': recent_registrations,
-                'quick_stats': {
-                    'total_users': platform_stats['total_users'],
-                    'total_exercises': platform_stats['total_exercises'],
-                    'total_classes': platform_stats['total_classes'],
-                    'daily_active_users': user_analytics['daily_active_users'],
-                    'completion_rate': platform_stats['completion_rate']
-                }
+            'recent_registrations': (cls._get_recent_registrations, (now,))
+        })
+        
+        platform_stats = sections['platform_stats']
+        user_analytics = sections['user_analytics']
+        activity_trends = sections['activity_trends']
+        system_health = sections['system_health']
+        popular_content = sections['popular_content']
+        recent_registrations = sections['recent_registrations']
+        
+        dashboard_data = {
+            'platform_stats': platform_stats,
+            'user_analytics': user_analytics,
+            'activity_trends': activity_trends,
+            'system_health': system_health,
+            'popular_content': popular_content,
+            'recent_registrations': recent_registrations,
+            'quick_stats': {
+                'total_users': platform_stats['total_users'],
+                'total_exercises': platform_stats['total_exercises'],
+                'total_classes': platform_stats['total_classes'],
+                'daily_active_users': user_analytics['daily_active_users'],
+                'completion_rate': platform_stats['completion_rate']
             }
-            
-            # Cache for 30 minutes
-            set_cached_result(cache_key_name, dashboard_data, timeout=1800)
-            return dashboard_data
-            
-        except Exception as e:
-            logger.error(f"Error getting admin dashboard: {str(e)}")
-            raise
+        }
+        
+        return dashboard_data
+    
+    @classmethod
+    def _run_sections(cls, sections: Dict[str, Tuple[Callable, tuple]]) -> Dict[str, Any]:
+        """
+        Compute independent dashboard sections, concurrently when enabled.
+        
+        Each worker pushes its own application context, so Flask-SQLAlchemy
+        gives it a separate scoped session (and pooled connection) that is
+        removed again when the context is torn down.
+        
+        Args:
+            sections: Mapping of section name to (callable, args)
+        
+        Returns:
+            Mapping of section name to the callable's result
+        """
+        max_workers = min(current_app.config.get('DASHBOARD_MAX_WORKERS', 6), len(sections))
+        
+        if max_workers <= 1:
+            return {name: func(*args) for name, (func, args) in sections.items()}
+        
+        app = current_app._get_current_object()
+        
+        def run_in_context(func, args):
+            with app.app_context():
+                return func(*args)
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard') as executor:
+            futures = {
+                name: executor.submit(run_in_context, func, args)
+                for name, (func, args) in sections.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
+    
+    @staticmethod
+    def _public_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop internal (underscore-prefixed) keys before caching or returning."""
+        return {key: value for key, value in item.items() if not key.startswith('_')}
+    
+    @staticmethod
+    def _lazy_load_guard() -> List[Any]:
+        """Loader options that make unplanned relationship lazy loads raise.
+        
+        Enabled with SQLALCHEMY_RAISE_ON_LAZY (on in testing) so a missing
+        eager load fails loudly instead of silently degrading into N+1 queries.
+        """
+        if current_app.config.get('SQLALCHEMY_RAISE_ON_LAZY', False):
+            return [raiseload('*')]
+        return []
     
     @classmethod
-    def _get_recent_progress(cls, student_id: str, days: int = 7) -> List[Dict[str, Any]]:
+    def _get_recent_progress(cls, student_id: str, days: int = 7,
+                             now: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Get recent progress for a student."""
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            
-            progress_items = Progress.query.filter(
+            cutoff_date = (now or datetime.utcnow()) - timedelta(days=days)
+            
+            # Only the displayed columns; no ORM entities are built
+            progress_items = db.session.query(
+                Progress.id,
+                Progress.exercise_id,
+                Progress.status,
+                Progress.score,
+                Progress.time_spent,
+                Progress.updated_at,
+                Progress.attempts,
+                Exercise.title.label('exercise_title')
+            ).outerjoin(
+                Exercise, Progress.exercise_id == Exercise.id
+            ).filter(
                 and_(
                     Progress.student_id == student_id,
                     Progress.updated_at >= cutoff_date
                 )
-            ).options(
-                joinedload(Progress.exercise)
             ).order_by(desc(Progress.updated_at)).limit(10).all()
             
             return [
                 {
                     'id': progress.id,
-                    'exercise_title': progress.exercise.title if progress.exercise else 'Unknown',
+                    'exercise_title': progress.exercise_title or 'Unknown',
                     'exercise_id': progress.exercise_id,
                     'status': progress.status,
                     'score': progress.score,
@@ -247,29 +412,44 @@ class DashboardService(BaseService):
                     ClassEnrollment.enrollment_status == 'active'
                 )
             ).options(
-                joinedload(ClassEnrollment.class_obj),
-                joinedload(ClassEnrollment.class_obj.professor)
+                load_only(ClassEnrollment.class_id, ClassEnrollment.enrolled_at),
+                # Batched IN loads avoid repeating class/professor columns per row
+                selectinload(ClassEnrollment.class_obj).load_only(
+                    Class.name, Class.subject, Class.class_code, Class.is_active, Class.professor_id
+                ).selectinload(Class.professor).load_only(User.email, User.profile_data),
+                *cls._lazy_load_guard()
             ).all()
             
-            classes = []
-            for enrollment in enrollments:
-                class_obj = enrollment.class_obj
-                if class_obj and class_obj.is_active:
-                    # Get assignment stats for this class
-                    total_assignments = ClassExerciseAssignment.query.filter(
-                        ClassExerciseAssignment.class_id == class_obj.id
-                    ).count()
-                    
-                    completed_assignments = db.session.query(Progress).join(
-                        ClassExerciseAssignment,
-                        Progress.exercise_id == ClassExerciseAssignment.exercise_id
-                    ).filter(
+            # Assignment totals and this student's completions for every class at once
+            # (progress is unique per student/exercise, so the outer join adds no rows)
+            class_ids = [enrollment.class_id for enrollment in enrollments]
+            assignment_stats = {}
+            if class_ids:
+                assignment_stats = {
+                    row.class_id: row
+                    for row in db.session.query(
+                        ClassExerciseAssignment.class_id,
+                        func.count(ClassExerciseAssignment.id).label('total'),
+                        func.count(Progress.id).label('completed')
+                    ).outerjoin(
+                        Progress,
                         and_(
-                            ClassExerciseAssignment.class_id == class_obj.id,
+                            Progress.exercise_id == ClassExerciseAssignment.exercise_id,
                             Progress.student_id == student_id,
                             Progress.status == 'completed'
                         )
-                    ).count()
+                    ).filter(
+                        ClassExerciseAssignment.class_id.in_(class_ids)
+                    ).group_by(ClassExerciseAssignment.class_id).all()
+                }
+            
+            classes = []
+            for enrollment in enrollments:
+                class_obj = enrollment.class_obj
+                if class_obj and class_obj.is_active:
+                    stats = assignment_stats.get(class_obj.id)
+                    total_assignments = stats.total if stats else 0
+                    completed_assignments = stats.completed if stats else 0
                     
                     classes.append({
                         'id': class_obj.id,
@@ -290,97 +470,78 @@ class DashboardService(BaseService):
             return []
     
     @classmethod
-    def _get_pending_assignments(cls, student_id: str) -> List[Dict[str, Any]]:
+    def _get_pending_assignments(cls, student_id: str, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Get pending assignments for a student."""
         try:
-            # Get all assignments for classes the student is enrolled in
+            # Exercises this student has already completed
+            completed = db.session.query(Progress.exercise_id).filter(
+                and_(
+                    Progress.student_id == student_id,
+                    Progress.status == 'completed'
+                )
+            ).subquery()
+
+            # Assignments in the student's active classes with no completed
+            # progress row (anti-join), ordered by due date with undated last
+            # (matches the due_date index order on PostgreSQL)
             assignments = db.session.query(ClassExerciseAssignment).join(
                 ClassEnrollment,
                 ClassExerciseAssignment.class_id == ClassEnrollment.class_id
+            ).outerjoin(
+                completed,
+                completed.c.exercise_id == ClassExerciseAssignment.exercise_id
             ).filter(
                 and_(
                     ClassEnrollment.student_id == student_id,
-                    ClassEnrollment.enrollment_status == 'active'
+                    ClassEnrollment.enrollment_status == 'active',
+                    completed.c.exercise_id.is_(None)
                 )
             ).options(
                 joinedload(ClassExerciseAssignment.exercise),
-                joinedload(ClassExerciseAssignment.class_obj)
+                # Few distinct classes across many assignments: load them once by IN
+                selectinload(ClassExerciseAssignment.class_obj),
+                *cls._lazy_load_guard()
+            ).order_by(
+                ClassExerciseAssignment.due_date.asc().nullslast()
             ).all()
-            
-            pending = []
-            for assignment in assignments:
-                # Check if student has completed this exercise
-                progress = Progress.query.filter(
-                    and_(
-                        Progress.student_id == student_id,
-                        Progress.exercise_id == assignment.exercise_id,
-                        Progress.status == 'completed'
-                    )
-                ).first()
-                
-                if not progress:  # Not completed yet
-                    pending.append({
-                        'assignment_id': assignment.id,
-                        'exercise_id': assignment.exercise_id,
-                        'exercise_title': assignment.exercise.title if assignment.exercise else 'Unknown',
-                        'class_name': assignment.class_obj.name if assignment.class_obj else 'Unknown',
-                        'class_id': assignment.class_id,
-                        'due_date': assignment.due_date.isoformat() if assignment.due_date else None,
-                        'is_overdue': assignment.due_date < datetime.utcnow() if assignment.due_date else False,
-                        'assigned_date': assignment.assigned_at.isoformat(),
-                        'is_mandatory': assignment.is_mandatory
-                    })
-            
-            # Sort by due date (overdue first, then by due date)
-            pending.sort(key=lambda x: (
-                x['due_date'] is None,  # None dates go last
-                x['due_date'] if x['due_date'] else '9999-12-31'
-            ))
-            
-            return pending
+
+            now = now or datetime.utcnow()
+            return [
+                {
+                    'assignment_id': assignment.id,
+                    'exercise_id': assignment.exercise_id,
+                    'exercise_title': assignment.exercise.title if assignment.exercise else 'Unknown',
+                    'class_name': assignment.class_obj.name if assignment.class_obj else 'Unknown',
+                    'class_id': assignment.class_id,
+                    'due_date': assignment.due_date.isoformat() if assignment.due_date else None,
+                    '_due_date_dt': assignment.due_date,
+                    'is_overdue': assignment.due_date < now if assignment.due_date else False,
+                    'assigned_date': assignment.assigned_at.isoformat(),
+                    'is_mandatory': assignment.is_mandatory
+                }
+                for assignment in assignments
+            ]
             
         except Exception as e:
             logger.error(f"Error getting pending assignments for {student_id}: {str(e)}")
             return []
     
     @classmethod
-    def _get_student_overall_stats(cls, student_id: str) -> Dict[str, Any]:
-        """Get overall statistics for a student."""
+    def _get_student_overall_stats(cls, student_id: str, stats_row=None) -> Dict[str, Any]:
+        """Get overall statistics for a student.
+        
+        ``stats_row`` is an already-fetched ``_get_student_stats_row`` result;
+        it is fetched here when omitted.
+        """
         try:
-            # Total exercises attempted and completed
-            total_attempted = Progress.query.filter(
-                Progress.student_id == student_id
-            ).count()
-            
-            total_completed = Progress.query.filter(
-                and_(
-                    Progress.student_id == student_id,
-                    Progress.status == 'completed'
-                )
-            ).count()
-            
-            # Average score
-            avg_score = db.session.query(func.avg(Progress.score)).filter(
-                and_(
-                    Progress.student_id == student_id,
-                    Progress.status == 'completed',
-                    Progress.score.isnot(None)
-                )
-            ).scalar()
-            
-            # Total time spent
-            total_time = db.session.query(func.sum(Progress.time_spent)).filter(
-                Progress.student_id == student_id
-            ).scalar()
-            
-            # Best score
-            best_score = db.session.query(func.max(Progress.score)).filter(
-                and_(
-                    Progress.student_id == student_id,
-                    Progress.status == 'completed'
-                )
-            ).scalar()
-            
+            row = stats_row if stats_row is not None else cls._get_student_stats_row(student_id)
+
+            total_attempted = row.attempted or 0
+            total_completed = row.completed or 0
+            avg_score = row.avg_score
+            total_time = row.total_time
+            best_score = row.best_score
+
             return {
                 'total_attempted': total_attempted,
                 'total_completed': total_completed,
@@ -394,11 +555,86 @@ class DashboardService(BaseService):
             logger.error(f"Error getting overall stats for {student_id}: {str(e)}")
             return {}
     
+    @classmethod
+    def _get_student_stats_row(cls, student_id: str, use_view: bool = True):
+        """
+        Get a student's stats row with the student dashboard view's columns.
+        
+        Prefers the precomputed view (unless ``use_view`` is False); otherwise
+        the same counters and streaks are aggregated live in one statement.
+        Consecutive completion days are grouped in SQL (gaps-and-islands):
+        subtracting a day's row number from its date yields the same value for
+        every day in an unbroken run.
+        """
+        row = cls._get_student_dashboard_view_row(student_id) if use_view else None
+        if row is not None:
+            return row
+        
+        return db.session.execute(text("""
+            WITH dates AS (
+                SELECT DISTINCT updated_date AS d
+                FROM progress
+                WHERE student_id = :student_id AND status = 'completed'
+            ),
+            grouped AS (
+                SELECT d, d - CAST(ROW_NUMBER() OVER (ORDER BY d) AS INTEGER) AS grp
+                FROM dates
+            ),
+            islands AS (
+                SELECT COUNT(*) AS cnt, MAX(d) AS last_day
+                FROM grouped
+                GROUP BY grp
+            )
+            SELECT
+                stats.attempted,
+                stats.completed,
+                stats.avg_score,
+                stats.best_score,
+                stats.total_time,
+                COALESCE((SELECT MAX(cnt) FROM islands), 0) AS longest_streak,
+                COALESCE((SELECT cnt FROM islands ORDER BY last_day DESC LIMIT 1), 0) AS latest_streak,
+                (SELECT MAX(last_day) FROM islands) AS latest_streak_day
+            FROM (
+                SELECT
+                    COUNT(*) AS attempted,
+                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed,
+                    AVG(CASE WHEN status = 'completed' THEN score END) AS avg_score,
+                    MAX(CASE WHEN status = 'completed' THEN score END) AS best_score,
+                    SUM(time_spent) AS total_time
+                FROM progress
+                WHERE student_id = :student_id
+            ) AS stats
+        """), {'student_id': student_id}).one()
+    
+    @classmethod
+    def _get_student_dashboard_view_row(cls, student_id: str):
+        """Get a student's precomputed stats row, or None if unavailable."""
+        try:
+            if not view_available(STUDENT_DASHBOARD_MV):
+                return None
+            
+            return db.session.execute(
+                text(f"SELECT * FROM {STUDENT_DASHBOARD_MV} WHERE student_id = :student_id"),
+                {'student_id': student_id}
+            ).first()
+            
+        except Exception as e:
+            logger.error(f"Error reading {STUDENT_DASHBOARD_MV} for {student_id}: {str(e)}")
+            db.session.rollback()
+            return None
+    
     @classmethod
     def _get_recent_chat_activity(cls, student_id: str) -> List[Dict[str, Any]]:
         """Get recent chat activity for a student."""
         try:
-            conversations = ChatConversation.query.filter(
+            # Count messages in SQL rather than loading each JSONB message array
+            conversations = db.session.query(
+                ChatConversation.id,
+                ChatConversation.title,
+                func.coalesce(func.jsonb_array_length(ChatConversation.messages), 0).label('message_count'),
+                ChatConversation.updated_at,
+                ChatConversation.context['context_type'].astext.label('context_type')
+            ).filter(
                 ChatConversation.user_id == student_id
             ).order_by(desc(ChatConversation.updated_at)).limit(5).all()
             
@@ -406,9 +642,9 @@ class DashboardService(BaseService):
                 {
                     'id': conv.id,
                     'title': conv.title,
-                    'message_count': len(conv.messages) if hasattr(conv, 'messages') else 0,
+                    'message_count': conv.message_count,
                     'last_activity': conv.updated_at.isoformat(),
-                    'context_type': conv.context_type
+                    'context_type': conv.context_type or 'general'
                 }
                 for conv in conversations
             ]
@@ -418,14 +654,12 @@ class DashboardService(BaseService):
             return []
     
     @classmethod
-    def _get_student_achievements(cls, student_id: str) -> Dict[str, Any]:
+    def _get_student_achievements(cls, student_id: str, stats_row=None,
+                                  now: Optional[datetime] = None) -> Dict[str, Any]:
         """Get achievements and streaks for a student."""
         try:
-            # Calculate current streak (consecutive days with completed exercises)
-            current_streak = cls._calculate_streak(student_id)
-            
-            # Longest streak
-            longest_streak = cls._calculate_longest_streak(student_id)
+            # Current and longest streaks (consecutive days with completed exercises)
+            current_streak, longest_streak = cls._calculate_streaks(student_id, stats_row, now)
             
             # Other achievements
             achievements = {
@@ -441,69 +675,83 @@ class DashboardService(BaseService):
             return {'current_streak': 0, 'longest_streak': 0, 'badges': []}
     
     @classmethod
-    def _get_upcoming_deadlines(cls, student_id: str) -> List[Dict[str, Any]]:
-        """Get upcoming assignment deadlines."""
+    def _get_upcoming_deadlines(cls, student_id: str,
+                                pending_assignments: Optional[List[Dict[str, Any]]] = None,
+                                now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Get upcoming assignment deadlines.
+        
+        Args:
+            student_id: Student ID
+            pending_assignments: Already-loaded result of ``_get_pending_assignments``
+                (fetched when omitted)
+            now: Reference time (defaults to the current UTC time)
+        """
         try:
-            upcoming = []
-            pending_assignments = cls._get_pending_assignments(student_id)
+            now = now or datetime.utcnow()
+            if pending_assignments is None:
+                pending_assignments = cls._get_pending_assignments(student_id, now)
             
+            # Pending assignments arrive ordered by due date
+            upcoming = []
             for assignment in pending_assignments:
-                if assignment['due_date']:
-                    due_date = datetime.fromisoformat(assignment['due_date'].replace('Z', '+00:00'))
-                    days_until_due = (due_date - datetime.utcnow()).days
+                due_date = assignment.get('_due_date_dt')
+                if due_date:
+                    days_until_due = (due_date - now).days
                     
                     if days_until_due <= 7:  # Next 7 days
                         upcoming.append({
-                            **assignment,
+                            **cls._public_fields(assignment),
                             'days_until_due': days_until_due
                         })
             
-            return sorted(upcoming, key=lambda x: x['due_date'])
+            return upcoming
             
         except Exception as e:
             logger.error(f"Error getting upcoming deadlines for {student_id}: {str(e)}")
             return []
     
     @classmethod
-    def _get_professor_classes(cls, professor_id: str) -> List[Dict[str, Any]]:
+    def _get_professor_classes(cls, professor_id: str, live_stats: bool = False) -> List[Dict[str, Any]]:
         """Get classes taught by a professor."""
         try:
-            classes = Class.query.filter(
+            stats = cls._class_stats_source(professor_id, live_stats)
+            
+            classes = db.session.query(
+                Class.id,
+                Class.name,
+                Class.subject,
+                Class.class_code,
+                Class.max_students,
+                Class.created_at,
+                func.coalesce(stats.c.student_count, 0).label('enrollment_count'),
+                func.coalesce(stats.c.assignment_count, 0).label('assignment_count'),
+                stats.c.average_performance
+            ).outerjoin(
+                stats, stats.c.class_id == Class.id
+            ).filter(
                 and_(
                     Class.professor_id == professor_id,
                     Class.is_active == True
                 )
             ).all()
             
-            class_data = []
-            for class_obj in classes:
-                # Get enrollment count
-                enrollment_count = ClassEnrollment.query.filter(
-                    and_(
-                        ClassEnrollment.class_id == class_obj.id,
-                        ClassEnrollment.enrollment_status == 'active'
-                    )
-                ).count()
-                
-                # Get assignment count
-                assignment_count = ClassExerciseAssignment.query.filter(
-                    ClassExerciseAssignment.class_id == class_obj.id
-                ).count()
-                
-                # Get average class performance
-                avg_performance = cls._get_class_average_performance(class_obj.id)
-                
-                class_data.append({
-                    'id': class_obj.id,
-                    'name': class_obj.name,
-                    'subject': class_obj.subject,
-                    'class_code': class_obj.class_code,
-                    'enrollment_count': enrollment_count,
-                    'max_students': class_obj.max_students,
-                    'assignment_count': assignment_count,
-                    'average_performance': avg_performance,
-                    'created_at': class_obj.created_at.isoformat()
-                })
+            class_data = [
+                {
+                    'id': class_row.id,
+                    'name': class_row.name,
+                    'subject': class_row.subject,
+                    'class_code': class_row.class_code,
+                    'enrollment_count': class_row.enrollment_count,
+                    'max_students': class_row.max_students,
+                    'assignment_count': class_row.assignment_count,
+                    'average_performance': (
+                        round(class_row.average_performance, 2) if class_row.average_performance else 0.0
+                    ),
+                    'created_at': class_row.created_at.isoformat()
+                }
+                for class_row in classes
+            ]
             
             return class_data
             
@@ -512,152 +760,190 @@ class DashboardService(BaseService):
             return []
     
     @classmethod
-    def _calculate_streak(cls, student_id: str) -> int:
-        """Calculate current consecutive day streak."""
-        try:
-            # Get dates with completed exercises in reverse chronological order
-            completed_dates = db.session.query(
-                func.date(Progress.updated_at).label('date')
-            ).filter(
-                and_(
-                    Progress.student_id == student_id,
-                    Progress.status == 'completed'
-                )
-            ).distinct().order_by(desc('date')).all()
-            
-            if not completed_dates:
-                return 0
-            
-            # Count consecutive days starting from today
-            streak = 0
-            current_date = datetime.utcnow().date()
-            
-            for date_row in completed_dates:
-                if date_row.date == current_date:
-                    streak += 1
-                    current_date -= timedelta(days=1)
-                elif date_row.date == current_date - timedelta(days=1):
-                    streak += 1
-                    current_date = date_row.date - timedelta(days=1)
-                else:
-                    break
-            
-            return streak
-            
-        except Exception as e:
-            logger.error(f"Error calculating streak for {student_id}: {str(e)}")
-            return 0
+    def _class_stats_source(cls, professor_id: str, live: bool = False):
+        """
+        Per-class stats to outer join on ``class_id``.
+        
+        Reads the precomputed class stats view when available and ``live`` is
+        not set, otherwise combines the live aggregates over the professor's
+        active classes.
+        Either way the columns are ``class_id``, ``student_count``,
+        ``assignment_count``, ``average_performance`` and ``total_completions``.
+        """
+        if not live and view_available(CLASS_STATS_MV):
+            return table(
+                CLASS_STATS_MV,
+                column('class_id'),
+                column('student_count'),
+                column('assignment_count'),
+                column('average_performance'),
+                column('total_completions')
+            )
+        
+        stats = cls._professor_class_stats_subqueries(professor_id)
+        enrollment_counts = stats['enrollment_counts']
+        assignment_counts = stats['assignment_counts']
+        performance = stats['performance']
+        completions = stats['completions']
+        
+        return db.session.query(
+            Class.id.label('class_id'),
+            enrollment_counts.c.enrollment_count.label('student_count'),
+            assignment_counts.c.assignment_count,
+            performance.c.average_performance,
+            completions.c.total_completions
+        ).outerjoin(
+            enrollment_counts, enrollment_counts.c.class_id == Class.id
+        ).outerjoin(
+            assignment_counts, assignment_counts.c.class_id == Class.id
+        ).outerjoin(
+            performance, performance.c.class_id == Class.id
+        ).outerjoin(
+            completions, completions.c.class_id == Class.id
+        ).filter(
+            and_(
+                Class.professor_id == professor_id,
+                Class.is_active == True
+            )
+        ).subquery()
     
     @classmethod
-    def _calculate_longest_streak(cls, student_id: str) -> int:
-        """Calculate longest consecutive day streak ever achieved."""
-        try:
-            # This is a simplified version - in production you might want to cache this
-            # Get all unique dates with completions
-            completed_dates = db.session.query(
-                func.date(Progress.updated_at).label('date')
-            ).filter(
-                and_(
-                    Progress.student_id == student_id,
-                    Progress.status == 'completed'
-                )
-            ).distinct().order_by('date').all()
-            
-            if not completed_dates:
-                return 0
-            
-            longest_streak = 1
-            current_streak = 1
-            
-            for i in range(1, len(completed_dates)):
-                current_date = completed_dates[i].date
-                prev_date = completed_dates[i-1].date
-                
-                if current_date == prev_date + timedelta(days=1):
-                    current_streak += 1
-                    longest_streak = max(longest_streak, current_streak)
-                else:
-                    current_streak = 1
-            
-            return longest_streak
-            
-        except Exception as e:
-            logger.error(f"Error calculating longest streak for {student_id}: {str(e)}")
-            return 0
+    def _professor_class_stats_subqueries(cls, professor_id: str) -> Dict[str, Any]:
+        """
+        Per-class aggregate subqueries over a professor's active classes.
+        
+        Each aggregate is grouped by ``class_id`` on its own so that joining
+        them to ``Class`` never multiplies rows (a flat enrollment/assignment/
+        progress join would skew both the counts and the score average).
+        
+        Returns:
+            Mapping of name to subquery, each exposing ``class_id``:
+            ``enrollment_counts``, ``assignment_counts``, ``performance`` and
+            ``completions``
+        """
+        professor_class_ids = db.session.query(Class.id).filter(
+            and_(
+                Class.professor_id == professor_id,
+                Class.is_active == True
+            )
+        ).scalar_subquery()
+        
+        enrollment_counts = db.session.query(
+            ClassEnrollment.class_id,
+            func.count(ClassEnrollment.id).filter(
+                ClassEnrollment.enrollment_status == 'active'
+            ).label('enrollment_count')
+        ).filter(
+            ClassEnrollment.class_id.in_(professor_class_ids)
+        ).group_by(ClassEnrollment.class_id).subquery()
+        
+        assignment_counts = db.session.query(
+            ClassExerciseAssignment.class_id,
+            func.count(ClassExerciseAssignment.id).label('assignment_count')
+        ).filter(
+            ClassExerciseAssignment.class_id.in_(professor_class_ids)
+        ).group_by(ClassExerciseAssignment.class_id).subquery()
+        
+        performance = db.session.query(
+            ClassEnrollment.class_id,
+            func.avg(Progress.score).filter(
+                Progress.status == 'completed'
+            ).label('average_performance')
+        ).join(
+            Progress, Progress.student_id == ClassEnrollment.student_id
+        ).filter(
+            and_(
+                ClassEnrollment.class_id.in_(professor_class_ids),
+                ClassEnrollment.enrollment_status == 'active'
+            )
+        ).group_by(ClassEnrollment.class_id).subquery()
+        
+        # Completed assigned exercises by students actively enrolled in the class
+        completions = db.session.query(
+            ClassExerciseAssignment.class_id,
+            func.count(Progress.id).label('total_completions')
+        ).join(
+            Progress, Progress.exercise_id == ClassExerciseAssignment.exercise_id
+        ).join(
+            ClassEnrollment,
+            and_(
+                ClassEnrollment.student_id == Progress.student_id,
+                ClassEnrollment.class_id == ClassExerciseAssignment.class_id
+            )
+        ).filter(
+            and_(
+                ClassExerciseAssignment.class_id.in_(professor_class_ids),
+                ClassEnrollment.enrollment_status == 'active',
+                Progress.status == 'completed'
+            )
+        ).group_by(ClassExerciseAssignment.class_id).subquery()
+        
+        return {
+            'enrollment_counts': enrollment_counts,
+            'assignment_counts': assignment_counts,
+            'performance': performance,
+            'completions': completions
+        }
     
     @classmethod
-    def _get_student_badges(cls, student_id: str) -> List[Dict[str, Any]]:
-        """Get badges/achievements for a student."""
-        badges = []
+    def _calculate_streaks(cls, student_id: str, stats_row=None,
+                           now: Optional[datetime] = None) -> Tuple[int, int]:
+        """Calculate current and longest consecutive day streaks.
         
+        ``stats_row`` is an already-fetched ``_get_student_stats_row`` result;
+        it is fetched here when omitted. The latest run only counts as the
+        current streak if it reached yesterday or today.
+        """
         try:
-            # Get completion stats
-            stats = cls._get_student_overall_stats(student_id)
-            
-            # First completion badge
-            if stats['total_completed'] >= 1:
-                badges.append({
-                    'name': 'First Steps',
-                    'description': 'Completed your first exercise',
-                    'icon': '🎯',
-                    'earned_at': 'Recently'
-                })
-            
-            # High achiever badges
-            if stats['average_score'] >= 90:
-                badges.append({
-                    'name': 'High Achiever',
-                    'description': 'Maintain 90%+ average score',
-                    'icon': '⭐',
-                    'earned_at': 'Recently'
-                })
-            
-            # Volume badges
-            if stats['total_completed'] >= 10:
-                badges.append({
-                    'name': 'Dedicated Learner',
-                    'description': 'Completed 10+ exercises',
-                    'icon': '📚',
-                    'earned_at': 'Recently'
-                })
-            
-            if stats['total_completed'] >= 50:
-                badges.append({
-                    'name': 'Math Champion',
-                    'description': 'Completed 50+ exercises',
-                    'icon': '🏆',
-                    'earned_at': 'Recently'
-                })
+            yesterday = (now or datetime.utcnow()).date() - timedelta(days=1)
             
-            return badges
+            row = stats_row if stats_row is not None else cls._get_student_stats_row(student_id)
+            latest_streak_day = cls._as_date(row.latest_streak_day)
+            is_current = latest_streak_day is not None and latest_streak_day >= yesterday
+            return (row.latest_streak if is_current else 0), row.longest_streak or 0
             
         except Exception as e:
-            logger.error(f"Error getting badges for {student_id}: {str(e)}")
-            return []
+            logger.error(f"Error calculating streaks for {student_id}: {str(e)}")
+            return 0, 0
+    
+    @classmethod
+    def _get_student_badges(cls, student_id: str) -> List[Dict[str, Any]]:
+        """Get badges/achievements for a student (precomputed on progress writes)."""
+        return AchievementService.get_student_achievements(student_id)
     
     @classmethod
     def _get_platform_statistics(cls) -> Dict[str, Any]:
         """Get platform-wide statistics."""
         try:
-            total_users = User.query.count()
-            total_students = User.query.filter(User.role == 'student').count()
-            total_professors = User.query.filter(User.role == 'professor').count()
-            total_exercises = Exercise.query.count()
-            total_classes = Class.query.filter(Class.is_active == True).count()
-            total_progress = Progress.query.count()
-            total_completed = Progress.query.filter(Progress.status == 'completed').count()
+            # Served from the periodically refreshed view when available
+            stats = cls._get_platform_stats_view_row()
+            
+            if stats is not None:
+                total_users = stats['total_users']
+                total_students = stats['total_students']
+                total_professors = stats['total_professors']
+                total_exercises = stats['total_exercises']
+                total_classes = stats['total_classes']
+                total_progress = stats['total_progress']
+                total_completed = stats['total_completed'] or 0
+                avg_score = stats['avg_score']
+            else:
+                total_users = User.query.count()
+                total_students = User.query.filter(User.role == 'student').count()
+                total_professors = User.query.filter(User.role == 'professor').count()
+                total_exercises = Exercise.query.count()
+                total_classes = Class.query.filter(Class.is_active == True).count()
+                total_progress = Progress.query.count()
+                total_completed = Progress.query.filter(Progress.status == 'completed').count()
+                
+                # Average score across platform
+                avg_score = db.session.query(func.avg(Progress.score)).filter(
+                    Progress.status == 'completed'
+                ).scalar()
             
             # Completion rate
             completion_rate = (total_completed / total_progress * 100) if total_progress > 0 else 0
             
-            # Average score across platform
-            avg_score = db.session.query(func.avg(Progress.score)).filter(
-                and_(
-                    Progress.status == 'completed',
-                    Progress.score.isnot(None)
-                )
-            ).scalar()
-            
             return {
                 'total_users': total_users,
                 'total_students': total_students,
@@ -675,34 +961,43 @@ class DashboardService(BaseService):
             return {}
     
     @classmethod
-    def _get_user_analytics(cls) -> Dict[str, Any]:
-        """Get user analytics and activity patterns."""
+    def _get_platform_stats_view_row(cls) -> Optional[Dict[str, Any]]:
+        """Get the precomputed platform counters, or None if unavailable."""
         try:
-            # Daily active users (last 24 hours)
-            daily_active = User.query.filter(
-                User.last_login >= datetime.utcnow() - timedelta(days=1)
-            ).count()
+            if not view_available(PLATFORM_STATS_MV):
+                return None
             
-            # Weekly active users
-            weekly_active = User.query.filter(
-                User.last_login >= datetime.utcnow() - timedelta(days=7)
-            ).count()
+            return db.session.execute(
+                text(f"SELECT * FROM {PLATFORM_STATS_MV}")
+            ).mappings().first()
             
-            # Monthly active users
-            monthly_active = User.query.filter(
-                User.last_login >= datetime.utcnow() - timedelta(days=30)
-            ).count()
-            
-            # New registrations this week
-            new_users_week = User.query.filter(
-                User.created_at >= datetime.utcnow() - timedelta(days=7)
-            ).count()
+        except Exception as e:
+            logger.error(f"Error reading {PLATFORM_STATS_MV}: {str(e)}")
+            db.session.rollback()
+            return None
+    
+    @classmethod
+    def _get_user_analytics(cls, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get user analytics and activity patterns."""
+        try:
+            now = now or datetime.utcnow()
+            day_ago = now - timedelta(days=1)
+            week_ago = now - timedelta(days=7)
+            month_ago = now - timedelta(days=30)
+            
+            # Daily/weekly/monthly active users and new registrations in one pass
+            row = db.session.query(
+                func.sum(case((User.last_login >= day_ago, 1), else_=0)).label('daily_active'),
+                func.sum(case((User.last_login >= week_ago, 1), else_=0)).label('weekly_active'),
+                func.sum(case((User.last_login >= month_ago, 1), else_=0)).label('monthly_active'),
+                func.sum(case((User.created_at >= week_ago, 1), else_=0)).label('new_users_week')
+            ).one()
             
             return {
-                'daily_active_users': daily_active,
-                'weekly_active_users': weekly_active,
-                'monthly_active_users': monthly_active,
-                'new_users_this_week': new_users_week
+                'daily_active_users': row.daily_active or 0,
+                'weekly_active_users': row.weekly_active or 0,
+                'monthly_active_users': row.monthly_active or 0,
+                'new_users_this_week': row.new_users_week or 0
             }
             
         except Exception as e:
@@ -710,38 +1005,34 @@ class DashboardService(BaseService):
             return {}
     
     @classmethod
-    def _get_activity_trends(cls) -> Dict[str, Any]:
+    def _get_activity_trends(cls, now: Optional[datetime] = None) -> Dict[str, Any]:
         """Get activity trends over time."""
         try:
-            # Exercise completions per day (last 30 days)
-            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+            # Exercise completions and registrations per day (last 30 days),
+            # one entry per day with zeros for days without activity
+            end_date = (now or datetime.utcnow()).date()
+            start_date = end_date - timedelta(days=30)
             
-            daily_completions = db.session.query(
-                func.date(Progress.updated_at).label('date'),
-                func.count(Progress.id).label('count')
-            ).filter(
-                and_(
-                    Progress.status == 'completed',
-                    Progress.updated_at >= thirty_days_ago
-                )
-            ).group_by(func.date(Progress.updated_at)).all()
+            days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
             
-            # User registrations per day (last 30 days)
-            daily_registrations = db.session.query(
-                func.date(User.created_at).label('date'),
-                func.count(User.id).label('count')
-            ).filter(
-                User.created_at >= thirty_days_ago
-            ).group_by(func.date(User.created_at)).all()
+            # Days the roll-up has not covered yet (all of them before its
+            # first run) are counted live rather than reported as zero
+            counts = cls._get_rollup_activity(start_date, end_date)
+            missing = [day for day in days if day not in counts]
+            if missing:
+                for day, completions, registrations in cls._count_daily_activity(missing[0], missing[-1]):
+                    counts.setdefault(day, (completions, registrations))
+            
+            series = [(day, *counts[day]) for day in days]
             
             return {
                 'daily_completions': [
-                    {'date': row.date.isoformat(), 'count': row.count}
-                    for row in daily_completions
+                    {'date': day.isoformat(), 'count': completions}
+                    for day, completions, _ in series
                 ],
                 'daily_registrations': [
-                    {'date': row.date.isoformat(), 'count': row.count}
-                    for row in daily_registrations
+                    {'date': day.isoformat(), 'count': registrations}
+                    for day, _, registrations in series
                 ]
             }
             
@@ -750,32 +1041,181 @@ class DashboardService(BaseService):
             return {}
     
     @classmethod
-    def _get_system_health_metrics(cls) -> Dict[str, Any]:
+    def _get_rollup_activity(cls, start_date, end_date) -> Dict[Any, Tuple[int, int]]:
+        """
+        Read the daily roll-up as ``{date: (completions, registrations)}`` for
+        the days in the range it has covered.
+        """
+        rows = db.session.query(
+            DailyActivityRollup.date,
+            DailyActivityRollup.completions,
+            DailyActivityRollup.registrations
+        ).filter(
+            DailyActivityRollup.date.between(start_date, end_date)
+        ).all()
+        
+        return {
+            cls._as_date(row.date): (row.completions, row.registrations) for row in rows
+        }
+    
+    @classmethod
+    def _count_daily_activity(cls, start_date, end_date) -> List[Tuple[Any, int, int]]:
+        """
+        Count completions and registrations per day from ``start_date`` to
+        ``end_date`` as a gap-free ``(date, completions, registrations)`` series.
+        
+        On PostgreSQL the days come from ``generate_series`` joined to both
+        aggregates, so exactly one row per day leaves the database.
+        """
+        start = datetime.combine(start_date, datetime.min.time())
+        
+        if is_postgresql():
+            return [tuple(row) for row in db.session.execute(text("""
+                SELECT
+                    CAST(d AS DATE) AS date,
+                    COALESCE(c.count, 0) AS completions,
+                    COALESCE(r.count, 0) AS registrations
+                FROM generate_series(CAST(:start_date AS DATE), CAST(:end_date AS DATE), INTERVAL '1 day') AS d
+                LEFT JOIN (
+                    SELECT updated_date AS date, COUNT(*) AS count
+                    FROM progress
+                    WHERE status = 'completed' AND updated_date >= :start_date
+                    GROUP BY updated_date
+                ) c ON c.date = CAST(d AS DATE)
+                LEFT JOIN (
+                    SELECT CAST(created_at AS DATE) AS date, COUNT(*) AS count
+                    FROM users
+                    WHERE created_at >= :start
+                    GROUP BY CAST(created_at AS DATE)
+                ) r ON r.date = CAST(d AS DATE)
+                ORDER BY d
+            """), {'start_date': start_date, 'end_date': end_date, 'start': start})]
+        
+        daily_completions = db.session.query(
+            Progress.updated_date.label('date'),
+            func.count(Progress.id).label('count')
+        ).filter(
+            and_(
+                Progress.status == 'completed',
+                Progress.updated_date >= start_date
+            )
+        ).group_by(Progress.updated_date).all()
+        
+        daily_registrations = db.session.query(
+            func.date(User.created_at).label('date'),
+            func.count(User.id).label('count')
+        ).filter(
+            User.created_at >= start
+        ).group_by(func.date(User.created_at)).all()
+        
+        return cls._fill_daily_series(
+            start_date, end_date,
+            {cls._as_date(row.date): row.count for row in daily_completions},
+            {cls._as_date(row.date): row.count for row in daily_registrations}
+        )
+    
+    @staticmethod
+    def _fill_daily_series(start_date, end_date, completions: Dict[Any, int],
+                           registrations: Dict[Any, int]) -> List[Tuple[Any, int, int]]:
+        """Zero-fill per-day counts into one entry per day in the range."""
+        days = (end_date - start_date).days + 1
+        return [
+            (day, completions.get(day, 0), registrations.get(day, 0))
+            for day in (start_date + timedelta(days=offset) for offset in range(days))
+        ]
+    
+    @staticmethod
+    def _as_date(value):
+        """Normalize a ``DATE()`` result (a string on some backends) to a date."""
+        if isinstance(value, str):
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        return value
+    
+    @classmethod
+    def refresh_activity_rollup(cls, days: int = 1) -> int:
+        """
+        Recompute the daily activity roll-up for the most recent days.
+        
+        Args:
+            days: Number of days to recompute, ending today (UTC)
+        
+        Returns:
+            Number of roll-up rows written
+        """
+        try:
+            now = datetime.utcnow()
+            start_date = now.date() - timedelta(days=days - 1)
+            
+            rows = [
+                {
+                    'date': day,
+                    'completions': completions,
+                    'registrations': registrations,
+                    'updated_at': now
+                }
+                for day, completions, registrations in cls._count_daily_activity(start_date, now.date())
+            ]
+            
+            stmt = pg_insert(DailyActivityRollup).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DailyActivityRollup.date],
+                set_={
+                    'completions': stmt.excluded.completions,
+                    'registrations': stmt.excluded.registrations,
+                    'updated_at': stmt.excluded.updated_at
+                }
+            )
+            db.session.execute(stmt)
+            db.session.commit()
+            
+            return len(rows)
+            
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error refreshing activity roll-up: {str(e)}")
+            return 0
+    
+    @classmethod
+    def _get_system_health_metrics(cls, now: Optional[datetime] = None) -> Dict[str, Any]:
         """Get system health and performance metrics."""
         try:
-            # Database health indicators
-            total_notifications = Notification.query.count()
-            unread_notifications = Notification.query.filter(
-                Notification.is_read == False
-            ).count()
+            week_ago = (now or datetime.utcnow()) - timedelta(days=7)
+            
+            # One aggregate pass per table, total and filtered counts side by side,
+            # all returned in a single row
+            notifications = select(
+                func.count(Notification.id).label('total_notifications'),
+                func.count(case((Notification.is_read == False, 1))).label('unread_notifications')
+            ).subquery()
+            files = select(
+                func.count(UploadedFile.id).label('total_files'),
+                # Megabytes, rounded in SQL (cast so the driver returns a float, not a Decimal)
+                func.round(
+                    func.coalesce(func.sum(UploadedFile.file_size), 0) / 1048576.0, 2
+                ).cast(Float).label('total_storage_mb')
+            ).subquery()
+            conversations = select(
+                func.count(ChatConversation.id).label('total_conversations'),
+                func.count(case((ChatConversation.updated_at >= week_ago, 1))).label('active_conversations')
+            ).subquery()
             
-            total_files = UploadedFile.query.count()
-            total_storage_size = db.session.query(
-                func.sum(UploadedFile.file_size)
-            ).scalar() or 0
+            row = db.session.execute(
+                select(notifications, files, conversations)
+            ).one()
             
-            # Chat activity
-            total_conversations = ChatConversation.query.count()
-            active_conversations = ChatConversation.query.filter(
-                ChatConversation.updated_at >= datetime.utcnow() - timedelta(days=7)
-            ).count()
+            total_notifications = row.total_notifications
+            unread_notifications = row.unread_notifications
+            total_files = row.total_files
+            total_storage_mb = row.total_storage_mb
+            total_conversations = row.total_conversations
+            active_conversations = row.active_conversations
             
             return {
                 'database_health': 'healthy',  # Could add actual health checks
                 'total_notifications': total_notifications,
                 'unread_notifications': unread_notifications,
                 'total_files': total_files,
-                'total_storage_mb': round(total_storage_size / (1024 * 1024), 2),
+                'total_storage_mb': total_storage_mb,
                 'total_conversations': total_conversations,
                 'active_conversations_week': active_conversations
             }
@@ -788,28 +1228,45 @@ class DashboardService(BaseService):
     def _get_popular_content(cls) -> Dict[str, Any]:
         """Get popular exercises and content."""
         try:
-            # Most attempted exercises
-            popular_exercises = db.session.query(
-                Exercise.id,
-                Exercise.title,
+            # Most attempted exercises: rank on progress alone, then join the
+            # ten winners to exercises for their titles
+            attempts = db.session.query(
+                Progress.exercise_id,
                 func.count(Progress.id).label('attempt_count')
-            ).join(Progress).group_by(
-                Exercise.id, Exercise.title
-            ).order_by(desc('attempt_count')).limit(10).all()
+            ).group_by(
+                Progress.exercise_id
+            ).order_by(desc('attempt_count')).limit(10).subquery()
             
-            # Highest rated exercises (by average score)
-            highest_rated = db.session.query(
+            popular_exercises = db.session.query(
                 Exercise.id,
                 Exercise.title,
+                attempts.c.attempt_count
+            ).join(
+                attempts, attempts.c.exercise_id == Exercise.id
+            ).order_by(desc(attempts.c.attempt_count)).all()
+            
+            # Highest rated exercises (by average score, at least 5 completions),
+            # aggregated per exercise_id from the progress index before joining
+            ratings = db.session.query(
+                Progress.exercise_id,
                 func.avg(Progress.score).label('avg_score'),
                 func.count(Progress.id).label('completion_count')
-            ).join(Progress).filter(
+            ).filter(
                 Progress.status == 'completed'
             ).group_by(
-                Exercise.id, Exercise.title
+                Progress.exercise_id
             ).having(
-                func.count(Progress.id) >= 5  # At least 5 completions
-            ).order_by(desc('avg_score')).limit(10).all()
+                func.count(Progress.id) >= 5
+            ).order_by(desc('avg_score')).limit(10).subquery()
+            
+            highest_rated = db.session.query(
+                Exercise.id,
+                Exercise.title,
+                ratings.c.avg_score,
+                ratings.c.completion_count
+            ).join(
+                ratings, ratings.c.exercise_id == Exercise.id
+            ).order_by(desc(ratings.c.avg_score)).all()
             
             return {
                 'most_attempted': [
@@ -836,17 +1293,24 @@ class DashboardService(BaseService):
             return {}
     
     @classmethod
-    def _get_recent_registrations(cls) -> List[Dict[str, Any]]:
+    def _get_recent_registrations(cls, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Get recent user registrations."""
         try:
-            recent_users = User.query.filter(
-                User.created_at >= datetime.utcnow() - timedelta(days=7)
+            # Plain column rows; no User instances are built
+            recent_users = db.session.query(
+                User.id,
+                User.email,
+                User.role,
+                User.profile_data,
+                User.created_at
+            ).filter(
+                User.created_at >= (now or datetime.utcnow()) - timedelta(days=7)
             ).order_by(desc(User.created_at)).limit(10).all()
             
             return [
                 {
                     'id': user.id,
-                    'name': user.full_name,
+                    'name': User.display_name(user.profile_data, user.email),
                     'email': user.email,
                     'role': user.role,
                     'created_at': user.created_at.isoformat()
@@ -859,7 +1323,8 @@ class DashboardService(BaseService):
             return []
     
     @classmethod
-    def _get_professor_recent_activity(cls, professor_id: str) -> List[Dict[str, Any]]:
+    def _get_professor_recent_activity(cls, professor_id: str,
+                                       now: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Get recent student activity across professor's classes."""
         try:
             # Get all classes taught by professor
@@ -870,30 +1335,39 @@ class DashboardService(BaseService):
                 )
             ).subquery()
             
-            # Get recent progress from students in those classes
-            recent_activity = db.session.query(Progress).join(
+            # Get recent progress from students in those classes; only a few
+            # columns are rendered, so skip hydrating Progress/User/Exercise
+            recent_activity = db.session.query(
+                Progress.status,
+                Progress.score,
+                Progress.updated_at,
+                User.profile_data,
+                User.email,
+                Exercise.title
+            ).join(
                 ClassEnrollment,
                 Progress.student_id == ClassEnrollment.student_id
+            ).outerjoin(
+                User, User.id == Progress.student_id
+            ).outerjoin(
+                Exercise, Exercise.id == Progress.exercise_id
             ).filter(
                 and_(
                     ClassEnrollment.class_id.in_(class_ids),
                     ClassEnrollment.enrollment_status == 'active',
-                    Progress.updated_at >= datetime.utcnow() - timedelta(days=7)
+                    Progress.updated_at >= (now or datetime.utcnow()) - timedelta(days=7)
                 )
-            ).options(
-                joinedload(Progress.student),
-                joinedload(Progress.exercise)
             ).order_by(desc(Progress.updated_at)).limit(20).all()
             
             return [
                 {
-                    'student_name': progress.student.full_name if progress.student else 'Unknown',
-                    'exercise_title': progress.exercise.title if progress.exercise else 'Unknown',
-                    'status': progress.status,
-                    'score': progress.score,
-                    'completed_at': progress.updated_at.isoformat()
+                    'student_name': User.display_name(row.profile_data, row.email) if row.email else 'Unknown',
+                    'exercise_title': row.title or 'Unknown',
+                    'status': row.status,
+                    'score': row.score,
+                    'completed_at': row.updated_at.isoformat()
                 }
-                for progress in recent_activity
+                for row in recent_activity
             ]
             
         except Exception as e:
@@ -901,46 +1375,58 @@ class DashboardService(BaseService):
             return []
     
     @classmethod
-    def _get_professor_teaching_stats(cls, professor_id: str) -> Dict[str, Any]:
-        """Get overall teaching statistics for a professor."""
+    def _get_professor_student_ids(cls, professor_id: str) -> List[Any]:
+        """Get distinct active student IDs across a professor's active classes."""
+        rows = db.session.query(func.distinct(ClassEnrollment.student_id)).join(
+            Class
+        ).filter(
+            and_(
+                Class.professor_id == professor_id,
+                Class.is_active == True,
+                ClassEnrollment.enrollment_status == 'active'
+            )
+        ).all()
+        
+        return [row[0] for row in rows]
+    
+    @classmethod
+    def _get_professor_teaching_stats(cls, professor_id: str,
+                                      student_ids: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get overall teaching statistics for a professor.
+        
+        ``student_ids`` is an already-resolved ``_get_professor_student_ids``
+        result; it is fetched here when omitted.
+        """
         try:
-            # Count classes
-            total_classes = Class.query.filter(
-                and_(
-                    Class.professor_id == professor_id,
-                    Class.is_active == True
-                )
-            ).count()
-            
-            # Count total students across all classes
-            total_students = db.session.query(func.count(func.distinct(ClassEnrollment.student_id))).join(
-                Class
-            ).filter(
-                and_(
-                    Class.professor_id == professor_id,
-                    Class.is_active == True,
-                    ClassEnrollment.enrollment_status == 'active'
-                )
-            ).scalar()
-            
-            # Count total assignments
-            total_assignments = db.session.query(func.count(ClassExerciseAssignment.id)).join(
-                Class
-            ).filter(
-                and_(
-                    Class.professor_id == professor_id,
-                    Class.is_active == True
-                )
-            ).scalar()
-            
-            # Calculate average class score
-            avg_class_score = cls._get_professor_average_class_score(professor_id)
+            if student_ids is None:
+                student_ids = cls._get_professor_student_ids(professor_id)
+            
+            # Remaining figures come back in one statement of scalar sub-selects
+            # sharing the same professor/active-class filter
+            is_professor_class = and_(
+                Class.professor_id == professor_id,
+                Class.is_active == True
+            )
+            
+            stmt = select(
+                select(func.count(Class.id)).where(is_professor_class)
+                .scalar_subquery().label('total_classes'),
+                select(func.count(ClassExerciseAssignment.id)).join(Class).where(is_professor_class)
+                .scalar_subquery().label('total_assignments'),
+                select(func.avg(Progress.score)).where(
+                    and_(
+                        Progress.student_id.in_(student_ids),
+                        Progress.status == 'completed'
+                    )
+                ).scalar_subquery().label('avg_class_score')
+            )
+            row = db.session.execute(stmt).one()
             
             return {
-                'total_classes': total_classes,
-                'total_students': total_students or 0,
-                'total_assignments': total_assignments or 0,
-                'average_class_score': avg_class_score
+                'total_classes': row.total_classes or 0,
+                'total_students': len(student_ids),
+                'total_assignments': row.total_assignments or 0,
+                'average_class_score': round(row.avg_class_score, 2) if row.avg_class_score else 0.0
             }
             
         except Exception as e:
@@ -948,10 +1434,23 @@ class DashboardService(BaseService):
             return {}
     
     @classmethod
-    def _get_class_performance_analytics(cls, professor_id: str) -> List[Dict[str, Any]]:
+    def _get_class_performance_analytics(cls, professor_id: str,
+                                         live_stats: bool = False) -> List[Dict[str, Any]]:
         """Get performance analytics for each class."""
         try:
-            classes = Class.query.filter(
+            stats = cls._class_stats_source(professor_id, live_stats)
+            
+            # Same figures as _get_single_class_analytics, for every class in one query
+            classes = db.session.query(
+                Class.id,
+                Class.name,
+                func.coalesce(stats.c.student_count, 0).label('student_count'),
+                func.coalesce(stats.c.assignment_count, 0).label('assignment_count'),
+                stats.c.average_performance,
+                func.coalesce(stats.c.total_completions, 0).label('total_completions')
+            ).outerjoin(
+                stats, stats.c.class_id == Class.id
+            ).filter(
                 and_(
                     Class.professor_id == professor_id,
                     Class.is_active == True
@@ -959,11 +1458,23 @@ class DashboardService(BaseService):
             ).all()
             
             analytics = []
-            for class_obj in classes:
-                class_analytics = cls._get_single_class_analytics(class_obj.id)
-                class_analytics['class_name'] = class_obj.name
-                class_analytics['class_id'] = class_obj.id
-                analytics.append(class_analytics)
+            for class_row in classes:
+                total_possible_completions = class_row.student_count * class_row.assignment_count
+                completion_rate = (
+                    class_row.total_completions / total_possible_completions * 100
+                ) if total_possible_completions > 0 else 0
+                
+                analytics.append({
+                    'student_count': class_row.student_count,
+                    'assignment_count': class_row.assignment_count,
+                    'average_performance': (
+                        round(class_row.average_performance, 2) if class_row.average_performance else 0.0
+                    ),
+                    'completion_rate': round(completion_rate, 2),
+                    'total_completions': class_row.total_completions,
+                    'class_name': class_row.name,
+                    'class_id': class_row.id
+                })
             
             return analytics
             
@@ -975,21 +1486,29 @@ class DashboardService(BaseService):
     def _get_professor_recent_assignments(cls, professor_id: str) -> List[Dict[str, Any]]:
         """Get recent assignments created by professor."""
         try:
-            assignments = ClassExerciseAssignment.query.join(Class).filter(
+            # Only the displayed columns, joined rather than eager-loaded
+            assignments = db.session.query(
+                ClassExerciseAssignment.id,
+                ClassExerciseAssignment.due_date,
+                ClassExerciseAssignment.assigned_at,
+                Exercise.title.label('exercise_title'),
+                Class.name.label('class_name')
+            ).join(
+                Class, Class.id == ClassExerciseAssignment.class_id
+            ).outerjoin(
+                Exercise, Exercise.id == ClassExerciseAssignment.exercise_id
+            ).filter(
                 and_(
                     Class.professor_id == professor_id,
                     Class.is_active == True
                 )
-            ).options(
-                joinedload(ClassExerciseAssignment.exercise),
-                joinedload(ClassExerciseAssignment.class_obj)
             ).order_by(desc(ClassExerciseAssignment.assigned_at)).limit(10).all()
             
             return [
                 {
                     'assignment_id': assignment.id,
-                    'exercise_title': assignment.exercise.title if assignment.exercise else 'Unknown',
-                    'class_name': assignment.class_obj.name if assignment.class_obj else 'Unknown',
+                    'exercise_title': assignment.exercise_title or 'Unknown',
+                    'class_name': assignment.class_name,
                     'due_date': assignment.due_date.isoformat() if assignment.due_date else None,
                     'assigned_at': assignment.assigned_at.isoformat()
                 }
@@ -1001,43 +1520,42 @@ class DashboardService(BaseService):
             return []
     
     @classmethod
-    def _get_student_performance_insights(cls, professor_id: str) -> Dict[str, Any]:
+    def _get_student_performance_insights(cls, professor_id: str,
+                                          student_ids: Optional[List[Any]] = None,
+                                          now: Optional[datetime] = None) -> Dict[str, Any]:
         """Get insights about student performance across professor's classes."""
         try:
             # Get all students in professor's classes
-            student_ids = db.session.query(func.distinct(ClassEnrollment.student_id)).join(
-                Class
+            if student_ids is None:
+                student_ids = cls._get_professor_student_ids(professor_id)
+            
+            # Performance distribution, bucketed in a single aggregate
+            score_bucket = case(
+                (Progress.score >= 90, '90-100'),
+                (Progress.score >= 80, '80-89'),
+                (Progress.score >= 70, '70-79'),
+                (Progress.score >= 60, '60-69'),
+                else_='Below 60'
+            ).label('bucket')
+            
+            bucket_counts = db.session.query(
+                score_bucket,
+                func.count(Progress.id).label('count')
             ).filter(
                 and_(
-                    Class.professor_id == professor_id,
-                    Class.is_active == True,
-                    ClassEnrollment.enrollment_status == 'active'
+                    Progress.student_id.in_(student_ids),
+                    Progress.status == 'completed',
+                    Progress.score.between(0, 100)
                 )
-            ).subquery()
-            
-            # Performance distribution
-            score_ranges = [
-                ('90-100', 90, 100),
-                ('80-89', 80, 89),
-                ('70-79', 70, 79),
-                ('60-69', 60, 69),
-                ('Below 60', 0, 59)
-            ]
+            ).group_by(score_bucket).all()
             
-            performance_distribution = {}
-            for range_name, min_score, max_score in score_ranges:
-                count = Progress.query.filter(
-                    and_(
-                        Progress.student_id.in_(student_ids),
-                        Progress.status == 'completed',
-                        Progress.score >= min_score,
-                        Progress.score <= max_score
-                    )
-                ).count()
-                performance_distribution[range_name] = count
+            performance_distribution = dict.fromkeys(
+                ['90-100', '80-89', '70-79', '60-69', 'Below 60'], 0
+            )
+            performance_distribution.update({row.bucket: row.count for row in bucket_counts})
             
             # Students needing attention (low scores or no recent activity)
-            struggling_students = cls._get_struggling_students_for_professor(professor_id)
+            struggling_students = cls._get_struggling_students_for_professor(professor_id, now)
             
             return {
                 'performance_distribution': performance_distribution,
@@ -1064,8 +1582,7 @@ class DashboardService(BaseService):
             avg_score = db.session.query(func.avg(Progress.score)).filter(
                 and_(
                     Progress.student_id.in_(student_ids),
-                    Progress.status == 'completed',
-                    Progress.score.isnot(None)
+                    Progress.status == 'completed'
                 )
             ).scalar()
             
@@ -1094,8 +1611,7 @@ class DashboardService(BaseService):
             avg_score = db.session.query(func.avg(Progress.score)).filter(
                 and_(
                     Progress.student_id.in_(student_ids),
-                    Progress.status == 'completed',
-                    Progress.score.isnot(None)
+                    Progress.status == 'completed'
                 )
             ).scalar()
             
@@ -1109,6 +1625,23 @@ class DashboardService(BaseService):
     def _get_single_class_analytics(cls, class_id: int) -> Dict[str, Any]:
         """Get detailed analytics for a single class."""
         try:
+            view_row = cls._get_class_stats_view_row(class_id)
+            if view_row is not None:
+                total_possible_completions = view_row.student_count * view_row.assignment_count
+                completion_rate = (
+                    view_row.total_completions / total_possible_completions * 100
+                ) if total_possible_completions > 0 else 0
+                
+                return {
+                    'student_count': view_row.student_count,
+                    'assignment_count': view_row.assignment_count,
+                    'average_performance': (
+                        round(view_row.average_performance, 2) if view_row.average_performance else 0.0
+                    ),
+                    'completion_rate': round(completion_rate, 2),
+                    'total_completions': view_row.total_completions
+                }
+            
             # Student count
             student_count = ClassEnrollment.query.filter(
                 and_(
@@ -1122,9 +1655,29 @@ class DashboardService(BaseService):
                 ClassExerciseAssignment.class_id == class_id
             ).count()
             
+            # Nothing to average or complete without students
+            if student_count == 0:
+                return {
+                    'student_count': 0,
+                    'assignment_count': assignment_count,
+                    'average_performance': 0.0,
+                    'completion_rate': 0.0,
+                    'total_completions': 0
+                }
+            
             # Average performance
             avg_performance = cls._get_class_average_performance(class_id)
             
+            # Without assignments there is nothing to complete
+            if assignment_count == 0:
+                return {
+                    'student_count': student_count,
+                    'assignment_count': 0,
+                    'average_performance': avg_performance,
+                    'completion_rate': 0.0,
+                    'total_completions': 0
+                }
+            
             # Completion rate
             total_possible_completions = student_count * assignment_count
             actual_completions = db.session.query(func.count(Progress.id)).join(
@@ -1157,13 +1710,28 @@ class DashboardService(BaseService):
             return {}
     
     @classmethod
-    def _get_struggling_students_for_professor(cls, professor_id: str) -> List[Dict[str, Any]]:
+    def _get_class_stats_view_row(cls, class_id: int):
+        """Get a class's precomputed stats row, or None if unavailable."""
+        try:
+            if not view_available(CLASS_STATS_MV):
+                return None
+            
+            return db.session.execute(
+                text(f"SELECT * FROM {CLASS_STATS_MV} WHERE class_id = :class_id"),
+                {'class_id': class_id}
+            ).first()
+            
+        except Exception as e:
+            logger.error(f"Error reading {CLASS_STATS_MV} for {class_id}: {str(e)}")
+            db.session.rollback()
+            return None
+    
+    @classmethod
+    def _get_struggling_students_for_professor(cls, professor_id: str,
+                                               now: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Get students who might need attention in professor's classes."""
         try:
             # Get students with low average scores or no recent activity
-            struggling = []
-            
-            # Get all students in professor's classes
             student_enrollments = db.session.query(
                 ClassEnrollment.student_id,
                 Class.name.label('class_name')
@@ -1175,40 +1743,60 @@ class DashboardService(BaseService):
                 )
             ).all()
             
+            student_ids = {enrollment.student_id for enrollment in student_enrollments}
+            if not student_ids:
+                return []
+            
+            # Average completed score and recent activity for all students in one pass
+            cutoff_date = (now or datetime.utcnow()) - timedelta(days=7)
+            activity = {
+                row.student_id: row
+                for row in db.session.query(
+                    Progress.student_id,
+                    func.avg(Progress.score).filter(
+                        Progress.status == 'completed'
+                    ).label('avg_score'),
+                    func.count(Progress.id).filter(
+                        Progress.updated_at >= cutoff_date
+                    ).label('recent_activity')
+                ).filter(
+                    Progress.student_id.in_(student_ids)
+                ).group_by(Progress.student_id).all()
+            }
+            
+            # Flag as struggling if low score or no recent activity
+            flagged = []
             for enrollment in student_enrollments:
-                student_id = enrollment.student_id
+                row = activity.get(enrollment.student_id)
+                avg_score = row.avg_score if row else None
+                recent_activity = row.recent_activity if row else 0
                 
-                # Calculate student's average score
-                avg_score = db.session.query(func.avg(Progress.score)).filter(
-                    and_(
-                        Progress.student_id == student_id,
-                        Progress.status == 'completed',
-                        Progress.score.isnot(None)
-                    )
-                ).scalar()
-                
-                # Check recent activity
-                recent_activity = Progress.query.filter(
-                    and_(
-                        Progress.student_id == student_id,
-                        Progress.updated_at >= datetime.utcnow() - timedelta(days=7)
-                    )
-                ).count()
-                
-                # Flag as struggling if low score or no recent activity
                 if (avg_score and avg_score < 70) or recent_activity == 0:
-                    student = User.query.get(student_id)
-                    if student:
-                        struggling.append({
-                            'student_id': str(student_id),
-                            'student_name': student.full_name,
-                            'class_name': enrollment.class_name,
-                            'average_score': round(avg_score, 2) if avg_score else 0,
-                            'recent_activity': recent_activity,
-                            'reason': 'Low average score' if avg_score and avg_score < 70 else 'No recent activity'
-                        })
+                    flagged.append((enrollment, avg_score, recent_activity))
+                    if len(flagged) == 10:  # Limit to top 10
+                        break
+            
+            students = {
+                student.id: student
+                for student in User.query.filter(
+                    User.id.in_([enrollment.student_id for enrollment, _, _ in flagged])
+                ).all()
+            } if flagged else {}
+            
+            struggling = []
+            for enrollment, avg_score, recent_activity in flagged:
+                student = students.get(enrollment.student_id)
+                if student:
+                    struggling.append({
+                        'student_id': str(enrollment.student_id),
+                        'student_name': student.full_name,
+                        'class_name': enrollment.class_name,
+                        'average_score': round(avg_score, 2) if avg_score else 0,
+                        'recent_activity': recent_activity,
+                        'reason': 'Low average score' if avg_score and avg_score < 70 else 'No recent activity'
+                    })
             
-            return struggling[:10]  # Limit to top 10
+            return struggling
             
         except Exception as e:
             logger.error(f"Error getting struggling students for professor {professor_id}: {str(e)}")
@@ -4,30 +4,19 @@ For now, this is a stub that prints to console.
 In production, integrate with SendGrid, AWS SES, or similar.
 """
 from flask import current_app
+from jinja2 import Environment
 
-class EmailService:
-    """Email service class for sending emails."""
-    
-    @staticmethod
-    def send_welcome_email(user):
-        """
-        Send welcome email to new user.
-        
-        Args:
-            user (User): User object
-        """
-        try:
-            # In production, send actual email
-            message = f"""
+# Message bodies, compiled once at import and rendered per send
+WELCOME_BODY = """
             ========================================
-            WELCOME EMAIL SENT TO: {user.email}
+            WELCOME EMAIL SENT TO: {{ user.email }}
             ========================================
             
             Welcome to Educational Mathematics AI Platform!
             
-            Dear {user.full_name or user.email},
+            Dear {{ user.full_name or user.email }},
             
-            Thank you for registering as a {user.role.title()}.
+            Thank you for registering as a {{ user.role.title() }}.
             
             Your account has been created successfully.
             Please confirm your email address by clicking the link below:
@@ -38,6 +27,123 @@ class EmailService:
             Educational Mathematics AI Platform Team
             ========================================
             """
+
+PASSWORD_RESET_BODY = """
+            ========================================
+            PASSWORD RESET EMAIL SENT TO: {{ user.email }}
+            ========================================
+            
+            Password Reset Request
+            
+            Dear {{ user.full_name or user.email }},
+            
+            You have requested to reset your password for your Educational Mathematics AI Platform account.
+            
+            Please click the link below to reset your password:
+            {{ reset_url }}
+            
+            This link will expire in 1 hour.
+            
+            If you did not request this password reset, please ignore this email.
+            
+            Best regards,
+            Educational Mathematics AI Platform Team
+            ========================================
+            """
+
+PASSWORD_CHANGED_BODY = """
+            ========================================
+            PASSWORD CHANGED NOTIFICATION SENT TO: {{ user.email }}
+            ========================================
+            
+            Password Changed Successfully
+            
+            Dear {{ user.full_name or user.email }},
+            
+            Your password has been successfully changed.
+            
+            If you did not make this change, please contact our support team immediately.
+            
+            Best regards,
+            Educational Mathematics AI Platform Team
+            ========================================
+            """
+
+EMAIL_CONFIRMATION_BODY = """
+            ========================================
+            EMAIL CONFIRMATION SENT TO: {{ user.email }}
+            ========================================
+            
+            Please Confirm Your Email Address
+            
+            Dear {{ user.full_name or user.email }},
+            
+            Please confirm your email address by clicking the link below:
+            {{ confirmation_url }}
+            
+            This link will expire in 24 hours.
+            
+            Best regards,
+            Educational Mathematics AI Platform Team
+            ========================================
+            """
+
+_env = Environment(autoescape=False, keep_trailing_newline=True)
+_WELCOME_TEMPLATE = _env.from_string(WELCOME_BODY)
+_PASSWORD_RESET_TEMPLATE = _env.from_string(PASSWORD_RESET_BODY)
+_PASSWORD_CHANGED_TEMPLATE = _env.from_string(PASSWORD_CHANGED_BODY)
+_EMAIL_CONFIRMATION_TEMPLATE = _env.from_string(EMAIL_CONFIRMATION_BODY)
+
+
+class EmailService:
+    """Email service class for sending emails."""
+    
+    @staticmethod
+    def queue_welcome_email(user):
+        """
+        Queue the welcome email on a Celery worker, sending it inline if the
+        queue is unavailable.
+        
+        Args:
+            user (User): User object
+        """
+        try:
+            # Import here to avoid circular imports
+            from app.tasks.email_tasks import send_account_welcome_email
+            send_account_welcome_email.delay(str(user.id))
+        except Exception as e:
+            current_app.logger.error(f"Failed to queue welcome email: {str(e)}")
+            EmailService.send_welcome_email(user)
+    
+    @staticmethod
+    def queue_password_reset_email(user, reset_token):
+        """
+        Queue the password reset email on a Celery worker, sending it inline
+        if the queue is unavailable.
+        
+        Args:
+            user (User): User object
+            reset_token (str): Password reset token
+        """
+        try:
+            # Import here to avoid circular imports
+            from app.tasks.email_tasks import send_password_reset_email
+            send_password_reset_email.delay(str(user.id), reset_token)
+        except Exception as e:
+            current_app.logger.error(f"Failed to queue password reset email: {str(e)}")
+            EmailService.send_password_reset_email(user, reset_token)
+    
+    @staticmethod
+    def send_welcome_email(user):
+        """
+        Send welcome email to new user.
+        
+        Args:
+            user (User): User object
+        """
+        try:
+            # In production, send actual email
+            message = _WELCOME_TEMPLATE.render(user=user)
             
             print(message)
             current_app.logger.info(f"Welcome email sent to {user.email}")
@@ -57,28 +163,7 @@ class EmailService:
         try:
             reset_url = f"http://localhost:3000/reset-password?token={reset_token}"
             
-            message = f"""
-            ========================================
-            PASSWORD RESET EMAIL SENT TO: {user.email}
-            ========================================
-            
-            Password Reset Request
-            
-            Dear {user.full_name or user.email},
-            
-            You have requested to reset your password for your Educational Mathematics AI Platform account.
-            
-            Please click the link below to reset your password:
-            {reset_url}
-            
-            This link will expire in 1 hour.
-            
-            If you did not request this password reset, please ignore this email.
-            
-            Best regards,
-            Educational Mathematics AI Platform Team
-            ========================================
-            """
+            message = _PASSWORD_RESET_TEMPLATE.render(user=user, reset_url=reset_url)
             
             print(message)
             current_app.logger.info(f"Password reset email sent to {user.email}")
@@ -95,23 +180,7 @@ class EmailService:
             user (User): User object
         """
         try:
-            message = f"""
-            ========================================
-            PASSWORD CHANGED NOTIFICATION SENT TO: {user.email}
-            ========================================
-            
-            Password Changed Successfully
-            
-            Dear {user.full_name or user.email},
-            
-            Your password has been successfully changed.
-            
-            If you did not make this change, please contact our support team immediately.
-            
-            Best regards,
-            Educational Mathematics AI Platform Team
-            ========================================
-            """
+            message = _PASSWORD_CHANGED_TEMPLATE.render(user=user)
             
             print(message)
             current_app.logger.info(f"Password changed notification sent to {user.email}")
@@ -131,24 +200,7 @@ class EmailService:
         try:
             confirmation_url = f"http://localhost:3000/confirm-email?token={confirmation_token}"
             
-            message = f"""
-            ========================================
-            EMAIL CONFIRMATION SENT TO: {user.email}
-            ========================================
-            
-            Please Confirm Your Email Address
-            
-            Dear {user.full_name or user.email},
-            
-            Please confirm your email address by clicking the link below:
-            {confirmation_url}
-            
-            This link will expire in 24 hours.
-            
-            Best regards,
-            Educational Mathematics AI Platform Team
-            ========================================
-            """
+            message = _EMAIL_CONFIRMATION_TEMPLATE.render(user=user, confirmation_url=confirmation_url)
             
             print(message)
             current_app.logger.info(f"Email confirmation sent to {user.email}")
@@ -1,20 +1,38 @@
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, func, desc
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, or_, case, func, desc, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import contains_eager, joinedload
 from app.extensions import db
 from app.models import Exercise, Progress, User
 from app.services.base import BaseService
+from app.services.achievement import AchievementService
+from app.services.class_management import ClassManagementService
+from app.utils.cache import CacheManager
+from app.utils.materialized_views import SUBJECT_ATTEMPTS_MV, is_postgresql, view_available
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class InvalidCursorError(ValueError):
+    """Raised when a keyset pagination cursor cannot be parsed."""
+    pass
+
+
 class ExerciseService(BaseService):
     """Service class for exercise operations."""
     
     model = Exercise
     
+    # Most exercises accepted by one bulk create request
+    BULK_CREATE_MAX = 200
+    
+    # Columns update_exercise may write
+    UPDATABLE_FIELDS = frozenset(
+        column.name for column in Exercise.__table__.columns
+    ) - {'id', 'created_by', 'created_at', 'updated_at'}
+    
     @classmethod
     def create_exercise(cls, data: Dict, creator_id: str) -> Exercise:
         """Create a new exercise."""
@@ -46,24 +64,75 @@ class ExerciseService(BaseService):
             logger.error(f"Error creating exercise: {str(e)}")
             raise
     
+    @classmethod
+    def bulk_create_exercises(cls, rows: List[Dict], creator_id: str) -> List[int]:
+        """
+        Create many exercises in one multi-row INSERT and a single commit.
+        
+        Returns:
+            IDs of the created exercises, in input order
+        """
+        try:
+            values = [
+                {
+                    'title': data['title'],
+                    'description': data.get('description', ''),
+                    'difficulty': data.get('difficulty', 'medium'),
+                    'subject': data['subject'],
+                    'type': data.get('type', 'multiple_choice'),
+                    'questions': data['questions'],
+                    'solutions': data['solutions'],
+                    'created_by': creator_id,
+                    'course_id': data.get('course_id'),
+                    'max_score': data.get('max_score', 100.0),
+                    'time_limit': data.get('time_limit'),
+                    'is_published': data.get('is_published', False),
+                    'tags': data.get('tags', [])
+                }
+                for data in rows
+            ]
+            
+            if not values:
+                return []
+            
+            exercise_ids = db.session.scalars(
+                insert(Exercise).returning(Exercise.id, sort_by_parameter_order=True),
+                values
+            ).all()
+            db.session.commit()
+            
+            logger.info(f"{len(exercise_ids)} exercises created by user {creator_id}")
+            return exercise_ids
+            
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error bulk creating exercises: {str(e)}")
+            raise
+    
     @classmethod
     def update_exercise(cls, exercise_id: int, data: Dict, user_id: str) -> Exercise:
         """Update an exercise."""
         try:
-            exercise = cls.get_by_id(exercise_id)
-            if not exercise:
-                raise ValueError("Exercise not found")
+            values = {field: data[field] for field in cls.UPDATABLE_FIELDS & data.keys()}
+            
+            # Ownership is part of the WHERE clause, so the check and the write
+            # are one atomic UPDATE ... RETURNING with no SELECT beforehand;
+            # updated_at is filled in by the column's onupdate
+            exercise = db.session.scalars(
+                update(Exercise).where(
+                    and_(Exercise.id == exercise_id, Exercise.created_by == user_id)
+                ).values(**values).returning(Exercise)
+            ).first()
             
-            # Check ownership for professors
-            if str(exercise.created_by) != user_id:
+            if not exercise:
+                if not db.session.query(
+                    db.session.query(Exercise.id).filter(Exercise.id == exercise_id).exists()
+                ).scalar():
+                    raise ValueError("Exercise not found")
+                
+                # Check ownership for professors
                 raise PermissionError("Not authorized to update this exercise")
             
-            # Update fields
-            for field, value in data.items():
-                if hasattr(exercise, field) and field not in ['id', 'created_by', 'created_at']:
-                    setattr(exercise, field, value)
-            
-            exercise.updated_at = datetime.utcnow()
             db.session.commit()
             
             logger.info(f"Exercise updated: {exercise.id}")
@@ -98,8 +167,14 @@ class ExerciseService(BaseService):
             raise
     
     @classmethod
-    def get_exercises_with_filters(cls, filters: Dict) -> Tuple[List[Exercise], int]:
-        """Get exercises with pagination and filters."""
+    def get_exercises_with_filters(cls, filters: Dict) -> Tuple[List[Exercise], Optional[int]]:
+        """
+        Get exercises with pagination and filters.
+        
+        With a ``cursor`` (see ``encode_cursor``) the page starts right after
+        that exercise and no total is counted (returned as None); otherwise
+        ``page`` selects an OFFSET page and the filtered total is counted.
+        """
         try:
             query = Exercise.query.options(joinedload(Exercise.creator))
             
@@ -127,29 +202,60 @@ class ExerciseService(BaseService):
                 )
             
             if filters.get('tags'):
-                # Filter by tags (JSONB contains)
-                for tag in filters['tags']:
-                    query = query.filter(Exercise.tags.contains([tag]))
+                # All requested tags in one array containment (tags @> ARRAY[...]),
+                # served by a single GIN index probe
+                query = query.filter(Exercise.tags.contains(list(filters['tags'])))
             
             # Only show published exercises for students
             query = query.filter(Exercise.is_published == True)
             
-            # Order by creation date (newest first)
-            query = query.order_by(desc(Exercise.created_at))
+            # Order by creation date (newest first); id breaks ties so keyset
+            # pages never skip or repeat exercises
+            query = query.order_by(desc(Exercise.created_at), desc(Exercise.id))
             
             # Pagination
             page = filters.get('page', 1)
             per_page = filters.get('per_page', 10)
             
-            total = query.count()
-            exercises = query.offset((page - 1) * per_page).limit(per_page).all()
+            if filters.get('cursor'):
+                # Keyset pagination: an index range scan from the cursor, no count
+                created_at, exercise_id = cls.decode_cursor(filters['cursor'])
+                exercises = query.filter(
+                    tuple_(Exercise.created_at, Exercise.id) < (created_at, exercise_id)
+                ).limit(per_page).all()
+                
+                return exercises, None
             
-            return exercises, total
+            # The total rides along as a window count, so the filters run once
+            rows = query.add_columns(
+                func.count().over().label('total')
+            ).offset((page - 1) * per_page).limit(per_page).all()
+            
+            if rows:
+                return [row[0] for row in rows], rows[0].total
+            
+            # Past the last page there is no row to carry the total
+            total = query.count() if page > 1 else 0
+            return [], total
             
         except Exception as e:
             logger.error(f"Error getting exercises with filters: {str(e)}")
             raise
     
+    @staticmethod
+    def encode_cursor(exercise: Exercise) -> str:
+        """Build the keyset cursor for the page after ``exercise``."""
+        return f"{exercise.created_at.isoformat()}|{exercise.id}"
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Parse a keyset cursor into its (created_at, id) position."""
+        try:
+            created_at, exercise_id = cursor.rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(exercise_id)
+        except ValueError:
+            raise InvalidCursorError("Invalid pagination cursor")
+    
     @classmethod
     def get_exercises_by_professor(cls, professor_id: str) -> List[Exercise]:
         """Get all exercises created by a professor."""
@@ -184,30 +290,51 @@ class ProgressService(BaseService):
     def start_exercise(cls, student_id: str, exercise_id: int) -> Progress:
         """Start an exercise for a student."""
         try:
-            # Check if exercise exists and is published
-            exercise = Exercise.query.filter(
-                and_(Exercise.id == exercise_id, Exercise.is_published == True)
-            ).first()
-            
-            if not exercise:
+            # Check if exercise exists and is published (EXISTS, no row loaded)
+            published = db.session.query(
+                db.session.query(Exercise.id).filter(
+                    and_(Exercise.id == exercise_id, Exercise.is_published == True)
+                ).exists()
+            ).scalar()
+            
+            if not published:
                 raise ValueError("Exercise not found or not published")
             
-            # Get or create progress record
-            progress = Progress.query.filter(
-                and_(Progress.student_id == student_id, Progress.exercise_id == exercise_id)
-            ).first()
-            
-            if not progress:
-                progress = Progress(
-                    student_id=student_id,
-                    exercise_id=exercise_id
-                )
-                db.session.add(progress)
+            # Create or restart the progress record in one upsert; the update
+            # branch mirrors Progress.start_attempt
+            now = datetime.utcnow()
+            restarts = Progress.status.in_(['not_started', 'completed'])
+            stmt = insert(Progress).values(
+                student_id=student_id,
+                exercise_id=exercise_id,
+                status='in_progress',
+                attempts=1,
+                started_at=now,
+                answers=[],
+                feedback={},
+                created_at=now,
+                updated_at=now
+            ).on_conflict_do_update(
+                constraint='unique_student_exercise',
+                set_={
+                    'status': case((restarts, 'in_progress'), else_=Progress.status),
+                    'attempts': case((restarts, Progress.attempts + 1), else_=Progress.attempts),
+                    'started_at': case(
+                        (Progress.status == 'not_started', now), else_=Progress.started_at
+                    ),
+                    'updated_at': now
+                }
+            ).returning(Progress)
             
-            # Start the attempt
-            progress.start_attempt()
+            progress = db.session.scalars(
+                stmt, execution_options={'populate_existing': True}
+            ).one()
             db.session.commit()
             
+            CacheManager.invalidate_student_dashboard(
+                student_id, CacheManager.PROGRESS_DASHBOARD_SECTIONS
+            )
+            
             logger.info(f"Exercise {exercise_id} started by student {student_id}")
             return progress
             
@@ -221,10 +348,10 @@ class ProgressService(BaseService):
                       time_spent: Optional[int] = None) -> Progress:
         """Submit answers for an exercise."""
         try:
-            # Get progress record
+            # Get progress record, with the exercise needed for scoring
             progress = Progress.query.filter(
                 and_(Progress.student_id == student_id, Progress.exercise_id == exercise_id)
-            ).first()
+            ).options(joinedload(Progress.exercise)).first()
             
             if not progress:
                 raise ValueError("Progress record not found. Start the exercise first.")
@@ -241,6 +368,19 @@ class ProgressService(BaseService):
             
             db.session.commit()
             
+            # Keep precomputed achievements current
+            if progress.status == 'completed':
+                AchievementService.award_achievements(student_id)
+            
+            CacheManager.invalidate_student_dashboard(
+                student_id, CacheManager.PROGRESS_DASHBOARD_SECTIONS
+            )
+            # Scores and completions feed the professors' dashboards too
+            CacheManager.invalidate_professor_dashboards(
+                ClassManagementService.get_professor_ids_for_student(student_id)
+            )
+            CacheManager.invalidate_student_analytics(student_id)
+            
             logger.info(f"Answers submitted for exercise {exercise_id} by student {student_id}, score: {score}")
             return progress
             
@@ -250,18 +390,27 @@ class ProgressService(BaseService):
             raise
     
     @classmethod
-    def get_student_progress(cls, student_id: str, filters: Optional[Dict] = None) -> List[Progress]:
-        """Get progress records for a student."""
+    def get_student_progress(cls, student_id: str, filters: Optional[Dict] = None,
+                             limit: int = 100, before: Optional[str] = None) -> List[Progress]:
+        """
+        Get a page of progress records for a student, newest first.
+        
+        Pass the cursor of the last record (see ``encode_cursor``) as
+        ``before`` to get the next page.
+        """
         try:
-            query = Progress.query.filter(Progress.student_id == student_id)\
-                .options(joinedload(Progress.exercise))
+            query = Progress.query.filter(Progress.student_id == student_id)
+            
+            if filters and filters.get('subject'):
+                # Populate progress.exercise from the join the filter needs
+                # instead of joining exercises a second time
+                query = query.join(Progress.exercise).filter(
+                    Exercise.subject.ilike(f"%{filters['subject']}%")
+                ).options(contains_eager(Progress.exercise))
+            else:
+                query = query.options(joinedload(Progress.exercise))
             
             if filters:
-                if filters.get('subject'):
-                    query = query.join(Exercise).filter(
-                        Exercise.subject.ilike(f"%{filters['subject']}%")
-                    )
-                
                 if filters.get('status'):
                     query = query.filter(Progress.status == filters['status'])
                 
@@ -271,22 +420,47 @@ class ProgressService(BaseService):
                 if filters.get('end_date'):
                     query = query.filter(Progress.created_at <= filters['end_date'])
             
-            return query.order_by(desc(Progress.updated_at)).all()
+            return cls._keyset_page(query, limit, before)
             
         except Exception as e:
             logger.error(f"Error getting student progress for {student_id}: {str(e)}")
             raise
     
     @classmethod
-    def get_exercise_progress(cls, exercise_id: int) -> List[Progress]:
-        """Get progress records for an exercise."""
+    def get_exercise_progress(cls, exercise_id: int, limit: int = 100,
+                              before: Optional[str] = None) -> List[Progress]:
+        """Get a page of progress records for an exercise, newest first."""
         try:
-            return Progress.query.filter(Progress.exercise_id == exercise_id)\
-                .options(joinedload(Progress.student))\
-                .order_by(desc(Progress.updated_at)).all()
+            query = Progress.query.filter(Progress.exercise_id == exercise_id)\
+                .options(joinedload(Progress.student))
+            
+            return cls._keyset_page(query, limit, before)
         except Exception as e:
             logger.error(f"Error getting exercise progress for {exercise_id}: {str(e)}")
             raise
+    
+    @classmethod
+    def _keyset_page(cls, query, limit: int, before: Optional[str] = None) -> List[Progress]:
+        """Page a progress query by (updated_at, id), newest first; id breaks ties."""
+        if before:
+            updated_at, progress_id = cls.decode_cursor(before)
+            query = query.filter(tuple_(Progress.updated_at, Progress.id) < (updated_at, progress_id))
+        
+        return query.order_by(desc(Progress.updated_at), desc(Progress.id)).limit(limit).all()
+    
+    @staticmethod
+    def encode_cursor(progress: Progress) -> str:
+        """Build the keyset cursor for the page after ``progress``."""
+        return f"{progress.updated_at.isoformat()}|{progress.id}"
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Parse a keyset cursor into its (updated_at, id) position."""
+        try:
+            updated_at, progress_id = cursor.rsplit('|', 1)
+            return datetime.fromisoformat(updated_at), int(progress_id)
+        except ValueError:
+            raise InvalidCursorError("Invalid pagination cursor")
 
 
 class AnalyticsService:
@@ -296,52 +470,43 @@ class AnalyticsService:
     def get_student_analytics(cls, student_id: str, filters: Optional[Dict] = None) -> Dict:
         """Get comprehensive analytics for a student."""
         try:
-            query = Progress.query.filter(Progress.student_id == student_id)
+            conditions = [Progress.student_id == student_id]
             
             # Apply date filters
             if filters and filters.get('start_date'):
-                query = query.filter(Progress.created_at >= filters['start_date'])
+                conditions.append(Progress.created_at >= filters['start_date'])
             if filters and filters.get('end_date'):
-                query = query.filter(Progress.created_at <= filters['end_date'])
-            
-            progress_records = query.all()
-            
-            # Calculate metrics
-            total_exercises = len(progress_records)
-            completed_exercises = len([p for p in progress_records if p.status == 'completed'])
-            in_progress_exercises = len([p for p in progress_records if p.status == 'in_progress'])
+                conditions.append(Progress.created_at <= filters['end_date'])
             
-            # Calculate average score
-            completed_with_scores = [p for p in progress_records if p.status == 'completed' and p.score is not None]
-            avg_score = sum(p.score for p in completed_with_scores) / len(completed_with_scores) if completed_with_scores else 0
+            is_completed = Progress.status == 'completed'
             
-            # Calculate total time spent
-            total_time = sum(p.time_spent or 0 for p in progress_records)
-            
-            # Subject breakdown
+            # Per-subject aggregates in one grouped query; the overall summary
+            # is summed from these rows in a single pass
+            subject_rows = db.session.query(
+                Exercise.subject,
+                func.count(Progress.id).label('total'),
+                func.count(Progress.id).filter(is_completed).label('completed'),
+                func.count(Progress.id).filter(Progress.status == 'in_progress').label('in_progress'),
+                func.sum(Progress.score).filter(is_completed).label('score_sum'),
+                func.coalesce(func.sum(Progress.time_spent), 0).label('total_time')
+            ).join(
+                Exercise, Exercise.id == Progress.exercise_id
+            ).filter(and_(*conditions)).group_by(Exercise.subject).all()
+            
+            total_exercises = completed_exercises = in_progress_exercises = total_time = 0
+            score_sum = 0.0
             subject_stats = {}
-            for progress in progress_records:
-                if progress.exercise and progress.exercise.subject:
-                    subject = progress.exercise.subject
-                    if subject not in subject_stats:
-                        subject_stats[subject] = {
-                            'total': 0,
-                            'completed': 0,
-                            'avg_score': 0,
-                            'scores': []
-                        }
-                    
-                    subject_stats[subject]['total'] += 1
-                    if progress.status == 'completed':
-                        subject_stats[subject]['completed'] += 1
-                        if progress.score is not None:
-                            subject_stats[subject]['scores'].append(progress.score)
-            
-            # Calculate averages for subjects
-            for subject, stats in subject_stats.items():
-                if stats['scores']:
-                    stats['avg_score'] = sum(stats['scores']) / len(stats['scores'])
-                stats.pop('scores')  # Remove raw scores from output
+            for row in subject_rows:
+                total_exercises += row.total
+                completed_exercises += row.completed
+                in_progress_exercises += row.in_progress
+                total_time += row.total_time
+                score_sum += row.score_sum or 0
+                subject_stats[row.subject] = {
+                    'total': row.total,
+                    'completed': row.completed,
+                    'avg_score': (row.score_sum / row.completed) if row.completed else 0
+                }
             
             # Recent activity (last 7 days)
             week_ago = datetime.utcnow() - timedelta(days=7)
@@ -359,7 +524,7 @@ class AnalyticsService:
                     'completed_exercises': completed_exercises,
                     'in_progress_exercises': in_progress_exercises,
                     'completion_rate': (completed_exercises / total_exercises * 100) if total_exercises > 0 else 0,
-                    'average_score': round(avg_score, 2),
+                    'average_score': round(score_sum / completed_exercises, 2) if completed_exercises else 0,
                     'total_time_spent': total_time,
                     'recent_activity': recent_activity
                 },
@@ -375,72 +540,74 @@ class AnalyticsService:
     def get_class_analytics(cls, filters: Optional[Dict] = None) -> Dict:
         """Get class-level analytics."""
         try:
-            query = db.session.query(Progress).join(Exercise)
+            conditions = []
             
             # Apply filters
             if filters:
                 if filters.get('course_id'):
-                    query = query.filter(Exercise.course_id == filters['course_id'])
+                    conditions.append(Exercise.course_id == filters['course_id'])
                 if filters.get('difficulty'):
-                    query = query.filter(Exercise.difficulty == filters['difficulty'])
+                    conditions.append(Exercise.difficulty == filters['difficulty'])
                 if filters.get('subject'):
-                    query = query.filter(Exercise.subject.ilike(f"%{filters['subject']}%"))
+                    conditions.append(Exercise.subject.ilike(f"%{filters['subject']}%"))
                 if filters.get('start_date'):
-                    query = query.filter(Progress.created_at >= filters['start_date'])
+                    conditions.append(Progress.created_at >= filters['start_date'])
                 if filters.get('end_date'):
-                    query = query.filter(Progress.created_at <= filters['end_date'])
+                    conditions.append(Progress.created_at <= filters['end_date'])
+            
+            is_completed = Progress.status == 'completed'
+            
+            # Class metrics and score distribution in one aggregate
+            summary = db.session.query(
+                func.count(Progress.id).label('total'),
+                func.count(Progress.id).filter(is_completed).label('completed'),
+                func.avg(Progress.score).label('avg_score'),
+                func.count(Progress.id).filter(Progress.score >= 90).label('range_90'),
+                func.count(Progress.id).filter(and_(Progress.score >= 80, Progress.score < 90)).label('range_80'),
+                func.count(Progress.id).filter(and_(Progress.score >= 70, Progress.score < 80)).label('range_70'),
+                func.count(Progress.id).filter(and_(Progress.score >= 60, Progress.score < 70)).label('range_60'),
+                func.count(Progress.id).filter(Progress.score < 60).label('range_below_60')
+            ).join(
+                Exercise, Exercise.id == Progress.exercise_id
+            ).filter(and_(*conditions)).one()
+            
+            total_attempts = summary.total
+            completed_attempts = summary.completed
             
-            progress_records = query.all()
-            
-            # Calculate class metrics
-            total_attempts = len(progress_records)
-            completed_attempts = len([p for p in progress_records if p.status == 'completed'])
-            
-            # Score distribution
-            scores = [p.score for p in progress_records if p.score is not None]
             score_ranges = {
-                '90-100': len([s for s in scores if s >= 90]),
-                '80-89': len([s for s in scores if 80 <= s < 90]),
-                '70-79': len([s for s in scores if 70 <= s < 80]),
-                '60-69': len([s for s in scores if 60 <= s < 70]),
-                'below-60': len([s for s in scores if s < 60])
+                '90-100': summary.range_90,
+                '80-89': summary.range_80,
+                '70-79': summary.range_70,
+                '60-69': summary.range_60,
+                'below-60': summary.range_below_60
             }
             
-            # Difficulty success rates
-            difficulty_stats = {}
-            for progress in progress_records:
-                if progress.exercise:
-                    difficulty = progress.exercise.difficulty
-                    if difficulty not in difficulty_stats:
-                        difficulty_stats[difficulty] = {
-                            'total': 0,
-                            'completed': 0,
-                            'scores': []
-                        }
-                    
-                    difficulty_stats[difficulty]['total'] += 1
-                    if progress.status == 'completed':
-                        difficulty_stats[difficulty]['completed'] += 1
-                        if progress.score is not None:
-                            difficulty_stats[difficulty]['scores'].append(progress.score)
-            
-            # Calculate success rates
-            for difficulty, stats in difficulty_stats.items():
-                success_rate = (stats['completed'] / stats['total'] * 100) if stats['total'] > 0 else 0
-                avg_score = sum(stats['scores']) / len(stats['scores']) if stats['scores'] else 0
-                difficulty_stats[difficulty] = {
-                    'total_attempts': stats['total'],
-                    'completed': stats['completed'],
-                    'success_rate': round(success_rate, 2),
-                    'average_score': round(avg_score, 2)
+            # Difficulty success rates, one row per difficulty
+            difficulty_rows = db.session.query(
+                Exercise.difficulty,
+                func.count(Progress.id).label('total'),
+                func.count(Progress.id).filter(is_completed).label('completed'),
+                func.avg(Progress.score).filter(is_completed).label('avg_score')
+            ).join(
+                Exercise, Exercise.id == Progress.exercise_id
+            ).filter(and_(*conditions)).group_by(Exercise.difficulty).all()
+            
+            difficulty_stats = {
+                row.difficulty: {
+                    'total_attempts': row.total,
+                    'completed': row.completed,
+                    'success_rate': round(row.completed / row.total * 100, 2) if row.total > 0 else 0,
+                    'average_score': round(row.avg_score or 0, 2)
                 }
+                for row in difficulty_rows
+            }
             
             return {
                 'summary': {
                     'total_attempts': total_attempts,
                     'completed_attempts': completed_attempts,
                     'completion_rate': (completed_attempts / total_attempts * 100) if total_attempts > 0 else 0,
-                    'average_score': round(sum(scores) / len(scores), 2) if scores else 0
+                    'average_score': round(summary.avg_score, 2) if summary.avg_score is not None else 0
                 },
                 'score_distribution': score_ranges,
                 'difficulty_breakdown': difficulty_stats,
@@ -455,40 +622,44 @@ class AnalyticsService:
     def get_overview_analytics(cls, filters: Optional[Dict] = None) -> Dict:
         """Get system overview analytics."""
         try:
-            # Basic counts
-            total_users = User.query.count()
-            total_students = User.query.filter(User.role == 'student').count()
-            total_professors = User.query.filter(User.role == 'professor').count()
-            total_exercises = Exercise.query.count()
-            total_progress = Progress.query.count()
-            
-            # Recent activity (last 30 days)
             month_ago = datetime.utcnow() - timedelta(days=30)
-            recent_registrations = User.query.filter(User.created_at >= month_ago).count()
+            
+            # User totals and recent registrations in one pass
+            user_counts = db.session.query(
+                func.count(User.id).label('total'),
+                func.count(User.id).filter(User.role == 'student').label('students'),
+                func.count(User.id).filter(User.role == 'professor').label('professors'),
+                func.count(User.id).filter(User.created_at >= month_ago).label('recent')
+            ).one()
+            
+            # Whole-table totals from planner statistics where available
+            estimates = cls._estimate_row_counts(['exercises', 'progress'])
+            approximate = estimates is not None
+            if approximate:
+                total_exercises = estimates['exercises']
+                total_progress = estimates['progress']
+            else:
+                total_exercises = Exercise.query.count()
+                total_progress = Progress.query.count()
+            
+            # Recent activity (last 30 days), exact: index range scans on created/updated_at
             recent_exercises = Exercise.query.filter(Exercise.created_at >= month_ago).count()
             recent_submissions = Progress.query.filter(Progress.updated_at >= month_ago).count()
             
-            # Popular subjects
-            subject_query = db.session.query(
-                Exercise.subject,
-                func.count(Progress.id).label('attempts')
-            ).join(Progress).group_by(Exercise.subject).order_by(desc('attempts')).limit(10)
-            
-            popular_subjects = [
-                {'subject': row[0], 'attempts': row[1]}
-                for row in subject_query.all()
-            ]
+            popular_subjects = cls._get_popular_subjects()
             
             return {
                 'system_overview': {
-                    'total_users': total_users,
-                    'total_students': total_students,
-                    'total_professors': total_professors,
+                    'total_users': user_counts.total,
+                    'total_students': user_counts.students,
+                    'total_professors': user_counts.professors,
                     'total_exercises': total_exercises,
-                    'total_submissions': total_progress
+                    'total_submissions': total_progress,
+                    # total_exercises/total_submissions are planner estimates
+                    'approximate': approximate
                 },
                 'recent_activity': {
-                    'new_registrations': recent_registrations,
+                    'new_registrations': user_counts.recent,
                     'new_exercises': recent_exercises,
                     'new_submissions': recent_submissions
                 },
@@ -500,26 +671,73 @@ class AnalyticsService:
             logger.error(f"Error getting overview analytics: {str(e)}")
             raise
     
+    @classmethod
+    def _get_popular_subjects(cls, limit: int = 10) -> List[Dict]:
+        """
+        Most attempted subjects. Read from the periodically refreshed
+        ``subject_attempts_mv`` rollup when it exists, live otherwise.
+        """
+        if view_available(SUBJECT_ATTEMPTS_MV):
+            rows = db.session.execute(text(f"""
+                SELECT subject, attempts FROM {SUBJECT_ATTEMPTS_MV}
+                ORDER BY attempts DESC
+                LIMIT :limit
+            """), {'limit': limit}).all()
+        else:
+            rows = db.session.query(
+                Exercise.subject,
+                func.count(Progress.id).label('attempts')
+            ).join(Progress).group_by(Exercise.subject).order_by(desc('attempts')).limit(limit).all()
+        
+        return [
+            {'subject': row.subject, 'attempts': row.attempts}
+            for row in rows
+        ]
+    
+    @classmethod
+    def _estimate_row_counts(cls, table_names: List[str]) -> Optional[Dict[str, int]]:
+        """
+        Estimated row counts from ``pg_class.reltuples``, kept current by
+        (auto)ANALYZE. Returns None off PostgreSQL or when a table has no
+        statistics yet, so callers can fall back to exact counts.
+        """
+        if not is_postgresql():
+            return None
+        
+        rows = db.session.execute(text("""
+            SELECT relname, CAST(reltuples AS BIGINT) AS estimate
+            FROM pg_class
+            WHERE relkind = 'r' AND relname = ANY(:names)
+        """), {'names': table_names}).all()
+        
+        estimates = {row.relname: row.estimate for row in rows}
+        if any(estimates.get(name, -1) < 0 for name in table_names):
+            return None
+        return estimates
+    
     @classmethod
     def _get_performance_trend(cls, student_id: str, filters: Optional[Dict] = None) -> List[Dict]:
         """Get performance trend for a student."""
         try:
-            # Get last 10 completed exercises
-            query = Progress.query.filter(
+            # Get last 10 completed exercises, as plain column rows
+            progress_records = db.session.query(
+                Progress.completed_at,
+                Progress.score,
+                Exercise.title.label('exercise_title')
+            ).outerjoin(
+                Exercise, Exercise.id == Progress.exercise_id
+            ).filter(
                 and_(
                     Progress.student_id == student_id,
-                    Progress.status == 'completed',
-                    Progress.score.isnot(None)
+                    Progress.status == 'completed'
                 )
-            ).order_by(desc(Progress.completed_at)).limit(10)
-            
-            progress_records = query.all()
+            ).order_by(desc(Progress.completed_at)).limit(10).all()
             
             return [
                 {
                     'date': p.completed_at.isoformat() if p.completed_at else None,
                     'score': p.score,
-                    'exercise_title': p.exercise.title if p.exercise else None
+                    'exercise_title': p.exercise_title
                 }
                 for p in reversed(progress_records)  # Chronological order
             ]
@@ -533,9 +751,9 @@ class AnalyticsService:
         """Get count of active students (submitted in last 7 days)."""
         try:
             week_ago = datetime.utcnow() - timedelta(days=7)
-            return db.session.query(Progress.student_id).filter(
-                Progress.updated_at >= week_ago
-            ).distinct().count()
+            return db.session.query(
+                func.count(func.distinct(Progress.student_id))
+            ).filter(Progress.updated_at >= week_ago).scalar() or 0
         except Exception as e:
             logger.error(f"Error getting active students count: {str(e)}")
             return 0
@@ -548,15 +766,19 @@ class AnalyticsService:
             current_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             last_month = (current_month - timedelta(days=1)).replace(day=1)
             
-            current_users = User.query.filter(User.created_at >= current_month).count()
-            last_month_users = User.query.filter(
-                and_(User.created_at >= last_month, User.created_at < current_month)
-            ).count()
+            # Both months counted in one range scan per table
+            users = db.session.query(
+                func.count(User.id).filter(User.created_at >= current_month).label('current'),
+                func.count(User.id).filter(User.created_at < current_month).label('previous')
+            ).filter(User.created_at >= last_month).one()
             
-            current_exercises = Exercise.query.filter(Exercise.created_at >= current_month).count()
-            last_month_exercises = Exercise.query.filter(
-                and_(Exercise.created_at >= last_month, Exercise.created_at < current_month)
-            ).count()
+            exercises = db.session.query(
+                func.count(Exercise.id).filter(Exercise.created_at >= current_month).label('current'),
+                func.count(Exercise.id).filter(Exercise.created_at < current_month).label('previous')
+            ).filter(Exercise.created_at >= last_month).one()
+            
+            current_users, last_month_users = users.current, users.previous
+            current_exercises, last_month_exercises = exercises.current, exercises.previous
             
             return {
                 'user_growth': {
@@ -1,53 +1,223 @@
 """
 File upload service for handling various file types with storage options.
 """
+import io
 import os
 import logging
 import hashlib
+import shutil
 import mimetypes
-from typing import Dict, List, Optional, Any, Tuple, Union
+import multiprocessing
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Dict, List, Optional, Any, Set, Tuple, Union
 from datetime import datetime
-from uuid import uuid4
+from types import MappingProxyType
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from PIL import Image
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 from flask import current_app
-from sqlalchemy import and_, desc
+from sqlalchemy import bindparam, delete, desc, func, select
 from app.extensions import db
 from app.models import UploadedFile, User
 from app.services.base import BaseService
 
 logger = logging.getLogger(__name__)
 
+# Read size when copying uploads (and hashing them without hashlib.file_digest)
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# S3 objects above the threshold go up as concurrent multipart uploads
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+S3_MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+S3_MAX_CONCURRENCY = 10
+
+# Seconds to wait for an image worker before storing the upload unprocessed
+IMAGE_PROCESS_TIMEOUT = 30
+
+# Upload directories known to exist in this process; FileUploadService is
+# created per request, so the cache lives at module level
+_ensured_dirs: Set[str] = set()
+
+
+def _ensure_dir(path: str) -> bool:
+    """Create a directory once per process. Returns True if it was created."""
+    if path in _ensured_dirs:
+        return False
+    created = not os.path.isdir(path)
+    os.makedirs(path, exist_ok=True)
+    _ensured_dirs.add(path)
+    return created
+
+
+# Image decode/resize/encode is CPU-bound, so it runs in a process pool
+# shared by every request of this worker process (created lazily, since
+# the pool size comes from the app config). The semaphore bounds how many
+# images are queued or in flight, and with it the memory they hold.
+_image_pool: Optional[ProcessPoolExecutor] = None
+_image_slots: Optional[threading.BoundedSemaphore] = None
+_image_pool_lock = threading.Lock()
+
+# Web workers are threaded, so pool processes are never forked from them: a
+# child forked while another thread holds a lock can deadlock on it
+_IMAGE_POOL_START_METHOD = (
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+def _get_image_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Return the image process pool, or None when it is disabled.
+    
+    ``workers`` comes from ``UPLOAD_IMAGE_PROCESSES``; callers read it on the
+    request thread, since upload worker threads have no app context.
+    """
+    global _image_pool, _image_slots
+    
+    if workers <= 0:
+        return None
+    
+    if _image_pool is None:
+        with _image_pool_lock:
+            if _image_pool is None:
+                _image_slots = threading.BoundedSemaphore(workers * 2)
+                _image_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context(_IMAGE_POOL_START_METHOD)
+                )
+    
+    return _image_pool
+
+
+def _reset_image_pool() -> None:
+    """Drop a broken image pool so the next upload starts a new one."""
+    global _image_pool
+    
+    with _image_pool_lock:
+        if _image_pool is not None:
+            _image_pool.shutdown(wait=False, cancel_futures=True)
+            _image_pool = None
+
+
+def process_image_bytes(data: bytes, max_width: int = 1920, max_height: int = 1080) -> Optional[bytes]:
+    """
+    Resize and re-encode an image as an optimized progressive JPEG.
+    
+    A plain module-level function so it can be pickled into the image
+    process pool; it must not touch the app context or the database.
+    
+    Returns:
+        The re-encoded JPEG, or None if the image could not be processed
+        (the upload is then stored as is)
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        oversized = image.width > max_width or image.height > max_height
+        
+        # Let libjpeg decode at a reduced scale (shrink-on-load); no-op for
+        # other formats. Must run before anything touches the pixels, so no
+        # copy()/load() may move above it
+        if oversized:
+            image.draft('RGB', (max_width * 2, max_height * 2))
+        
+        # Convert RGBA to RGB if necessary
+        if image.mode == 'RGBA':
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        
+        # Resize if too large
+        if oversized:
+            image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+        
+        # Save back to bytes as an optimized progressive JPEG; EXIF and ICC
+        # data are only written when passed to save(), so none is kept
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=85, optimize=True,
+                   progressive=True, subsampling='4:2:0')
+        return output.getvalue()
+        
+    except Exception as e:
+        logger.warning(f"Image processing failed: {str(e)}")
+        return None
+
+
+# Upload hashes are only content-addressed dedup keys, never used for
+# authentication, so they are built with usedforsecurity=False (lets
+# OpenSSL skip FIPS wrappers and use its fastest SHA-NI/ARMv8 path).
+# Digests other than the legacy sha256 are stored as "<name>:<hex>" so a
+# dedup lookup only ever matches rows hashed with the same algorithm.
+HASH_ALGORITHMS = {
+    'sha256': lambda: hashlib.new('sha256', usedforsecurity=False),
+    'blake2b-128': lambda: hashlib.blake2b(digest_size=16, usedforsecurity=False)
+}
+
+
+# Dedup lookup, built once; SQLAlchemy's compiled cache then reuses its SQL
+_DEDUP_STMT = select(UploadedFile).where(
+    UploadedFile.file_hash == bindparam('file_hash'),
+    UploadedFile.uploader_id == bindparam('uploader_id')
+).limit(1)
+
 
 class FileUploadService(BaseService):
     """Service for handling file uploads with multiple storage backends."""
     
     model = UploadedFile
     
-    # Allowed file types and their configurations
-    ALLOWED_EXTENSIONS = {
-        'image': {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp'},
-        'document': {'pdf', 'doc', 'docx', 'txt', 'rtf'},
-        'spreadsheet': {'xls', 'xlsx', 'csv'},
-        'presentation': {'ppt', 'pptx'},
-        'archive': {'zip', 'tar', 'gz', 'rar'},
-        'code': {'py', 'js', 'html', 'css', 'json', 'xml'}
-    }
-    
-    MAX_FILE_SIZES = {
+    # Allowed file types and their configurations. The lookup tables are
+    # read-only views, shared safely by the upload worker threads
+    ALLOWED_EXTENSIONS = MappingProxyType({
+        'image': frozenset({'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp'}),
+        'document': frozenset({'pdf', 'doc', 'docx', 'txt', 'rtf'}),
+        'spreadsheet': frozenset({'xls', 'xlsx', 'csv'}),
+        'presentation': frozenset({'ppt', 'pptx'}),
+        'archive': frozenset({'zip', 'tar', 'gz', 'rar'}),
+        'code': frozenset({'py', 'js', 'html', 'css', 'json', 'xml'})
+    })
+    
+    # Extension -> category, for a single lookup per file
+    EXTENSION_CATEGORIES = MappingProxyType({
+        extension: category
+        for category, extensions in ALLOWED_EXTENSIONS.items()
+        for extension in extensions
+    })
+    
+    # Extension -> MIME type, resolved once from the mimetypes database
+    EXTENSION_MIME_TYPES = MappingProxyType({
+        extension: mimetypes.guess_type(f"file.{extension}")[0] or 'application/octet-stream'
+        for extension in EXTENSION_CATEGORIES
+    })
+    
+    MAX_FILE_SIZES = MappingProxyType({
         'image': 10 * 1024 * 1024,  # 10MB
         'document': 50 * 1024 * 1024,  # 50MB
         'spreadsheet': 25 * 1024 * 1024,  # 25MB
         'presentation': 100 * 1024 * 1024,  # 100MB
         'archive': 200 * 1024 * 1024,  # 200MB
         'code': 5 * 1024 * 1024  # 5MB
-    }
+    })
+    
+    # Keys per S3 DeleteObjects request (the API maximum)
+    S3_DELETE_BATCH_SIZE = 1000
     
     def __init__(self):
         self.s3_client = None
+        # Admin checks for this service instance, i.e. one request
+        self._admin_cache: Dict[str, bool] = {}
+        self.s3_transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=S3_MAX_CONCURRENCY,
+            use_threads=True
+        )
         self._init_s3()
         self._ensure_upload_directory()
     
@@ -74,8 +244,7 @@ class FileUploadService(BaseService):
     def _ensure_upload_directory(self):
         """Ensure upload directory exists."""
         upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir, exist_ok=True)
+        if _ensure_dir(upload_dir):
             logger.info(f"Created upload directory: {upload_dir}")
     
     @classmethod
@@ -85,12 +254,13 @@ class FileUploadService(BaseService):
             return 'unknown'
         
         extension = filename.rsplit('.', 1)[1].lower()
-        
-        for category, extensions in cls.ALLOWED_EXTENSIONS.items():
-            if extension in extensions:
-                return category
-        
-        return 'unknown'
+        return cls.EXTENSION_CATEGORIES.get(extension, 'unknown')
+    
+    @classmethod
+    def _get_mime_type(cls, filename: str) -> str:
+        """Get the MIME type for an allowed file extension."""
+        extension = filename.rsplit('.', 1)[-1].lower()
+        return cls.EXTENSION_MIME_TYPES.get(extension, 'application/octet-stream')
     
     @classmethod
     def _validate_file(cls, file: FileStorage, allowed_categories: Optional[List[str]] = None) -> Tuple[bool, str, str]:
@@ -110,50 +280,88 @@ class FileUploadService(BaseService):
         if allowed_categories and category not in allowed_categories:
             return False, f"File category '{category}' not allowed", ""
         
-        # Check file size (get size by seeking to end)
+        max_size = cls.MAX_FILE_SIZES.get(category, 10 * 1024 * 1024)
+        too_large = f"File too large. Maximum size: {max_size // (1024*1024)}MB"
+        
+        # A declared part Content-Length over the limit is rejected before
+        # anything seeks the stream; the header is client-supplied, so it can
+        # only reject, never accept
+        if file.content_length and file.content_length > max_size:
+            return False, too_large, ""
+        
+        # Check the real file size (get size by seeking to end)
         file.seek(0, 2)  # Seek to end
         file_size = file.tell()
         file.seek(0)  # Reset to beginning
         
-        max_size = cls.MAX_FILE_SIZES.get(category, 10 * 1024 * 1024)
         if file_size > max_size:
-            return False, f"File too large. Maximum size: {max_size // (1024*1024)}MB", ""
+            return False, too_large, ""
         
         return True, "", category
     
     def _generate_unique_filename(self, original_filename: str, user_id: str) -> str:
         """Generate unique filename to prevent conflicts."""
-        secure_name = secure_filename(original_filename)
-        name, ext = os.path.splitext(secure_name)
+        # Upload second plus 48 random bits keeps names unique per user
+        return f"{user_id}_{int(time.time())}_{secrets.token_urlsafe(6)}_{secure_filename(original_filename)}"
+    
+    def _calculate_file_hash(self, fp: BinaryIO, algorithm: Optional[str] = None) -> str:
+        """
+        Calculate the dedup hash of a binary file object, streamed from the start.
         
-        # Create unique identifier
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        unique_id = str(uuid4())[:8]
+        The file is rewound afterwards so it can still be read or saved. Pass
+        ``algorithm`` when calling outside an app context (e.g. from a worker).
+        """
+        algorithm = algorithm or current_app.config.get('UPLOAD_HASH_ALGORITHM', 'sha256')
+        new_hasher = HASH_ALGORITHMS[algorithm]
         
-        return f"{user_id}_{timestamp}_{unique_id}_{name}{ext}"
-    
-    def _calculate_file_hash(self, file_content: bytes) -> str:
-        """Calculate SHA-256 hash of file content."""
-        return hashlib.sha256(file_content).hexdigest()
+        fp.seek(0)
+        if hasattr(hashlib, 'file_digest'):
+            hasher = hashlib.file_digest(fp, new_hasher)
+        else:
+            # Python < 3.11: read() loop, since SpooledTemporaryFile (werkzeug's
+            # buffer for larger uploads) has no readinto() before 3.11
+            hasher = new_hasher()
+            for chunk in iter(lambda: fp.read(STREAM_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        fp.seek(0)
+        
+        if algorithm == 'sha256':
+            return hasher.hexdigest()
+        return f"{algorithm}:{hasher.hexdigest()}"
     
-    def _save_to_local(self, file_content: bytes, filename: str) -> str:
-        """Save file to local storage."""
+    def _save_to_local(self, fileobj: BinaryIO, filename: str) -> str:
+        """Save file to local storage, copying from a file object in chunks."""
         upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
         
         # Create subdirectories by date
         date_dir = datetime.utcnow().strftime('%Y/%m/%d')
         full_dir = os.path.join(upload_dir, date_dir)
-        os.makedirs(full_dir, exist_ok=True)
+        _ensure_dir(full_dir)
         
         file_path = os.path.join(full_dir, filename)
         
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        try:
+            f = open(file_path, 'wb')
+        except FileNotFoundError:
+            # Directory removed since it was cached
+            _ensured_dirs.discard(full_dir)
+            _ensure_dir(full_dir)
+            f = open(file_path, 'wb')
+        
+        with f:
+            shutil.copyfileobj(fileobj, f, STREAM_CHUNK_SIZE)
         
         return os.path.join(date_dir, filename)  # Return relative path
     
-    def _save_to_s3(self, file_content: bytes, filename: str) -> str:
-        """Save file to S3."""
+    def _save_to_s3(self, fileobj: BinaryIO, filename: str) -> str:
+        """
+        Save file to S3, streaming from a file object.
+        
+        Large files are sent as a managed multipart upload whose parts go up
+        concurrently and are retried individually. S3 gives strong
+        read-after-write consistency, so the key can be presigned and read as
+        soon as this returns; no second copy is written.
+        """
         if not self.s3_client:
             raise Exception("S3 not configured")
         
@@ -166,40 +374,56 @@ class FileUploadService(BaseService):
         s3_key = f"{date_prefix}/{filename}"
         
         try:
-            self.s3_client.put_object(
-                Bucket=bucket_name,
-                Key=s3_key,
-                Body=file_content,
-                ContentType=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            self.s3_client.upload_fileobj(
+                fileobj,
+                bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': self._get_mime_type(filename)},
+                Config=self.s3_transfer_config
             )
             return s3_key
         except ClientError as e:
             logger.error(f"S3 upload error: {str(e)}")
             raise Exception(f"Failed to upload to S3: {str(e)}")
     
-    def _process_image(self, file_content: bytes, max_width: int = 1920, max_height: int = 1080) -> bytes:
-        """Process and resize image if needed."""
+    def _process_image(self, fp: BinaryIO, max_width: int = 1920, max_height: int = 1080,
+                       image_pool: Optional[ProcessPoolExecutor] = None) -> Optional[bytes]:
+        """
+        Process and resize an image read from a binary file object.
+        
+        The work is handed to ``image_pool`` when one is given (see
+        ``_get_image_pool``), so large decodes run on other cores instead of
+        holding this worker; without one the image is processed inline.
+        
+        Returns:
+            The re-encoded JPEG, or None if the image could not be processed
+            (the upload is then stored as is)
+        """
         try:
-            image = Image.open(io.BytesIO(file_content))
-            
-            # Convert RGBA to RGB if necessary
-            if image.mode == 'RGBA':
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1])
-                image = background
+            fp.seek(0)
+            data = fp.read()
             
-            # Resize if too large
-            if image.width > max_width or image.height > max_height:
-                image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-            
-            # Save back to bytes
-            output = io.BytesIO()
-            image.save(output, format='JPEG', quality=85, optimize=True)
-            return output.getvalue()
+            if image_pool is None:
+                return process_image_bytes(data, max_width, max_height)
             
+            with _image_slots:
+                future = image_pool.submit(process_image_bytes, data, max_width, max_height)
+                try:
+                    return future.result(timeout=IMAGE_PROCESS_TIMEOUT)
+                except FuturesTimeoutError:
+                    future.cancel()
+                    logger.warning("Image processing timed out, storing original")
+                    return None
+            
+        except BrokenProcessPool as e:
+            logger.error(f"Image process pool failed: {str(e)}")
+            _reset_image_pool()
+            return None
         except Exception as e:
             logger.warning(f"Image processing failed: {str(e)}")
-            return file_content  # Return original if processing fails
+            return None
+        finally:
+            fp.seek(0)
     
     def upload_file(
         self,
@@ -230,65 +454,154 @@ class FileUploadService(BaseService):
             if not is_valid:
                 raise ValueError(error_msg)
             
-            # Read file content
-            file.seek(0)
-            file_content = file.read()
-            file.seek(0)
-            
-            # Process images if needed
-            if category == 'image' and process_images:
-                file_content = self._process_image(file_content)
-            
-            # Generate unique filename
-            unique_filename = self._generate_unique_filename(file.filename, user_id)
-            
-            # Calculate file hash for deduplication
-            file_hash = self._calculate_file_hash(file_content)
-            
-            # Check for duplicate files
-            existing_file = UploadedFile.query.filter(
-                and_(
-                    UploadedFile.file_hash == file_hash,
-                    UploadedFile.uploaded_by == user_id
-                )
-            ).first()
-            
-            if existing_file:
-                logger.info(f"Duplicate file detected: {file_hash}")
-                return existing_file
-            
-            # Save file based on storage type
-            if storage_type == 's3' and self.s3_client:
-                file_path = self._save_to_s3(file_content, unique_filename)
-            else:
-                file_path = self._save_to_local(file_content, unique_filename)
-                storage_type = 'local'  # Fallback to local if S3 fails
-            
-            # Create database record
-            uploaded_file = UploadedFile(
-                original_filename=file.filename,
-                stored_filename=unique_filename,
-                file_path=file_path,
-                file_size=len(file_content),
-                file_type=category,
-                mime_type=file.mimetype or mimetypes.guess_type(file.filename)[0],
-                file_hash=file_hash,
-                storage_type=storage_type,
-                uploaded_by=user_id,
-                metadata=metadata or {}
+            prepared = self._prepare_upload(
+                file, category, process_images,
+                current_app.config.get('UPLOAD_HASH_ALGORITHM', 'sha256'),
+                self._image_pool(process_images)
             )
+            return self._store_upload(file, category, prepared, user_id, storage_type, metadata)
             
-            db.session.add(uploaded_file)
-            db.session.commit()
-            
-            logger.info(f"File uploaded successfully: {uploaded_file.id}")
-            return uploaded_file
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"File upload failed: {str(e)}")
+            raise
+    
+    def upload_files(
+        self,
+        files: List[FileStorage],
+        user_id: str,
+        storage_type: str = 'local',
+        allowed_categories: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        process_images: bool = True
+    ) -> List[UploadedFile]:
+        """
+        Upload several files, hashing and processing them concurrently.
+        
+        Hashing and image processing run in C code that releases the GIL, so
+        they are spread over a thread pool. Deduplication, storage and
+        the database writes then run in order on the request thread, which
+        owns the app context and the session.
+        
+        Returns:
+            UploadedFile objects, in the order of ``files``
+        """
+        try:
+            categories = []
+            for file in files:
+                is_valid, error_msg, category = self._validate_file(file, allowed_categories)
+                if not is_valid:
+                    raise ValueError(f"{file.filename}: {error_msg}")
+                categories.append(category)
+            
+            if not files:
+                return []
+            
+            # Config is read here: the upload threads have no app context
+            algorithm = current_app.config.get('UPLOAD_HASH_ALGORITHM', 'sha256')
+            image_pool = self._image_pool(process_images)
+            max_workers = min(current_app.config.get('UPLOAD_MAX_WORKERS', 4), len(files))
+            
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload') as executor:
+                futures = [
+                    executor.submit(self._prepare_upload, file, category, process_images,
+                                    algorithm, image_pool)
+                    for file, category in zip(files, categories)
+                ]
+                
+                # Earlier files are stored while later ones are still hashing
+                return [
+                    self._store_upload(file, category, future.result(), user_id, storage_type, metadata)
+                    for file, category, future in zip(files, categories, futures)
+                ]
             
         except Exception as e:
             db.session.rollback()
             logger.error(f"File upload failed: {str(e)}")
             raise
     
+    def _image_pool(self, process_images: bool) -> Optional[ProcessPoolExecutor]:
+        """Resolve the image process pool on the request thread (needs the app context)."""
+        if not process_images:
+            return None
+        return _get_image_pool(current_app.config.get('UPLOAD_IMAGE_PROCESSES', os.cpu_count() or 1))
+    
+    def _prepare_upload(self, file: FileStorage, category: str, process_images: bool,
+                        algorithm: str,
+                        image_pool: Optional[ProcessPoolExecutor] = None) -> Tuple[str, Optional[bytes]]:
+        """
+        Hash an upload (processing images first) without touching the app context.
+        
+        Returns:
+            Tuple of the dedup hash and the processed content, or None when the
+            content is stored as uploaded
+        """
+        # Processed images are stored (and hashed) as rewritten; other files are
+        # hashed straight from the upload stream so a duplicate is never read
+        # into memory
+        if category == 'image' and process_images:
+            file_content = self._process_image(file.stream, image_pool=image_pool)
+            if file_content is not None:
+                return self._calculate_file_hash(io.BytesIO(file_content), algorithm), file_content
+        
+        return self._calculate_file_hash(file.stream, algorithm), None
+    
+    def _store_upload(self, file: FileStorage, category: str, prepared: Tuple[str, Optional[bytes]],
+                      user_id: str, storage_type: str,
+                      metadata: Optional[Dict[str, Any]]) -> UploadedFile:
+        """Deduplicate, save and record a prepared upload."""
+        file_hash, file_content = prepared
+        
+        # Check for duplicate files
+        existing_file = db.session.scalars(
+            _DEDUP_STMT, {'file_hash': file_hash, 'uploader_id': user_id}
+        ).first()
+        
+        if existing_file:
+            logger.info(f"Duplicate file detected: {file_hash}")
+            return existing_file
+        
+        # Store unprocessed uploads straight from the request stream, without
+        # reading them into memory
+        if file_content is None:
+            source = file.stream
+            source.seek(0, 2)
+            file_size = source.tell()
+            source.seek(0)
+        else:
+            source = io.BytesIO(file_content)
+            file_size = len(file_content)
+        
+        # Generate unique filename
+        unique_filename = self._generate_unique_filename(file.filename, user_id)
+        
+        # Save file based on storage type
+        if storage_type == 's3' and self.s3_client:
+            file_path = self._save_to_s3(source, unique_filename)
+        else:
+            file_path = self._save_to_local(source, unique_filename)
+            storage_type = 'local'  # Fallback to local if S3 fails
+        
+        # Create database record
+        uploaded_file = UploadedFile(
+            original_filename=file.filename,
+            stored_filename=unique_filename,
+            file_path=file_path,
+            file_size=file_size,
+            file_type=category,
+            mime_type=file.mimetype or self._get_mime_type(file.filename),
+            file_hash=file_hash,
+            storage_type=storage_type,
+            uploaded_by=user_id,
+            metadata=metadata or {}
+        )
+        
+        db.session.add(uploaded_file)
+        db.session.commit()
+        
+        logger.info(f"File uploaded successfully: {uploaded_file.id}")
+        return uploaded_file
+    
     def get_file_url(self, file_id: int, user_id: str, expires_in: int = 3600) -> str:
         """
         Get URL for accessing a file.
@@ -307,34 +620,109 @@ class FileUploadService(BaseService):
                 raise ValueError("File not found")
             
             # Check permissions (owner or admin)
-            if str(uploaded_file.uploaded_by) != user_id:
-                user = User.query.get(user_id)
-                if not user or user.role != 'admin':
-                    raise PermissionError("Access denied")
-            
-            if uploaded_file.storage_type == 's3' and self.s3_client:
-                # Generate presigned URL for S3
-                bucket_name = current_app.config.get('S3_BUCKET_NAME')
-                if bucket_name:
-                    try:
-                        url = self.s3_client.generate_presigned_url(
-                            'get_object',
-                            Params={'Bucket': bucket_name, 'Key': uploaded_file.file_path},
-                            ExpiresIn=expires_in
-                        )
-                        return url
-                    except ClientError as e:
-                        logger.error(f"Failed to generate S3 presigned URL: {str(e)}")
-                        raise Exception("Failed to generate file URL")
+            if not self._can_access(uploaded_file, user_id):
+                raise PermissionError("Access denied")
             
-            # Return local file URL
-            base_url = current_app.config.get('BASE_URL', 'http://localhost:5000')
-            return f"{base_url}/api/files/{file_id}/download"
+            return self._build_file_url(uploaded_file, expires_in)
             
         except Exception as e:
             logger.error(f"Error getting file URL for {file_id}: {str(e)}")
             raise
     
+    def get_file_urls(self, file_ids: List[int], user_id: str, expires_in: int = 3600) -> Dict[str, list]:
+        """
+        Get access URLs for several files with a single lookup.
+        
+        Returns:
+            Dictionary with 'success' ({file_id, url} items) and 'failed'
+            ({file_id, error} items) lists
+        """
+        results = {'success': [], 'failed': []}
+        files, results['failed'] = self._load_accessible_files(file_ids, user_id)
+        
+        for uploaded_file in files:
+            try:
+                results['success'].append({
+                    'file_id': uploaded_file.id,
+                    'url': self._build_file_url(uploaded_file, expires_in)
+                })
+            except Exception as e:
+                results['failed'].append({'file_id': uploaded_file.id, 'error': str(e)})
+        
+        return results
+    
+    def _is_admin(self, user_id: str) -> bool:
+        """Check whether a user is an admin, once per service instance."""
+        if user_id not in self._admin_cache:
+            role = db.session.scalar(select(User.role).where(User.id == user_id))
+            self._admin_cache[user_id] = role == 'admin'
+        return self._admin_cache[user_id]
+    
+    def _can_access(self, uploaded_file: UploadedFile, user_id: str) -> bool:
+        """Owners and admins may read or delete a file."""
+        return str(uploaded_file.uploaded_by) == user_id or self._is_admin(user_id)
+    
+    def _load_accessible_files(self, file_ids: List[int],
+                               user_id: str) -> Tuple[List[UploadedFile], List[Dict[str, Any]]]:
+        """
+        Load files by ID in one query and split out the ones the user may not access.
+        
+        IDs arrive straight from request JSON, so they are coerced to int up
+        front; ones that are not integers are reported as invalid.
+        
+        Returns:
+            Tuple of the accessible files (in ``file_ids`` order) and
+            {file_id, error} items for the rest
+        """
+        ids, failed = [], []
+        for file_id in file_ids:
+            try:
+                if isinstance(file_id, (bool, float)):
+                    raise TypeError(file_id)
+                ids.append(int(file_id))
+            except (TypeError, ValueError):
+                failed.append({'file_id': file_id, 'error': 'Invalid file ID'})
+        
+        found = {
+            f.id: f for f in UploadedFile.query.filter(UploadedFile.id.in_(ids)).all()
+        } if ids else {}
+        
+        files = []
+        for file_id in ids:
+            uploaded_file = found.get(file_id)
+            if not uploaded_file:
+                failed.append({'file_id': file_id, 'error': 'File not found'})
+            elif not self._can_access(uploaded_file, user_id):
+                failed.append({'file_id': file_id, 'error': 'Access denied'})
+            else:
+                files.append(uploaded_file)
+        
+        return files, failed
+    
+    def _build_file_url(self, uploaded_file: UploadedFile, expires_in: int = 3600) -> str:
+        """
+        Build the access URL for an already loaded and authorized file.
+        
+        S3 presigning is a local signature computation, so no request is made.
+        """
+        if uploaded_file.storage_type == 's3' and self.s3_client:
+            # Generate presigned URL for S3
+            bucket_name = current_app.config.get('S3_BUCKET_NAME')
+            if bucket_name:
+                try:
+                    return self.s3_client.generate_presigned_url(
+                        'get_object',
+                        Params={'Bucket': bucket_name, 'Key': uploaded_file.file_path},
+                        ExpiresIn=expires_in
+                    )
+                except ClientError as e:
+                    logger.error(f"Failed to generate S3 presigned URL: {str(e)}")
+                    raise Exception("Failed to generate file URL")
+        
+        # Return local file URL
+        base_url = current_app.config.get('BASE_URL', 'http://localhost:5000')
+        return f"{base_url}/api/files/{uploaded_file.id}/download"
+    
     def delete_file(self, file_id: int, user_id: str) -> bool:
         """
         Delete a file from storage and database.
@@ -352,10 +740,8 @@ class FileUploadService(BaseService):
                 raise ValueError("File not found")
             
             # Check permissions
-            if str(uploaded_file.uploaded_by) != user_id:
-                user = User.query.get(user_id)
-                if not user or user.role != 'admin':
-                    raise PermissionError("Access denied")
+            if not self._can_access(uploaded_file, user_id):
+                raise PermissionError("Access denied")
             
             # Delete from storage
             if uploaded_file.storage_type == 's3' and self.s3_client:
@@ -372,8 +758,10 @@ class FileUploadService(BaseService):
                 # Delete from local storage
                 upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
                 full_path = os.path.join(upload_dir, uploaded_file.file_path)
-                if os.path.exists(full_path):
-                    os.remove(full_path)
+                try:
+                    os.unlink(full_path)
+                except FileNotFoundError:
+                    logger.info(f"File already removed from storage: {full_path}")
             
             # Delete from database
             db.session.delete(uploaded_file)
@@ -387,6 +775,74 @@ class FileUploadService(BaseService):
             logger.error(f"Error deleting file {file_id}: {str(e)}")
             raise
     
+    def delete_files(self, file_ids: List[int], user_id: str) -> Dict[str, list]:
+        """
+        Delete several files from storage and database.
+        
+        Files are loaded with one query and removed with one DELETE and one
+        commit; S3 objects go in DeleteObjects batches instead of one request
+        per key. A local file that cannot be removed is reported as failed
+        and its record is kept.
+        
+        Returns:
+            Dictionary with 'success' (deleted file IDs) and 'failed'
+            ({file_id, error} items) lists
+        """
+        try:
+            files, failed = self._load_accessible_files(file_ids, user_id)
+            if not files:
+                return {'success': [], 'failed': failed}
+            
+            bucket_name = current_app.config.get('S3_BUCKET_NAME')
+            upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+            
+            s3_keys, deleted_ids = [], []
+            for uploaded_file in files:
+                if uploaded_file.storage_type == 's3' and self.s3_client:
+                    if bucket_name:
+                        s3_keys.append({'Key': uploaded_file.file_path})
+                else:
+                    full_path = os.path.join(upload_dir, uploaded_file.file_path)
+                    try:
+                        os.unlink(full_path)
+                    except FileNotFoundError:
+                        logger.info(f"File already removed from storage: {full_path}")
+                    except OSError as e:
+                        logger.error(f"Failed to delete from storage: {full_path}: {str(e)}")
+                        failed.append({'file_id': uploaded_file.id, 'error': 'Failed to delete from storage'})
+                        continue
+                deleted_ids.append(uploaded_file.id)
+            
+            for start in range(0, len(s3_keys), self.S3_DELETE_BATCH_SIZE):
+                try:
+                    response = self.s3_client.delete_objects(
+                        Bucket=bucket_name,
+                        Delete={
+                            'Objects': s3_keys[start:start + self.S3_DELETE_BATCH_SIZE],
+                            'Quiet': True
+                        }
+                    )
+                    for error in response.get('Errors', []):
+                        logger.warning(f"Failed to delete from S3: {error.get('Key')}: {error.get('Message')}")
+                except ClientError as e:
+                    logger.warning(f"Failed to delete from S3: {str(e)}")
+            
+            # Delete from database
+            if deleted_ids:
+                db.session.execute(
+                    delete(UploadedFile).where(UploadedFile.id.in_(deleted_ids)),
+                    execution_options={'synchronize_session': False}
+                )
+                db.session.commit()
+            
+            logger.info(f"Deleted {len(deleted_ids)} files")
+            return {'success': deleted_ids, 'failed': failed}
+            
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error deleting files {file_ids}: {str(e)}")
+            raise
+    
     def get_user_files(
         self,
         user_id: str,
@@ -413,10 +869,11 @@ class FileUploadService(BaseService):
             files = []
             for file_obj in paginated.items:
                 file_dict = file_obj.to_dict()
-                # Add download URL
+                # Add download URL; the files are the user's own, so there is
+                # nothing to reload or re-authorize per item
                 try:
-                    file_dict['download_url'] = self.get_file_url(file_obj.id, user_id)
-                except:
+                    file_dict['download_url'] = self._build_file_url(file_obj)
+                except Exception:
                     file_dict['download_url'] = None
                 files.append(file_dict)
             
@@ -437,29 +894,37 @@ class FileUploadService(BaseService):
     def get_storage_stats(self, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Get storage usage statistics."""
         try:
-            query = UploadedFile.query
+            # One grouped row per (file type, storage) pair, summed below
+            query = db.session.query(
+                UploadedFile.file_type,
+                UploadedFile.storage_type,
+                func.count(UploadedFile.id).label('count'),
+                func.coalesce(func.sum(UploadedFile.file_size), 0).label('size')
+            )
             
             if user_id:
                 query = query.filter(UploadedFile.uploaded_by == user_id)
             
-            files = query.all()
+            rows = query.group_by(UploadedFile.file_type, UploadedFile.storage_type).all()
             
             stats = {
-                'total_files': len(files),
-                'total_size': sum(f.file_size for f in files),
+                'total_files': 0,
+                'total_size': 0,
                 'by_type': {},
                 'by_storage': {'local': 0, 's3': 0}
             }
             
-            for file_obj in files:
+            for row in rows:
+                stats['total_files'] += row.count
+                stats['total_size'] += row.size
+                
                 # Count by file type
-                if file_obj.file_type not in stats['by_type']:
-                    stats['by_type'][file_obj.file_type] = {'count': 0, 'size': 0}
-                stats['by_type'][file_obj.file_type]['count'] += 1
-                stats['by_type'][file_obj.file_type]['size'] += file_obj.file_size
+                by_type = stats['by_type'].setdefault(row.file_type, {'count': 0, 'size': 0})
+                by_type['count'] += row.count
+                by_type['size'] += row.size
                 
                 # Count by storage type
-                stats['by_storage'][file_obj.storage_type] += 1
+                stats['by_storage'][row.storage_type] += row.count
             
             # Convert bytes to human readable
             stats['total_size_mb'] = round(stats['total_size'] / (1024 * 1024), 2)
@@ -470,6 +935,3 @@ class FileUploadService(BaseService):
             logger.error(f"Error getting storage stats: {str(e)}")
             raise
 
-
-# Import io module for image processing
-import io
@@ -2,24 +2,76 @@
 Notification service for handling various types of notifications.
 """
 import logging
-from typing import Dict, List, Optional, Any
+from string import Formatter
+from types import MappingProxyType
+from typing import Callable, Dict, List, NamedTuple, Optional, Any, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import and_, or_, case, delete, desc, func, insert, select
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models import Notification, User
 from app.services.base import BaseService
-from app.utils.cache import cache_key, get_cached_result, set_cached_result
+from app.utils.cache import CacheManager, get_cached_result, set_cached_result
 
 logger = logging.getLogger(__name__)
 
 
+def _compile_template(template: str) -> Callable[[Dict[str, Any]], str]:
+    """
+    Parse a ``str.format`` template once into a renderer taking the data dict.
+    
+    Rendering matches ``template.format(**data)``, including the KeyError
+    raised for a missing variable, without re-parsing the template per call.
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if literal:
+            parts.append((literal, None, None, None))
+        if field is not None:
+            parts.append((None, field, spec or '', conversion))
+    
+    if all(field is None for _, field, _, _ in parts):
+        # No variables (e.g. 'System Announcement'): nothing to render
+        return lambda data: template
+    
+    converters = {'r': repr, 's': str, 'a': ascii}
+    
+    def render(data: Dict[str, Any]) -> str:
+        out = []
+        for literal, field, spec, conversion in parts:
+            if field is None:
+                out.append(literal)
+                continue
+            value = data[field]
+            if conversion:
+                value = converters[conversion](value)
+            out.append(format(value, spec))
+        return ''.join(out)
+    
+    return render
+
+
+class NotificationTypeConfig(NamedTuple):
+    """Resolved settings of one notification type."""
+    title_template: str
+    message_template: str
+    render_title: Optional[Callable[[Dict[str, Any]], str]]
+    render_message: Optional[Callable[[Dict[str, Any]], str]]
+    priority: str
+    email_enabled: bool
+
+
+# Settings for types missing from NOTIFICATION_TYPES: no templates
+DEFAULT_TYPE_CONFIG = NotificationTypeConfig('', '', None, None, 'medium', False)
+
+
 class NotificationService(BaseService):
     """Service for managing notifications."""
     
     model = Notification
     
     # Notification types and their default settings
-    NOTIFICATION_TYPES = {
+    NOTIFICATION_TYPES = MappingProxyType({
         'exercise_assigned': {
             'title_template': 'New Exercise Assigned: {exercise_title}',
             'message_template': 'A new exercise "{exercise_title}" has been assigned in {class_name}.',
@@ -68,7 +120,23 @@ class NotificationService(BaseService):
             'priority': 'low',
             'email_enabled': False
         }
-    }
+    })
+    
+    # Rows deleted per transaction when purging old notifications
+    CLEANUP_BATCH_SIZE = 10000
+    
+    # Per-type settings resolved once, with the templates already parsed
+    TYPE_CONFIGS = MappingProxyType({
+        notification_type: NotificationTypeConfig(
+            title_template=config['title_template'],
+            message_template=config['message_template'],
+            render_title=_compile_template(config['title_template']),
+            render_message=_compile_template(config['message_template']),
+            priority=config.get('priority', 'medium'),
+            email_enabled=config.get('email_enabled', False)
+        )
+        for notification_type, config in NOTIFICATION_TYPES.items()
+    })
     
     @classmethod
     def create_notification(
@@ -97,31 +165,10 @@ class NotificationService(BaseService):
             Created notification object
         """
         try:
-            # Get notification type configuration
-            type_config = cls.NOTIFICATION_TYPES.get(notification_type, {})
-            
-            # Generate title and message from templates if not provided
-            if not title and 'title_template' in type_config:
-                try:
-                    title = type_config['title_template'].format(**data)
-                except KeyError as e:
-                    logger.warning(f"Missing template variable for title: {e}")
-                    title = type_config.get('title_template', 'Notification')
-            
-            if not message and 'message_template' in type_config:
-                try:
-                    message = type_config['message_template'].format(**data)
-                except KeyError as e:
-                    logger.warning(f"Missing template variable for message: {e}")
-                    message = type_config.get('message_template', 'You have a new notification.')
-            
-            # Set defaults
-            if not title:
-                title = 'Notification'
-            if not message:
-                message = 'You have a new notification.'
-            if not priority:
-                priority = type_config.get('priority', 'medium')
+            type_config = cls.TYPE_CONFIGS.get(notification_type, DEFAULT_TYPE_CONFIG)
+            title, message, priority = cls._render_notification(
+                type_config, data, title, message, priority
+            )
             
             # Create notification
             notification = Notification(
@@ -135,9 +182,10 @@ class NotificationService(BaseService):
             
             db.session.add(notification)
             db.session.commit()
+            CacheManager.invalidate_notification_caches([user_id])
             
             # Schedule email if enabled
-            if send_email or (send_email is None and type_config.get('email_enabled', False)):
+            if send_email or (send_email is None and type_config.email_enabled):
                 cls._schedule_email_notification(notification)
             
             logger.info(f"Notification created: {notification.id} for user {user_id}")
@@ -148,6 +196,41 @@ class NotificationService(BaseService):
             logger.error(f"Error creating notification: {str(e)}")
             raise
     
+    @classmethod
+    def _render_notification(
+        cls,
+        type_config: NotificationTypeConfig,
+        data: Dict[str, Any],
+        title: Optional[str] = None,
+        message: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> Tuple[str, str, str]:
+        """Fill in title, message and priority from the type's templates and defaults."""
+        # Generate title and message from templates if not provided
+        if not title and type_config.render_title:
+            try:
+                title = type_config.render_title(data)
+            except KeyError as e:
+                logger.warning(f"Missing template variable for title: {e}")
+                title = type_config.title_template
+        
+        if not message and type_config.render_message:
+            try:
+                message = type_config.render_message(data)
+            except KeyError as e:
+                logger.warning(f"Missing template variable for message: {e}")
+                message = type_config.message_template
+        
+        # Set defaults
+        if not title:
+            title = 'Notification'
+        if not message:
+            message = 'You have a new notification.'
+        if not priority:
+            priority = type_config.priority
+        
+        return title, message, priority
+    
     @classmethod
     def get_user_notifications(
         cls,
@@ -159,7 +242,18 @@ class NotificationService(BaseService):
     ) -> Dict[str, Any]:
         """Get paginated notifications for a user."""
         try:
-            query = Notification.query.filter(Notification.user_id == user_id)
+            # Plain columns rather than Notification objects: the page is
+            # only serialized, so nothing needs the identity map
+            query = db.session.query(
+                Notification.id,
+                Notification.type,
+                Notification.title,
+                Notification.message,
+                Notification.data,
+                Notification.is_read,
+                Notification.created_at,
+                Notification.read_at
+            ).filter(Notification.user_id == user_id)
             
             if unread_only:
                 query = query.filter(Notification.is_read == False)
@@ -169,24 +263,40 @@ class NotificationService(BaseService):
             
             query = query.order_by(desc(Notification.created_at))
             
-            # Paginate
-            paginated = query.paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
-            )
-            
-            notifications = [notif.to_dict() for notif in paginated.items]
+            # Paginate without a COUNT: one extra row tells whether a next
+            # page exists, so total and pages are not reported
+            # (out-of-range values fall back as paginate(error_out=False) did)
+            page = max(page, 1)
+            per_page = per_page if per_page > 0 else 20
+            rows = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+            has_next = len(rows) > per_page
+            
+            # Same shape as Notification.to_dict()
+            notifications = [
+                {
+                    'id': row.id,
+                    'user_id': str(user_id),
+                    'type': row.type,
+                    'title': row.title,
+                    'message': row.message,
+                    'data': row.data or {},
+                    'is_read': row.is_read,
+                    'created_at': row.created_at.isoformat(),
+                    'read_at': row.read_at.isoformat() if row.read_at else None
+                }
+                for row in rows[:per_page]
+            ]
             
             return {
                 'notifications': notifications,
-                'total': paginated.total,
-                'pages': paginated.pages,
+                'total': None,
+                'pages': None,
                 'current_page': page,
                 'per_page': per_page,
-                'has_next': paginated.has_next,
-                'has_prev': paginated.has_prev,
-                'unread_count': cls.get_unread_count(user_id)
+                'has_next': has_next,
+                'has_prev': page > 1,
+                # Only shown with the first page
+                'unread_count': cls.get_unread_count(user_id) if page == 1 else None
             }
             
         except Exception as e:
@@ -211,6 +321,7 @@ class NotificationService(BaseService):
                 notification.is_read = True
                 notification.read_at = datetime.utcnow()
                 db.session.commit()
+                CacheManager.invalidate_notification_caches([user_id])
                 
                 logger.info(f"Notification marked as read: {notification_id}")
             
@@ -235,12 +346,15 @@ class NotificationService(BaseService):
             if notification_type:
                 query = query.filter(Notification.type == notification_type)
             
+            # Nothing loaded needs syncing, so skip the session evaluation
             updated_count = query.update({
                 'is_read': True,
                 'read_at': datetime.utcnow()
-            })
+            }, synchronize_session=False)
             
             db.session.commit()
+            if updated_count:
+                CacheManager.invalidate_notification_caches([user_id])
             
             logger.info(f"Marked {updated_count} notifications as read for user {user_id}")
             return updated_count
@@ -266,6 +380,7 @@ class NotificationService(BaseService):
             
             db.session.delete(notification)
             db.session.commit()
+            CacheManager.invalidate_notification_caches([user_id])
             
             logger.info(f"Notification deleted: {notification_id}")
             return True
@@ -279,11 +394,12 @@ class NotificationService(BaseService):
     def get_unread_count(cls, user_id: str) -> int:
         """Get count of unread notifications for a user."""
         try:
-            cache_key_name = cache_key('unread_notifications', user_id)
-            cached_count = get_cached_result(cache_key_name)
+            cache_key_name = CacheManager.unread_notifications_key(user_id)
             
-            if cached_count is not None:
-                return cached_count
+            # Wrapped in a dict so that a zero count is still a cache hit
+            cached = get_cached_result(cache_key_name)
+            if cached is not None:
+                return cached['count']
             
             count = Notification.query.filter(
                 and_(
@@ -292,8 +408,8 @@ class NotificationService(BaseService):
                 )
             ).count()
             
-            # Cache for 5 minutes
-            set_cached_result(cache_key_name, count, timeout=300)
+            # Cache for 5 minutes; writes invalidate it sooner
+            set_cached_result(cache_key_name, {'count': count}, timeout=300)
             return count
             
         except Exception as e:
@@ -304,50 +420,45 @@ class NotificationService(BaseService):
     def get_notification_stats(cls, user_id: str) -> Dict[str, Any]:
         """Get notification statistics for a user."""
         try:
-            total_notifications = Notification.query.filter(
-                Notification.user_id == user_id
-            ).count()
-            
-            unread_notifications = Notification.query.filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.is_read == False
-                )
-            ).count()
-            
-            # Get counts by type
-            type_counts = db.session.query(
+            stats_key = CacheManager.notification_stats_key(user_id)
+            cached_stats = get_cached_result(stats_key)
+            if cached_stats is not None:
+                return cached_stats
+            
+            # Total, unread and recent (last 7 days) counts per type in one
+            # pass; the overall figures are their sums
+            week_ago = datetime.utcnow() - timedelta(days=7)
+            rows = db.session.query(
                 Notification.type,
-                func.count(Notification.id).label('count')
+                func.count(Notification.id).label('total'),
+                func.count(case((Notification.is_read == False, 1))).label('unread'),
+                func.count(case((Notification.created_at >= week_ago, 1))).label('recent')
             ).filter(
                 Notification.user_id == user_id
             ).group_by(Notification.type).all()
             
-            # Get counts by priority
-            priority_counts = db.session.query(
-                Notification.priority,
-                func.count(Notification.id).label('count')
-            ).filter(
-                Notification.user_id == user_id
-            ).group_by(Notification.priority).all()
+            total_notifications = sum(row.total for row in rows)
+            unread_notifications = sum(row.unread for row in rows)
             
-            # Recent notifications (last 7 days)
-            recent_count = Notification.query.filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.created_at >= datetime.utcnow() - timedelta(days=7)
-                )
-            ).count()
+            # Priority is not stored per notification; it follows the type
+            by_priority = {}
+            for row in rows:
+                priority = cls.TYPE_CONFIGS.get(row.type, DEFAULT_TYPE_CONFIG).priority
+                by_priority[priority] = by_priority.get(priority, 0) + row.total
             
-            return {
+            stats = {
                 'total_notifications': total_notifications,
                 'unread_notifications': unread_notifications,
                 'read_notifications': total_notifications - unread_notifications,
-                'recent_notifications': recent_count,
-                'by_type': {type_name: count for type_name, count in type_counts},
-                'by_priority': {priority: count for priority, count in priority_counts}
+                'recent_notifications': sum(row.recent for row in rows),
+                'by_type': {row.type: row.total for row in rows},
+                'by_priority': by_priority
             }
             
+            # Cache for 1 minute; writes invalidate it sooner
+            set_cached_result(stats_key, stats, timeout=60)
+            return stats
+            
         except Exception as e:
             logger.error(f"Error getting notification stats for user {user_id}: {str(e)}")
             raise
@@ -358,46 +469,86 @@ class NotificationService(BaseService):
         user_ids: List[str],
         notification_type: str,
         data: Dict[str, Any],
+        title: Optional[str] = None,
+        message: Optional[str] = None,
+        send_email: Optional[bool] = None,
         **kwargs
-    ) -> List[Notification]:
-        """Create notifications for multiple users."""
+    ) -> List[int]:
+        """
+        Create the same notification for multiple users.
+        
+        The title and message are rendered once and every row is written with
+        a single multi-row INSERT and one commit.
+        
+        Returns:
+            IDs of the created notifications
+        """
         try:
-            notifications = []
-            
-            for user_id in user_ids:
-                try:
-                    notification = cls.create_notification(
-                        user_id=user_id,
-                        notification_type=notification_type,
-                        data=data,
-                        **kwargs
-                    )
-                    notifications.append(notification)
-                except Exception as e:
-                    logger.error(f"Error creating notification for user {user_id}: {str(e)}")
-                    continue
+            if not user_ids:
+                return []
+            
+            type_config = cls.TYPE_CONFIGS.get(notification_type, DEFAULT_TYPE_CONFIG)
+            title, message, _ = cls._render_notification(type_config, data, title, message)
+            
+            rows = [
+                {
+                    'user_id': user_id,
+                    'type': notification_type,
+                    'title': title,
+                    'message': message,
+                    'data': data
+                }
+                for user_id in user_ids
+            ]
+            
+            notification_ids = db.session.scalars(
+                insert(Notification).returning(Notification.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            db.session.commit()
+            CacheManager.invalidate_notification_caches(user_ids)
             
-            logger.info(f"Created {len(notifications)} bulk notifications")
-            return notifications
+            # Schedule emails if enabled
+            if send_email or (send_email is None and type_config.email_enabled):
+                cls._schedule_bulk_email_notifications(notification_ids)
+            
+            logger.info(f"Created {len(notification_ids)} bulk notifications")
+            return notification_ids
             
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error creating bulk notifications: {str(e)}")
             raise
     
     @classmethod
     def cleanup_old_notifications(cls, days_old: int = 90) -> int:
-        """Delete old notifications to keep database clean."""
+        """
+        Delete old read notifications to keep database clean.
+        
+        Rows go in CLEANUP_BATCH_SIZE batches, each committed on its own, so
+        no single transaction holds locks or piles up WAL for the whole purge.
+        """
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days_old)
             
-            deleted_count = Notification.query.filter(
+            batch_ids = select(Notification.id).where(
                 and_(
                     Notification.created_at < cutoff_date,
                     Notification.is_read == True
                 )
-            ).delete()
-            
-            db.session.commit()
+            ).limit(cls.CLEANUP_BATCH_SIZE).scalar_subquery()
+            stmt = delete(Notification).where(Notification.id.in_(batch_ids))
+            
+            deleted_count = 0
+            while True:
+                deleted = db.session.execute(
+                    stmt, execution_options={'synchronize_session': False}
+                ).rowcount
+                db.session.commit()
+                deleted_count += deleted
+                
+                if deleted < cls.CLEANUP_BATCH_SIZE:
+                    break
             
             logger.info(f"Cleaned up {deleted_count} old notifications")
             return deleted_count
@@ -417,8 +568,10 @@ class NotificationService(BaseService):
             tomorrow = datetime.utcnow() + timedelta(hours=24)
             one_hour = datetime.utcnow() + timedelta(hours=1)
             
-            # Get assignments due soon
-            assignments = ClassExerciseAssignment.query.filter(
+            # Get assignments due soon, with the exercise titles the notifications use
+            assignments = ClassExerciseAssignment.query.options(
+                joinedload(ClassExerciseAssignment.exercise)
+            ).filter(
                 and_(
                     ClassExerciseAssignment.due_date.isnot(None),
                     or_(
@@ -434,17 +587,43 @@ class NotificationService(BaseService):
                 )
             ).all()
             
+            if not assignments:
+                return []
+            
+            # Active enrollments of every due class, in one query
+            students_by_class = {}
+            for class_id, student_id in db.session.query(
+                ClassEnrollment.class_id,
+                ClassEnrollment.student_id
+            ).filter(
+                and_(
+                    ClassEnrollment.class_id.in_(list({a.class_id for a in assignments})),
+                    ClassEnrollment.enrollment_status == 'active'
+                )
+            ):
+                students_by_class.setdefault(class_id, []).append(student_id)
+            
+            student_ids = list({s for students in students_by_class.values() for s in students})
+            if not student_ids:
+                return []
+            
+            # (student, assignment) pairs already notified in the last 2 hours
+            assignment_key = Notification.data['assignment_id'].astext
+            already_sent = set(db.session.query(
+                Notification.user_id,
+                assignment_key
+            ).filter(
+                and_(
+                    Notification.type == 'assignment_due',
+                    Notification.user_id.in_(student_ids),
+                    assignment_key.in_([str(a.id) for a in assignments]),
+                    Notification.created_at >= datetime.utcnow() - timedelta(hours=2)
+                )
+            ).all())
+            
             notifications_to_create = []
             
             for assignment in assignments:
-                # Get enrolled students
-                enrollments = ClassEnrollment.query.filter(
-                    and_(
-                        ClassEnrollment.class_id == assignment.class_id,
-                        ClassEnrollment.enrollment_status == 'active'
-                    )
-                ).all()
-                
                 time_remaining = assignment.due_date - datetime.utcnow()
                 
                 if time_remaining <= timedelta(hours=1):
@@ -452,20 +631,10 @@ class NotificationService(BaseService):
                 else:
                     time_str = "24 hours"
                 
-                for enrollment in enrollments:
-                    # Check if we've already sent this notification
-                    existing_notification = Notification.query.filter(
-                        and_(
-                            Notification.user_id == enrollment.student_id,
-                            Notification.type == 'assignment_due',
-                            Notification.data['assignment_id'].astext == str(assignment.id),
-                            Notification.created_at >= datetime.utcnow() - timedelta(hours=2)
-                        )
-                    ).first()
-                    
-                    if not existing_notification:
+                for student_id in students_by_class.get(assignment.class_id, []):
+                    if (student_id, str(assignment.id)) not in already_sent:
                         notifications_to_create.append({
-                            'user_id': enrollment.student_id,
+                            'user_id': student_id,
                             'assignment': assignment,
                             'time_remaining': time_str
                         })
@@ -504,26 +673,50 @@ class NotificationService(BaseService):
     
     @classmethod
     def _schedule_email_notification(cls, notification: Notification):
-        """Schedule email notification to be sent asynchronously."""
+        """
+        Queue the notification email on a Celery worker, sending it inline if
+        the queue is unavailable.
+        
+        The worker looks up the recipient and checks their preferences, so
+        nothing but the enqueue happens on the request path.
+        """
+        # Import here to avoid circular imports
+        from app.tasks.email_tasks import (
+            NOTIFICATION_EMAIL_QUEUE, deliver_notification_email, send_notification_email
+        )
+        
+        try:
+            send_notification_email.apply_async(
+                args=[notification.id], queue=NOTIFICATION_EMAIL_QUEUE
+            )
+        except Exception as e:
+            logger.error(f"Failed to queue email notification {notification.id}: {str(e)}")
+            try:
+                deliver_notification_email(notification.id)
+            except Exception as e:
+                logger.error(f"Error sending email notification {notification.id}: {str(e)}")
+    
+    @classmethod
+    def _schedule_bulk_email_notifications(cls, notification_ids: List[int]):
+        """
+        Queue notification emails for a bulk send, one task per notification.
+        
+        Separate tasks (not chunks, which run the items in a loop inside one
+        task) keep a failed send from stopping the rest and let each retry.
+        """
         try:
             # Import here to avoid circular imports
-            from app.tasks.email_tasks import send_notification_email
-            
-            # Get user email
-            user = User.query.get(notification.user_id)
-            if not user or not user.email:
-                logger.warning(f"Cannot send email notification - user not found or no email: {notification.user_id}")
-                return
+            from celery import group
+            from app.tasks.email_tasks import NOTIFICATION_EMAIL_QUEUE, send_notification_email
             
-            # Schedule email task (this would use Celery in production)
-            # For now, we'll just log that the email would be sent
-            logger.info(f"Email notification scheduled for {user.email}: {notification.title}")
+            group(
+                send_notification_email.s(notification_id) for notification_id in notification_ids
+            ).apply_async(queue=NOTIFICATION_EMAIL_QUEUE)
             
-            # In a real implementation, you would call:
-            # send_notification_email.delay(notification.id)
+            logger.info(f"Email notifications scheduled for {len(notification_ids)} users")
             
         except Exception as e:
-            logger.error(f"Error scheduling email notification: {str(e)}")
+            logger.error(f"Error scheduling bulk email notifications: {str(e)}")
     
     @classmethod
     def update_notification_preferences(cls, user_id: str, preferences: Dict[str, bool]) -> bool:
@@ -0,0 +1,90 @@
+"""
+Dashboard maintenance tasks using Celery for scheduled processing.
+"""
+import logging
+from typing import List, Optional
+from app.tasks.email_tasks import celery
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task
+def refresh_dashboard_views(names: Optional[List[str]] = None):
+    """
+    Refresh the dashboard materialized views.
+    This task should be run periodically (e.g., every 10 minutes).
+    
+    Args:
+        names: Views to refresh (all when omitted)
+    """
+    try:
+        from app.utils.materialized_views import refresh_materialized_views
+        
+        refreshed = refresh_materialized_views(names)
+        
+        logger.info(f"Dashboard views refreshed: {refreshed}")
+        return refreshed
+        
+    except Exception as e:
+        logger.error(f"Error refreshing dashboard views: {str(e)}")
+        return 0
+
+
+@celery.task
+def warm_admin_dashboard_cache():
+    """
+    Precompute the admin dashboard so readers rarely hit a cold cache.
+    This task should run more often than the dashboard cache timeout.
+    """
+    try:
+        from app.services.dashboard import DashboardService
+        
+        DashboardService.warm_admin_dashboard()
+        
+        logger.info("Admin dashboard cache warmed")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error warming admin dashboard cache: {str(e)}")
+        return False
+
+
+@celery.task
+def sync_student_achievements():
+    """
+    Backfill progress-based achievements for all students.
+    This task should be run nightly; completions award them immediately.
+    """
+    try:
+        from app.services.achievement import AchievementService
+        
+        awarded = AchievementService.award_all_achievements()
+        
+        logger.info(f"Student achievements synced: {awarded}")
+        return awarded
+        
+    except Exception as e:
+        logger.error(f"Error syncing student achievements: {str(e)}")
+        return 0
+
+
+@celery.task
+def refresh_activity_rollup(days: int = 1):
+    """
+    Recompute the daily activity roll-up behind the admin activity trends.
+    Run frequently for today and nightly with days=2 to settle yesterday.
+    
+    Args:
+        days: Number of days to recompute, ending today
+    """
+    try:
+        from app.services.dashboard import DashboardService
+        
+        written = DashboardService.refresh_activity_rollup(days)
+        
+        logger.info(f"Activity roll-up refreshed: {written} days")
+        return written
+        
+    except Exception as e:
+        logger.error(f"Error refreshing activity roll-up: {str(e)}")
+        return 0
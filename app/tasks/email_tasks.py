@@ -37,8 +37,72 @@ def create_celery_app(app=None):
 # For now, we'll create a mock celery app for development
 celery = create_celery_app()
 
+# Queue for notification emails, kept apart from the scheduled tasks so
+# SMTP work never delays them. Producers pass it explicitly: the route in
+# celery_app does not apply to tasks published through this module's app.
+NOTIFICATION_EMAIL_QUEUE = 'notifications_email'
 
-@celery.task(bind=True, max_retries=3)
+
+def deliver_notification_email(notification_id: int) -> bool:
+    """
+    Send a notification email now, in the calling process.
+    
+    Used by ``send_notification_email`` and as the inline fallback when the
+    task cannot be queued. Errors while sending propagate to the caller.
+    
+    Args:
+        notification_id: ID of the notification to send via email
+    
+    Returns:
+        True if an email was sent
+    """
+    # Get notification
+    notification = Notification.query.get(notification_id)
+    if not notification:
+        logger.error(f"Notification {notification_id} not found")
+        return False
+    
+    # Get user
+    user = User.query.get(notification.user_id)
+    if not user or not user.email:
+        logger.warning(f"User {notification.user_id} not found or has no email")
+        return False
+    
+    # Check if user has email notifications enabled
+    user_settings = user.settings or {}
+    notification_settings = user_settings.get('notifications', {})
+    
+    if not notification_settings.get('email_notifications', True):
+        logger.info(f"Email notifications disabled for user {user.id}")
+        return False
+    
+    # Check if this notification type should send emails
+    type_enabled = notification_settings.get(notification.type, True)
+    if not type_enabled:
+        logger.info(f"Email disabled for notification type {notification.type} for user {user.id}")
+        return False
+    
+    # Create email message
+    subject = f"[EduMath AI] {notification.title}"
+    
+    # Create email body
+    email_body = create_email_body(notification, user)
+    
+    # Send email
+    msg = Message(
+        subject=subject,
+        recipients=[user.email],
+        html=email_body,
+        sender=current_app.config.get('MAIL_DEFAULT_SENDER', 'noreply@edumath-ai.com')
+    )
+    
+    mail.send(msg)
+    
+    logger.info(f"Email notification sent to {user.email} for notification {notification_id}")
+    return True
+
+
+@celery.task(bind=True, max_retries=3, acks_late=True)
 def send_notification_email(self, notification_id: int):
     """
     Send email notification asynchronously.
@@ -47,50 +111,7 @@ def send_notification_email(self, notification_id: int):
         notification_id: ID of the notification to send via email
     """
     try:
-        # Get notification
-        notification = Notification.query.get(notification_id)
-        if not notification:
-            logger.error(f"Notification {notification_id} not found")
-            return False
-        
-        # Get user
-        user = User.query.get(notification.user_id)
-        if not user or not user.email:
-            logger.warning(f"User {notification.user_id} not found or has no email")
-            return False
-        
-        # Check if user has email notifications enabled
-        user_settings = user.settings or {}
-        notification_settings = user_settings.get('notifications', {})
-        
-        if not notification_settings.get('email_notifications', True):
-            logger.info(f"Email notifications disabled for user {user.id}")
-            return False
-        
-        # Check if this notification type should send emails
-        type_enabled = notification_settings.get(notification.type, True)
-        if not type_enabled:
-            logger.info(f"Email disabled for notification type {notification.type} for user {user.id}")
-            return False
-        
-        # Create email message
-        subject = f"[EduMath AI] {notification.title}"
-        
-        # Create email body
-        email_body = create_email_body(notification, user)
-        
-        # Send email
-        msg = Message(
-            subject=subject,
-            recipients=[user.email],
-            html=email_body,
-            sender=current_app.config.get('MAIL_DEFAULT_SENDER', 'noreply@edumath-ai.com')
-        )
-        
-        mail.send(msg)
-        
-        logger.info(f"Email notification sent to {user.email} for notification {notification_id}")
-        return True
+        return deliver_notification_email(notification_id)
         
     except Exception as e:
         logger.error(f"Error sending email notification {notification_id}: {str(e)}")
@@ -245,6 +266,55 @@ def send_weekly_progress_report(user_id: str):
         return False
 
 
+@celery.task
+def send_account_welcome_email(user_id: str):
+    """
+    Send the account welcome email outside the request cycle.
+    
+    Args:
+        user_id: ID of the new user
+    """
+    try:
+        from app.services.email import EmailService
+        
+        user = User.query.get(user_id)
+        if not user or not user.email:
+            logger.warning(f"User {user_id} not found or has no email for account welcome email")
+            return False
+        
+        EmailService.send_welcome_email(user)
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error sending account welcome email to user {user_id}: {str(e)}")
+        return False
+
+
+@celery.task
+def send_password_reset_email(user_id: str, reset_token: str):
+    """
+    Send a password reset email outside the request cycle.
+    
+    Args:
+        user_id: ID of the user resetting their password
+        reset_token: Password reset token
+    """
+    try:
+        from app.services.email import EmailService
+        
+        user = User.query.get(user_id)
+        if not user or not user.email:
+            logger.warning(f"User {user_id} not found or has no email for password reset email")
+            return False
+        
+        EmailService.send_password_reset_email(user, reset_token)
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error sending password reset email to user {user_id}: {str(e)}")
+        return False
+
+
 @celery.task
 def cleanup_old_email_logs():
     """
@@ -262,6 +332,25 @@ def cleanup_old_email_logs():
         return False
 
 
+@celery.task
+def cleanup_old_notifications(days_old: int = 90):
+    """
+    Delete read notifications older than ``days_old`` days, in batches.
+    This task should be run periodically (e.g., daily).
+    """
+    try:
+        from app.services.notification import NotificationService
+        
+        deleted = NotificationService.cleanup_old_notifications(days_old)
+        
+        logger.info(f"Old notifications cleanup completed: {deleted}")
+        return deleted
+        
+    except Exception as e:
+        logger.error(f"Error cleaning up old notifications: {str(e)}")
+        return 0
+
+
 def create_email_body(notification: Notification, user: User) -> str:
     """
     Create HTML email body for notification.
@@ -621,7 +710,8 @@ def weekly_tasks():
         # Send weekly progress reports to all users who have them enabled
         from app.models import User
         
-        users = User.query.all()
+        # Stream users in batches rather than loading every user at once
+        users = User.query.yield_per(500)
         for user in users:
             user_settings = user.settings or {}
             notification_settings = user_settings.get('notifications', {})
@@ -1,19 +1,48 @@
 import json
 import hashlib
-from typing import Any, Optional, Dict
+import time
+from typing import Any, Callable, Iterable, List, Optional, Dict
+import orjson
 from flask import current_app
 from app.extensions import cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Single-flight rebuild settings (see get_or_build_cached_result)
+REBUILD_LOCK_TIMEOUT = 30  # seconds before an abandoned rebuild lock expires
+REBUILD_WAIT_TIMEOUT = 2.0  # seconds to wait for another worker's rebuild
+REBUILD_POLL_INTERVAL = 0.05
 
-def cache_key(prefix: str, **kwargs) -> str:
-    """Generate a cache key from prefix and kwargs."""
+# Prefix marking values stored as orjson bytes rather than pickled objects.
+# Non-string dict keys are left unsupported on purpose: JSON would turn int
+# keys (exercise or class IDs) into strings, so such values stay pickled.
+ORJSON_MARKER = b'oj:'
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
+
+def _encode_cached_value(data: Any) -> Any:
+    """Encode a value as compact orjson bytes, leaving it as-is (pickled) if unsupported."""
+    try:
+        return ORJSON_MARKER + orjson.dumps(data, option=ORJSON_OPTIONS)
+    except TypeError:
+        return data
+
+
+def _decode_cached_value(value: Any) -> Any:
+    """Decode a value written by ``_encode_cached_value``."""
+    if isinstance(value, bytes) and value.startswith(ORJSON_MARKER):
+        return orjson.loads(value[len(ORJSON_MARKER):])
+    return value
+
+
+def cache_key(prefix: str, *args, **kwargs) -> str:
+    """Generate a cache key from prefix, positional parts and kwargs."""
     try:
         # Sort kwargs for consistent keys
         sorted_kwargs = sorted(kwargs.items())
-        key_string = f"{prefix}:{':'.join(f'{k}={v}' for k, v in sorted_kwargs)}"
+        parts = [str(arg) for arg in args] + [f'{k}={v}' for k, v in sorted_kwargs]
+        key_string = f"{prefix}:{':'.join(parts)}"
         
         # Use hash for long keys
         if len(key_string) > 200:
@@ -32,7 +61,7 @@ def get_cached_result(key: str) -> Optional[Dict[str, Any]]:
         if not current_app.config.get('CACHE_ENABLED', True):
             return None
         
-        cached_data = cache.get(key)
+        cached_data = _decode_cached_value(cache.get(key))
         if cached_data:
             logger.debug(f"Cache hit for key: {key}")
             return cached_data
@@ -50,7 +79,7 @@ def set_cached_result(key: str, data: Dict[str, Any], timeout: int = 300) -> boo
         if not current_app.config.get('CACHE_ENABLED', True):
             return False
         
-        cache.set(key, data, timeout=timeout)
+        cache.set(key, _encode_cached_value(data), timeout=timeout)
         logger.debug(f"Cached result for key: {key} with timeout: {timeout}")
         return True
     except Exception as e:
@@ -58,6 +87,122 @@ def set_cached_result(key: str, data: Dict[str, Any], timeout: int = 300) -> boo
         return False
 
 
+def get_cached_result_many(keys: List[str]) -> Dict[str, Any]:
+    """
+    Get several cached results in one round trip (MGET on Redis).
+    
+    Returns:
+        Mapping of key to value for the keys that were cached
+    """
+    try:
+        if not keys or not current_app.config.get('CACHE_ENABLED', True):
+            return {}
+        
+        values = cache.get_many(*keys)
+        found = {
+            key: _decode_cached_value(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+        logger.debug(f"Cache hit for {len(found)}/{len(keys)} keys")
+        return found
+    except Exception as e:
+        logger.error(f"Error getting cached results for {len(keys)} keys: {str(e)}")
+        return {}
+
+
+def set_cached_result_many(mapping: Dict[str, Any], timeout: int = 300) -> bool:
+    """Set several cached results in one round trip (pipelined on Redis)."""
+    try:
+        if not mapping or not current_app.config.get('CACHE_ENABLED', True):
+            return False
+        
+        cache.set_many(
+            {key: _encode_cached_value(data) for key, data in mapping.items()},
+            timeout=timeout
+        )
+        logger.debug(f"Cached {len(mapping)} results with timeout: {timeout}")
+        return True
+    except Exception as e:
+        logger.error(f"Error setting cached results for {len(mapping)} keys: {str(e)}")
+        return False
+
+
+def delete_cached_results(keys: List[str]) -> bool:
+    """Delete several cached results in one round trip."""
+    try:
+        if not keys:
+            return False
+        
+        cache.delete_many(*keys)
+        logger.debug(f"Deleted cached results for keys: {keys}")
+        return True
+    except Exception as e:
+        logger.error(f"Error deleting cached results for {len(keys)} keys: {str(e)}")
+        return False
+
+
+def refresh_cached_result(key: str, build_func: Callable[[], Any], timeout: int = 300) -> Any:
+    """
+    Rebuild a cached result unconditionally.
+    
+    A ``<key>:stale`` copy is kept for twice the timeout so readers can be
+    served while the next rebuild is in flight.
+    """
+    data = build_func()
+    set_cached_result(key, data, timeout)
+    set_cached_result(f"{key}:stale", data, timeout * 2)
+    return data
+
+
+def get_or_build_cached_result(key: str, build_func: Callable[[], Any], timeout: int = 300) -> Any:
+    """
+    Get a cached result, rebuilding it at most once across concurrent callers.
+    
+    On a miss only the caller that takes the ``<key>:lock`` entry runs
+    ``build_func`` (``cache.add`` is ``SET NX EX`` on Redis). Other callers get
+    the stale copy if there is one, otherwise wait briefly for the rebuild and
+    only build themselves if it does not show up in time.
+    """
+    cached_data = get_cached_result(key)
+    if cached_data:
+        return cached_data
+    
+    if not current_app.config.get('CACHE_ENABLED', True):
+        return build_func()
+    
+    lock_key = f"{key}:lock"
+    try:
+        acquired = cache.add(lock_key, 1, timeout=REBUILD_LOCK_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Error acquiring rebuild lock for key {key}: {str(e)}")
+        acquired = True
+    
+    if acquired:
+        try:
+            return refresh_cached_result(key, build_func, timeout)
+        finally:
+            try:
+                cache.delete(lock_key)
+            except Exception as e:
+                logger.error(f"Error releasing rebuild lock for key {key}: {str(e)}")
+    
+    stale_data = get_cached_result(f"{key}:stale")
+    if stale_data:
+        logger.debug(f"Serving stale result for key: {key}")
+        return stale_data
+    
+    deadline = time.monotonic() + REBUILD_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_INTERVAL)
+        cached_data = get_cached_result(key)
+        if cached_data:
+            return cached_data
+    
+    logger.warning(f"Timed out waiting for rebuild of key: {key}")
+    return build_func()
+
+
 def invalidate_cache_pattern(pattern: str) -> bool:
     """Invalidate cache entries matching a pattern."""
     try:
@@ -91,6 +236,138 @@ def warm_cache(key: str, data_func, timeout: int = 300) -> Any:
 class CacheManager:
     """Cache manager for exercise and analytics data."""
     
+    # Student dashboard sections, each cached under its own key
+    STUDENT_DASHBOARD_SECTIONS = (
+        'recent_progress', 'enrolled_classes', 'pending_assignments',
+        'upcoming_deadlines', 'overall_stats', 'recent_chats', 'achievements'
+    )
+    
+    # Sections affected by a student's progress and enrollment writes
+    PROGRESS_DASHBOARD_SECTIONS = (
+        'recent_progress', 'enrolled_classes', 'pending_assignments',
+        'upcoming_deadlines', 'overall_stats', 'achievements'
+    )
+    ENROLLMENT_DASHBOARD_SECTIONS = (
+        'enrolled_classes', 'pending_assignments', 'upcoming_deadlines'
+    )
+    
+    # Sections read from the student dashboard view, and the seconds that view
+    # may lag a write (refreshed every 10 minutes)
+    STUDENT_VIEW_SECTIONS = ('overall_stats', 'achievements')
+    STUDENT_DASHBOARD_VIEW_LAG = 660
+    
+    # Seconds the class stats view may lag a write (refreshed every minute)
+    CLASS_STATS_VIEW_LAG = 120
+    
+    @classmethod
+    def student_dashboard_keys(cls, student_id: str,
+                               sections: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Map student dashboard sections to their cache keys."""
+        return {
+            section: cache_key('student_dashboard', student_id, section)
+            for section in (sections or cls.STUDENT_DASHBOARD_SECTIONS)
+        }
+    
+    @staticmethod
+    def student_live_stats_key(student_id: str) -> str:
+        """Cache key flagging a student's stats as newer than the student dashboard view."""
+        return cache_key('student_dashboard', str(student_id), 'live_stats')
+    
+    @classmethod
+    def invalidate_student_dashboard(cls, student_id: str, sections: Optional[Iterable[str]] = None):
+        """
+        Invalidate some (or all) cached sections of a student's dashboard.
+        
+        Sections read from the student dashboard view are flagged to be
+        computed live until the view's next refresh, so the rebuild does not
+        re-cache the pre-write figures.
+        """
+        try:
+            section_keys = cls.student_dashboard_keys(student_id, sections)
+            delete_cached_results(list(section_keys.values()))
+            if any(section in section_keys for section in cls.STUDENT_VIEW_SECTIONS):
+                set_cached_result(
+                    cls.student_live_stats_key(student_id), True,
+                    timeout=cls.STUDENT_DASHBOARD_VIEW_LAG
+                )
+        except Exception as e:
+            logger.error(f"Error invalidating student dashboard for {student_id}: {str(e)}")
+    
+    @staticmethod
+    def professor_dashboard_key(professor_id: str) -> str:
+        """Cache key of a professor's dashboard."""
+        return cache_key('professor_dashboard', str(professor_id))
+    
+    @staticmethod
+    def professor_live_stats_key(professor_id: str) -> str:
+        """Cache key flagging a professor's class stats as newer than the class stats view."""
+        return cache_key('professor_dashboard', str(professor_id), 'live_stats')
+    
+    @classmethod
+    def invalidate_professor_dashboards(cls, professor_ids: Iterable[str]):
+        """
+        Invalidate the cached dashboards of the given professors.
+        
+        The class stats view only catches up with these writes on its next
+        refresh, so the professors are also flagged to have their class stats
+        computed live until then rather than re-caching the old figures.
+        """
+        try:
+            professor_ids = [str(professor_id) for professor_id in professor_ids]
+            delete_cached_results([
+                key
+                for professor_id in professor_ids
+                for key in (
+                    cls.professor_dashboard_key(professor_id),
+                    f"{cls.professor_dashboard_key(professor_id)}:stale"
+                )
+            ])
+            set_cached_result_many(
+                {cls.professor_live_stats_key(professor_id): True for professor_id in professor_ids},
+                timeout=cls.CLASS_STATS_VIEW_LAG
+            )
+        except Exception as e:
+            logger.error(f"Error invalidating professor dashboards: {str(e)}")
+    
+    @staticmethod
+    def student_analytics_key(student_id: str) -> str:
+        """Cache key of a student's analytics response."""
+        return cache_key('student_analytics', student_id=str(student_id))
+    
+    @classmethod
+    def invalidate_student_analytics(cls, student_id: str):
+        """Invalidate a student's cached analytics."""
+        try:
+            delete_cached_results([
+                cls.student_analytics_key(student_id),
+                f"{cls.student_analytics_key(student_id)}:stale"
+            ])
+        except Exception as e:
+            logger.error(f"Error invalidating student analytics for {student_id}: {str(e)}")
+    
+    @staticmethod
+    def notification_stats_key(user_id: str) -> str:
+        """Cache key of a user's notification statistics."""
+        return cache_key('notification_stats', str(user_id))
+    
+    @staticmethod
+    def unread_notifications_key(user_id: str) -> str:
+        """Cache key of a user's unread notification count."""
+        # v2 holds {'count': n}; bare ints cached under the old key are ignored
+        return cache_key('unread_notifications:v2', str(user_id))
+    
+    @classmethod
+    def invalidate_notification_caches(cls, user_ids: Iterable[str]):
+        """Invalidate the cached notification stats and unread counts of the given users."""
+        try:
+            delete_cached_results([
+                key
+                for user_id in user_ids
+                for key in (cls.notification_stats_key(user_id), cls.unread_notifications_key(user_id))
+            ])
+        except Exception as e:
+            logger.error(f"Error invalidating notification caches: {str(e)}")
+    
     @staticmethod
     def invalidate_exercise_caches(exercise_id: Optional[int] = None):
         """Invalidate exercise-related caches."""
@@ -0,0 +1,263 @@
+"""
+PostgreSQL materialized views backing the dashboard aggregates.
+
+Views are created right after ``db.create_all()`` on PostgreSQL and are
+refreshed on a schedule by Celery beat (see ``app.tasks.dashboard_tasks``).
+Readers must fall back to live queries when a view is unavailable, e.g. on
+other database backends or on databases created before the view existed.
+"""
+import logging
+from typing import Iterable, Optional, Set
+from sqlalchemy import DDL, event, inspect, text
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+# Per-student progress aggregates and completion-day streaks.
+STUDENT_DASHBOARD_MV = 'student_dashboard_mv'
+
+# Single-row platform-wide counters for the admin dashboard.
+PLATFORM_STATS_MV = 'platform_stats_mv'
+
+# Per-class roster, assignment, score and completion aggregates.
+CLASS_STATS_MV = 'class_stats_mv'
+
+# Attempt counts per exercise subject for the overview analytics.
+SUBJECT_ATTEMPTS_MV = 'subject_attempts_mv'
+
+MATERIALIZED_VIEWS = {
+    STUDENT_DASHBOARD_MV: {
+        'create': f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {STUDENT_DASHBOARD_MV} AS
+            WITH stats AS (
+                SELECT
+                    student_id,
+                    COUNT(*) AS attempted,
+                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed,
+                    AVG(CASE WHEN status = 'completed' THEN score END) AS avg_score,
+                    MAX(CASE WHEN status = 'completed' THEN score END) AS best_score,
+                    SUM(time_spent) AS total_time
+                FROM progress
+                GROUP BY student_id
+            ),
+            dates AS (
+                SELECT DISTINCT student_id, updated_date AS d
+                FROM progress
+                WHERE status = 'completed'
+            ),
+            grouped AS (
+                SELECT
+                    student_id,
+                    d,
+                    d - CAST(ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY d) AS INTEGER) AS grp
+                FROM dates
+            ),
+            islands AS (
+                SELECT student_id, COUNT(*) AS cnt, MAX(d) AS last_day
+                FROM grouped
+                GROUP BY student_id, grp
+            ),
+            streaks AS (
+                SELECT
+                    student_id,
+                    MAX(cnt) AS longest_streak,
+                    (ARRAY_AGG(cnt ORDER BY last_day DESC))[1] AS latest_streak,
+                    MAX(last_day) AS latest_streak_day
+                FROM islands
+                GROUP BY student_id
+            )
+            SELECT
+                stats.student_id,
+                stats.attempted,
+                stats.completed,
+                stats.avg_score,
+                stats.best_score,
+                stats.total_time,
+                COALESCE(streaks.longest_streak, 0) AS longest_streak,
+                COALESCE(streaks.latest_streak, 0) AS latest_streak,
+                streaks.latest_streak_day
+            FROM stats
+            LEFT JOIN streaks ON streaks.student_id = stats.student_id
+        """,
+        # A unique index is required for REFRESH ... CONCURRENTLY
+        'indexes': [
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{STUDENT_DASHBOARD_MV}_student_id "
+            f"ON {STUDENT_DASHBOARD_MV} (student_id)"
+        ]
+    },
+    PLATFORM_STATS_MV: {
+        'create': f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {PLATFORM_STATS_MV} AS
+            SELECT
+                1 AS id,
+                (SELECT COUNT(*) FROM users) AS total_users,
+                (SELECT COUNT(*) FROM users WHERE role = 'student') AS total_students,
+                (SELECT COUNT(*) FROM users WHERE role = 'professor') AS total_professors,
+                (SELECT COUNT(*) FROM exercises) AS total_exercises,
+                (SELECT COUNT(*) FROM classes WHERE is_active) AS total_classes,
+                progress_stats.total_progress,
+                progress_stats.total_completed,
+                progress_stats.avg_score,
+                NOW() AS refreshed_at
+            FROM (
+                SELECT
+                    COUNT(*) AS total_progress,
+                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS total_completed,
+                    AVG(CASE WHEN status = 'completed' THEN score END) AS avg_score
+                FROM progress
+            ) AS progress_stats
+        """,
+        'indexes': [
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{PLATFORM_STATS_MV}_id "
+            f"ON {PLATFORM_STATS_MV} (id)"
+        ]
+    },
+    CLASS_STATS_MV: {
+        # Same figures as DashboardService._professor_class_stats_subqueries,
+        # each aggregate grouped by class on its own so the joins never fan out
+        'create': f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {CLASS_STATS_MV} AS
+            SELECT
+                classes.id AS class_id,
+                COALESCE(enrollments.student_count, 0) AS student_count,
+                COALESCE(assignments.assignment_count, 0) AS assignment_count,
+                performance.average_performance,
+                COALESCE(completions.total_completions, 0) AS total_completions
+            FROM classes
+            LEFT JOIN (
+                SELECT class_id, COUNT(*) AS student_count
+                FROM class_enrollments
+                WHERE enrollment_status = 'active'
+                GROUP BY class_id
+            ) AS enrollments ON enrollments.class_id = classes.id
+            LEFT JOIN (
+                SELECT class_id, COUNT(*) AS assignment_count
+                FROM class_exercise_assignments
+                GROUP BY class_id
+            ) AS assignments ON assignments.class_id = classes.id
+            LEFT JOIN (
+                SELECT ce.class_id, AVG(p.score) AS average_performance
+                FROM class_enrollments ce
+                JOIN progress p ON p.student_id = ce.student_id
+                WHERE ce.enrollment_status = 'active'
+                    AND p.status = 'completed'
+                GROUP BY ce.class_id
+            ) AS performance ON performance.class_id = classes.id
+            LEFT JOIN (
+                SELECT cea.class_id, COUNT(p.id) AS total_completions
+                FROM class_exercise_assignments cea
+                JOIN progress p ON p.exercise_id = cea.exercise_id
+                JOIN class_enrollments ce
+                    ON ce.student_id = p.student_id AND ce.class_id = cea.class_id
+                WHERE ce.enrollment_status = 'active'
+                    AND p.status = 'completed'
+                GROUP BY cea.class_id
+            ) AS completions ON completions.class_id = classes.id
+            WHERE classes.is_active
+        """,
+        'indexes': [
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{CLASS_STATS_MV}_class_id "
+            f"ON {CLASS_STATS_MV} (class_id)"
+        ]
+    },
+    SUBJECT_ATTEMPTS_MV: {
+        'create': f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {SUBJECT_ATTEMPTS_MV} AS
+            SELECT exercises.subject, COUNT(progress.id) AS attempts
+            FROM exercises
+            JOIN progress ON progress.exercise_id = exercises.id
+            GROUP BY exercises.subject
+        """,
+        'indexes': [
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{SUBJECT_ATTEMPTS_MV}_subject "
+            f"ON {SUBJECT_ATTEMPTS_MV} (subject)"
+        ]
+    }
+}
+
+# Names of views known to exist in the connected database (lazily loaded)
+_available_views: Optional[Set[str]] = None
+
+
+def is_postgresql() -> bool:
+    """Check whether the bound database is PostgreSQL."""
+    return db.engine.dialect.name == 'postgresql'
+
+
+def view_available(name: str) -> bool:
+    """Check whether a materialized view can be read from."""
+    global _available_views
+
+    try:
+        if not is_postgresql():
+            return False
+
+        if _available_views is None:
+            _available_views = set(inspect(db.engine).get_materialized_view_names())
+
+        return name in _available_views
+    except Exception as e:
+        logger.error(f"Error checking materialized view {name}: {str(e)}")
+        return False
+
+
+def create_materialized_views(connection=None) -> None:
+    """Create all dashboard materialized views and their indexes."""
+    global _available_views
+
+    conn = connection or db.session
+    for name, definition in MATERIALIZED_VIEWS.items():
+        conn.execute(text(definition['create']))
+        for index_sql in definition['indexes']:
+            conn.execute(text(index_sql))
+        logger.info(f"Materialized view ready: {name}")
+
+    if connection is None:
+        db.session.commit()
+    _available_views = None
+
+
+def refresh_materialized_views(names: Optional[Iterable[str]] = None, concurrently: bool = True) -> int:
+    """
+    Refresh dashboard materialized views.
+
+    Args:
+        names: Views to refresh (all when omitted)
+        concurrently: Refresh without blocking readers (requires a unique index)
+
+    Returns:
+        Number of views refreshed
+    """
+    if not is_postgresql():
+        return 0
+
+    refreshed = 0
+    for name in names or MATERIALIZED_VIEWS.keys():
+        if not view_available(name):
+            logger.warning(f"Materialized view {name} does not exist, skipping refresh")
+            continue
+
+        mode = 'CONCURRENTLY ' if concurrently else ''
+        db.session.execute(text(f"REFRESH MATERIALIZED VIEW {mode}{name}"))
+        db.session.commit()
+        refreshed += 1
+
+    logger.info(f"Refreshed {refreshed} materialized views")
+    return refreshed
+
+
+def _create_views_after_tables(target, connection, **kwargs):
+    """Create materialized views once ``create_all`` has built the tables."""
+    if connection.dialect.name == 'postgresql':
+        create_materialized_views(connection)
+
+
+def register_materialized_views(metadata) -> None:
+    """Hook view creation and removal into ``create_all``/``drop_all``."""
+    event.listen(metadata, 'after_create', _create_views_after_tables)
+    for name in MATERIALIZED_VIEWS:
+        event.listen(
+            metadata, 'before_drop',
+            DDL(f"DROP MATERIALIZED VIEW IF EXISTS {name}").execute_if(dialect='postgresql')
+        )
@@ -11,7 +11,7 @@ def make_celery(app=None):
         'edumath-ai',
         broker=os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0'),
         backend=os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0'),
-        include=['app.tasks.email_tasks']
+        include=['app.tasks.email_tasks', 'app.tasks.dashboard_tasks']
     )
     
     # Update configuration
@@ -34,6 +34,11 @@ def make_celery(app=None):
         worker_max_tasks_per_child=1000,
         worker_disable_rate_limits=False,
         
+        # Notification emails get their own queue
+        task_routes={
+            'app.tasks.email_tasks.send_notification_email': {'queue': 'notifications_email'},
+        },
+        
         # Result backend settings
         result_expires=3600,  # 1 hour
         result_backend_transport_options={
@@ -66,6 +71,48 @@ def make_celery(app=None):
                 'task': 'app.tasks.email_tasks.cleanup_old_email_logs',
                 'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
             },
+            'purge-old-notifications': {
+                'task': 'app.tasks.email_tasks.cleanup_old_notifications',
+                'schedule': crontab(hour=2, minute=30),  # Daily at 2:30 AM
+            },
+            'refresh-student-dashboard-view': {
+                'task': 'app.tasks.dashboard_tasks.refresh_dashboard_views',
+                'schedule': crontab(minute='*/10'),  # Every 10 minutes
+                'args': (['student_dashboard_mv'],),
+            },
+            'refresh-platform-stats-view': {
+                'task': 'app.tasks.dashboard_tasks.refresh_dashboard_views',
+                'schedule': crontab(minute='*/30'),  # Every 30 minutes
+                'args': (['platform_stats_mv'],),
+            },
+            'refresh-class-stats-view': {
+                'task': 'app.tasks.dashboard_tasks.refresh_dashboard_views',
+                'schedule': crontab(minute='*'),  # Every minute
+                'args': (['class_stats_mv'],),
+            },
+            'refresh-subject-attempts-view': {
+                'task': 'app.tasks.dashboard_tasks.refresh_dashboard_views',
+                'schedule': crontab(minute='*/5'),  # Every 5 minutes
+                'args': (['subject_attempts_mv'],),
+            },
+            'warm-admin-dashboard-cache': {
+                'task': 'app.tasks.dashboard_tasks.warm_admin_dashboard_cache',
+                'schedule': crontab(minute='*/20'),  # Every 20 minutes (cache lives 30)
+            },
+            'refresh-activity-rollup-today': {
+                'task': 'app.tasks.dashboard_tasks.refresh_activity_rollup',
+                'schedule': crontab(minute='*/10'),  # Every 10 minutes
+                'args': (1,),
+            },
+            'refresh-activity-rollup-nightly': {
+                'task': 'app.tasks.dashboard_tasks.refresh_activity_rollup',
+                'schedule': crontab(hour=0, minute=15),  # Daily at 00:15, settles yesterday
+                'args': (2,),
+            },
+            'sync-student-achievements': {
+                'task': 'app.tasks.dashboard_tasks.sync_student_achievements',
+                'schedule': crontab(hour=3, minute=0),  # Daily at 3 AM
+            },
         },
         beat_schedule_filename='celerybeat-schedule',
     )
@@ -297,6 +297,30 @@ def show_stats():
         print(f"Uploaded Files: {UploadedFile.query.count()}")
         print(f"Notifications: {Notification.query.count()}")
 
+def refresh_views():
+    """Create missing dashboard materialized views and refresh them with the roll-ups."""
+    from app.utils.materialized_views import (
+        create_materialized_views, refresh_materialized_views, is_postgresql
+    )
+    
+    app = create_app()
+    with app.app_context():
+        if not is_postgresql():
+            print("Materialized views require PostgreSQL")
+            return
+        
+        try:
+            create_materialized_views()
+            refreshed = refresh_materialized_views()
+            print(f"✓ Refreshed {refreshed} materialized views")
+            
+            from app.services.dashboard import DashboardService
+            written = DashboardService.refresh_activity_rollup(days=31)
+            print(f"✓ Rebuilt activity roll-up for {written} days")
+        except Exception as e:
+            print(f"✗ Error refreshing materialized views: {e}")
+            db.session.rollback()
+
 def main():
     """Main CLI interface."""
     if len(sys.argv) < 2:
@@ -311,6 +335,7 @@ def main():
         print("  seed        - Seed database with sample data")
         print("  admin       - Create admin user")
         print("  stats       - Show database statistics")
+        print("  views       - Create or refresh dashboard materialized views and roll-ups")
         return
     
     command = sys.argv[1].lower()
@@ -352,6 +377,9 @@ def main():
     elif command == 'stats':
         show_stats()
     
+    elif command == 'views':
+        refresh_views()
+    
     else:
         print(f"Unknown command: {command}")
         print("Use 'python db_manager.py' to see available commands")
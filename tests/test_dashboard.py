@@ -0,0 +1,200 @@
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.models import (
+    User, Exercise, Class, ClassEnrollment, ClassExerciseAssignment, Progress, DailyActivityRollup
+)
+from app.services.dashboard import DashboardService
+
+
+# Upper bound on statements for one uncached student dashboard build.
+# Eager loads keep this independent of the number of classes/assignments.
+STUDENT_DASHBOARD_MAX_QUERIES = 25
+
+
+@pytest.fixture
+def app():
+    """Create test app with caching disabled and lazy loads raising."""
+    app = create_app('testing')
+    app.config['CACHE_ENABLED'] = False
+    app.config['SQLALCHEMY_RAISE_ON_LAZY'] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed on the app engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def student_with_classes(app):
+    """Create a student enrolled in several classes with pending assignments."""
+    professor = User(email='prof@example.com', role='professor')
+    professor.set_password('TestPass123!')
+    student = User(email='student@example.com', role='student')
+    student.set_password('TestPass123!')
+    db.session.add_all([professor, student])
+    db.session.commit()
+
+    for i in range(3):
+        class_obj = Class(
+            name=f'Algebra {i}',
+            subject='mathematics',
+            professor_id=professor.id,
+            class_code=f'ALG{i:03d}'
+        )
+        db.session.add(class_obj)
+        db.session.flush()
+
+        db.session.add(ClassEnrollment(class_id=class_obj.id, student_id=student.id))
+
+        for j in range(2):
+            exercise = Exercise(
+                title=f'Exercise {i}-{j}',
+                subject='mathematics',
+                questions=[{'question': '1 + 1', 'type': 'text'}],
+                solutions=[{'answer': '2'}],
+                created_by=professor.id,
+                is_published=True
+            )
+            db.session.add(exercise)
+            db.session.flush()
+
+            db.session.add(ClassExerciseAssignment(
+                class_id=class_obj.id,
+                exercise_id=exercise.id,
+                assigned_by=professor.id,
+                due_date=datetime.utcnow() + timedelta(days=j + 1)
+            ))
+
+    db.session.commit()
+    return student
+
+
+class TestStudentDashboardQueries:
+    """Guard the student dashboard against N+1 query regressions."""
+
+    def test_sections_load_without_lazy_loads(self, app, student_with_classes):
+        """Sections are populated, so no raiseload error was swallowed."""
+        dashboard = DashboardService.get_student_dashboard(str(student_with_classes.id))
+
+        assert len(dashboard['enrolled_classes']) == 3
+        assert all(c['professor'] != 'Unknown' for c in dashboard['enrolled_classes'])
+        assert len(dashboard['pending_assignments']) == 6
+
+    def test_query_count_is_bounded(self, app, student_with_classes):
+        """An uncached dashboard build stays under a fixed statement budget."""
+        student_id = str(student_with_classes.id)
+        db.session.expunge_all()
+
+        with count_queries() as statements:
+            DashboardService.get_student_dashboard(student_id)
+
+        assert len(statements) <= STUDENT_DASHBOARD_MAX_QUERIES, '\n'.join(statements)
+
+
+class TestUpcomingDeadlines:
+    """Upcoming deadlines are derived from the pending assignments."""
+
+    def test_deadlines_use_carried_due_dates(self, app, student_with_classes):
+        """Deadlines come from the raw due date without leaking internal keys."""
+        dashboard = DashboardService.get_student_dashboard(str(student_with_classes.id))
+
+        deadlines = dashboard['upcoming_deadlines']
+        assert len(deadlines) == 6
+        assert [d['days_until_due'] for d in deadlines] == sorted(d['days_until_due'] for d in deadlines)
+
+        for item in deadlines + dashboard['pending_assignments']:
+            assert not any(key.startswith('_') for key in item)
+
+    def test_deadlines_without_preloaded_assignments(self, app, student_with_classes):
+        """Called on its own, the helper loads pending assignments itself."""
+        deadlines = DashboardService._get_upcoming_deadlines(str(student_with_classes.id))
+
+        assert len(deadlines) == 6
+        assert all(0 <= d['days_until_due'] <= 7 for d in deadlines)
+
+
+class TestActivityTrends:
+    """Activity trends form a gap-free daily series."""
+
+    def test_series_has_one_entry_per_day(self, app, student_with_classes):
+        """Days without activity are reported with a zero count."""
+        now = datetime.utcnow()
+        trends = DashboardService._get_activity_trends(now)
+
+        for key in ('daily_completions', 'daily_registrations'):
+            series = trends[key]
+            assert len(series) == 31
+            assert series[-1]['date'] == now.date().isoformat()
+            assert [d['date'] for d in series] == sorted(d['date'] for d in series)
+
+        assert sum(d['count'] for d in trends['daily_registrations']) == 2
+        assert sum(d['count'] for d in trends['daily_completions']) == 0
+
+    def test_days_missing_from_rollup_are_counted_live(self, app, student_with_classes):
+        """Rolled-up days are read as stored; days not yet rolled up are counted live."""
+        now = datetime.utcnow()
+        db.session.add(DailyActivityRollup(
+            date=now.date() - timedelta(days=3), completions=5, registrations=1
+        ))
+        db.session.commit()
+
+        trends = DashboardService._get_activity_trends(now)
+
+        assert trends['daily_completions'][-4]['count'] == 5
+        assert sum(d['count'] for d in trends['daily_completions']) == 5
+        assert trends['daily_registrations'][-1]['count'] == 2
+        assert sum(d['count'] for d in trends['daily_registrations']) == 3
+
+
+class TestProfessorDashboardInvalidation:
+    """Student writes can find the professor dashboards they affect."""
+
+    def test_professor_ids_for_student(self, app, student_with_classes):
+        """Each teaching professor is listed once, however many classes they share."""
+        from app.services.class_management import ClassManagementService
+
+        professor = User.query.filter_by(email='prof@example.com').first()
+        professor_ids = ClassManagementService.get_professor_ids_for_student(str(student_with_classes.id))
+
+        assert professor_ids == [str(professor.id)]
+
+
+class TestProfessorRecentActivity:
+    """Recent activity is read as plain columns."""
+
+    def test_activity_rows(self, app, student_with_classes):
+        """Student names and exercise titles come from the joined columns."""
+        professor = User.query.filter_by(email='prof@example.com').first()
+        exercise = Exercise.query.filter_by(title='Exercise 0-0').first()
+        db.session.add(Progress(
+            student_id=student_with_classes.id,
+            exercise_id=exercise.id,
+            status='completed',
+            score=80.0
+        ))
+        db.session.commit()
+
+        activity = DashboardService._get_professor_recent_activity(str(professor.id))
+
+        assert activity
+        assert all(a['student_name'] == 'student' for a in activity)
+        assert all(a['exercise_title'] == 'Exercise 0-0' for a in activity)
+        assert all(a['score'] == 80.0 for a in activity)
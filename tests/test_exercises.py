@@ -4,7 +4,7 @@ from datetime import datetime
 from app import create_app
 from app.extensions import db
 from app.models import User, Exercise, Progress
-from app.services.exercise import ExerciseService, ProgressService, AnalyticsService
+from app.services.exercise import ExerciseService, ProgressService, AnalyticsService, InvalidCursorError
 
 
 @pytest.fixture
@@ -397,6 +397,127 @@ class TestExerciseService:
             assert exercise.title == 'Test Exercise'
             assert exercise.created_by == professor.id
     
+    def test_bulk_create_exercises(self, app):
+        """All rows are inserted with one commit and their ids returned in order."""
+        with app.app_context():
+            professor = User(email='bulk@test.com', role='professor')
+            professor.set_password('password123')
+            db.session.add(professor)
+            db.session.commit()
+            
+            rows = [
+                {
+                    'title': f'Bulk {i}',
+                    'subject': 'Math',
+                    'questions': [{'text': 'What is 1+1?', 'options': ['1', '2']}],
+                    'solutions': [{'correct_option': 1}]
+                }
+                for i in range(3)
+            ]
+            
+            exercise_ids = ExerciseService.bulk_create_exercises(rows, str(professor.id))
+            
+            assert len(exercise_ids) == 3
+            titles = [db.session.get(Exercise, exercise_id).title for exercise_id in exercise_ids]
+            assert titles == ['Bulk 0', 'Bulk 1', 'Bulk 2']
+            assert ExerciseService.bulk_create_exercises([], str(professor.id)) == []
+    
+    def test_update_exercise_ownership(self, app):
+        """Only the creator can update; unknown ids are reported as missing."""
+        with app.app_context():
+            owner = User(email='owner@test.com', role='professor')
+            owner.set_password('password123')
+            other = User(email='other@test.com', role='professor')
+            other.set_password('password123')
+            db.session.add_all([owner, other])
+            db.session.commit()
+            
+            exercise = Exercise(
+                title='Original',
+                subject='Math',
+                questions=[],
+                solutions=[],
+                created_by=owner.id
+            )
+            db.session.add(exercise)
+            db.session.commit()
+            
+            updated = ExerciseService.update_exercise(exercise.id, {'title': 'Renamed'}, str(owner.id))
+            assert updated.title == 'Renamed'
+            
+            with pytest.raises(PermissionError):
+                ExerciseService.update_exercise(exercise.id, {'title': 'Hijacked'}, str(other.id))
+            
+            with pytest.raises(ValueError):
+                ExerciseService.update_exercise(exercise.id + 1, {'title': 'Missing'}, str(owner.id))
+            
+            assert db.session.get(Exercise, exercise.id).title == 'Renamed'
+    
+    def test_keyset_pagination(self, app):
+        """Cursor pages continue where the previous page ended, without a total."""
+        with app.app_context():
+            professor = User(email='keyset@test.com', role='professor')
+            professor.set_password('password123')
+            db.session.add(professor)
+            db.session.commit()
+            
+            # Identical timestamps exercise the id tie-breaker
+            created_at = datetime.utcnow()
+            for i in range(5):
+                db.session.add(Exercise(
+                    title=f'Exercise {i}',
+                    subject='Math',
+                    questions=[],
+                    solutions=[],
+                    created_by=professor.id,
+                    is_published=True,
+                    created_at=created_at
+                ))
+            db.session.commit()
+            
+            first_page, total = ExerciseService.get_exercises_with_filters({'per_page': 2})
+            assert total == 5
+            
+            seen = [exercise.id for exercise in first_page]
+            cursor = ExerciseService.encode_cursor(first_page[-1])
+            while cursor:
+                page, total = ExerciseService.get_exercises_with_filters({'per_page': 2, 'cursor': cursor})
+                assert total is None
+                seen.extend(exercise.id for exercise in page)
+                cursor = ExerciseService.encode_cursor(page[-1]) if len(page) == 2 else None
+            
+            assert len(seen) == len(set(seen)) == 5
+            
+            with pytest.raises(InvalidCursorError):
+                ExerciseService.get_exercises_with_filters({'per_page': 2, 'cursor': 'not-a-cursor'})
+    
+    def test_offset_pagination_total(self, app):
+        """Offset pages report the filtered total, even past the last page."""
+        with app.app_context():
+            professor = User(email='offset@test.com', role='professor')
+            professor.set_password('password123')
+            db.session.add(professor)
+            db.session.commit()
+            
+            for i in range(3):
+                db.session.add(Exercise(
+                    title=f'Exercise {i}',
+                    subject='Math',
+                    questions=[],
+                    solutions=[],
+                    created_by=professor.id,
+                    is_published=True
+                ))
+            db.session.commit()
+            
+            page, total = ExerciseService.get_exercises_with_filters({'page': 2, 'per_page': 2})
+            assert len(page) == 1
+            assert total == 3
+            
+            page, total = ExerciseService.get_exercises_with_filters({'page': 5, 'per_page': 2})
+            assert page == []
+            assert total == 3
+    
     def test_score_calculation(self, app):
         """Test score calculation logic."""
         with app.app_context():
@@ -483,6 +604,88 @@ class TestProgressService:
             assert progress.exercise_id == exercise.id
             assert progress.status == 'in_progress'
             assert progress.attempts == 1
+    
+    def test_student_progress_keyset_pagination(self, app):
+        """Cursor pages cover every record once, even with equal timestamps."""
+        with app.app_context():
+            student = User(email='pager@test.com', role='student')
+            student.set_password('password123')
+            professor = User(email='pagerprof@test.com', role='professor')
+            professor.set_password('password123')
+            db.session.add_all([student, professor])
+            db.session.commit()
+            
+            # Identical timestamps exercise the id tie-breaker
+            updated_at = datetime.utcnow()
+            for i in range(5):
+                exercise = Exercise(
+                    title=f'Exercise {i}',
+                    subject='Math',
+                    questions=[],
+                    solutions=[],
+                    created_by=professor.id,
+                    is_published=True
+                )
+                db.session.add(exercise)
+                db.session.flush()
+                db.session.add(Progress(student_id=student.id, exercise_id=exercise.id,
+                                        updated_at=updated_at))
+            db.session.commit()
+            
+            seen = []
+            cursor = None
+            while True:
+                page = ProgressService.get_student_progress(str(student.id), limit=2, before=cursor)
+                seen.extend(progress.id for progress in page)
+                if len(page) < 2:
+                    break
+                cursor = ProgressService.encode_cursor(page[-1])
+            
+            assert len(seen) == len(set(seen)) == 5
+            
+            with pytest.raises(InvalidCursorError):
+                ProgressService.get_student_progress(str(student.id), before='not-a-cursor')
+
+
+class TestAnalyticsService:
+    """Test SQL-side analytics aggregation."""
+    
+    def test_student_and_class_aggregates(self, app):
+        """Summary, subject and difficulty figures match the progress rows."""
+        with app.app_context():
+            professor = User(email='aggprof@test.com', role='professor')
+            professor.set_password('password123')
+            student = User(email='aggstudent@test.com', role='student')
+            student.set_password('password123')
+            db.session.add_all([professor, student])
+            db.session.commit()
+            
+            rows = [('Algebra', 'easy', 'completed', 95.0), ('Algebra', 'easy', 'completed', 75.0),
+                    ('Geometry', 'hard', 'in_progress', None)]
+            for i, (subject, difficulty, status, score) in enumerate(rows):
+                exercise = Exercise(title=f'Agg {i}', subject=subject, difficulty=difficulty,
+                                    questions=[], solutions=[], created_by=professor.id)
+                db.session.add(exercise)
+                db.session.flush()
+                db.session.add(Progress(student_id=student.id, exercise_id=exercise.id,
+                                        status=status, score=score, time_spent=60))
+            db.session.commit()
+            
+            analytics = AnalyticsService.get_student_analytics(str(student.id))
+            summary = analytics['summary']
+            assert summary['total_exercises'] == 3
+            assert summary['completed_exercises'] == 2
+            assert summary['in_progress_exercises'] == 1
+            assert summary['average_score'] == 85.0
+            assert summary['total_time_spent'] == 180
+            assert analytics['subject_breakdown']['Algebra'] == {'total': 2, 'completed': 2, 'avg_score': 85.0}
+            assert analytics['subject_breakdown']['Geometry']['completed'] == 0
+            
+            class_analytics = AnalyticsService.get_class_analytics()
+            assert class_analytics['score_distribution']['90-100'] == 1
+            assert class_analytics['score_distribution']['70-79'] == 1
+            assert class_analytics['difficulty_breakdown']['easy']['success_rate'] == 100.0
+            assert class_analytics['difficulty_breakdown']['hard']['success_rate'] == 0
 
 
 if __name__ == '__main__':